@@ -0,0 +1,128 @@
+# ============================================
+# ⏱️ MESURE : ARCHIVAGE D'UN SALON
+# ============================================
+# Fait passer un faux historique (messages générés, sans Discord)
+# dans archiver_salon() et affiche :
+# - le débit (messages par seconde) et la taille du fichier
+# - la mémoire maximum du processus (RSS)
+# - avec --tracemalloc : le pic de mémoire allouée par Python,
+#   qui doit rester le même quel que soit le nombre de messages
+#
+# Lancement (depuis le dossier "Sky Bot") :
+#     python -m benchmarks.archivage
+#     python -m benchmarks.archivage 1000000 --tracemalloc
+# ============================================
+
+import argparse
+import asyncio
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import utils.archivage as archivage
+
+try:
+    import resource  # RSS maximum : seulement sous Linux / macOS
+except ImportError:
+    resource = None
+
+
+# Un message sur N a une pièce jointe / un embed
+FREQUENCE_PIECES_JOINTES = 20
+FREQUENCE_EMBEDS = 50
+
+
+class _Auteur:
+    def __init__(self, numero: int):
+        self.id = 100000 + numero
+        self.bot = numero == 0
+        self._nom = f"membre{numero}"
+
+    def __str__(self):
+        return self._nom
+
+
+class _PieceJointe:
+    def __init__(self, numero: int):
+        self.filename = f"image{numero}.png"
+        self.url = f"https://cdn.discordapp.com/attachments/1/{numero}/image{numero}.png"
+        self.size = 123456
+
+
+class _Embed:
+    def __init__(self, numero: int):
+        self._donnees = {"type": "rich", "title": f"Embed {numero}", "description": "Texte de l'embed"}
+
+    def to_dict(self):
+        return dict(self._donnees)
+
+
+class _Message:
+    """Les attributs lus par archivage._ligne_message(), rien de plus."""
+
+    def __init__(self, numero: int, auteurs: list[_Auteur], debut: datetime):
+        self.id = 10**17 + numero
+        self.created_at = debut + timedelta(seconds=numero)
+        self.author = auteurs[numero % len(auteurs)]
+        self.content = f"Message numéro {numero} : un peu de texte pour ressembler à une vraie discussion."
+        self.edited_at = None
+        self.reference = None
+        self.pinned = False
+        self.attachments = [_PieceJointe(numero)] if numero % FREQUENCE_PIECES_JOINTES == 0 else []
+        self.embeds = [_Embed(numero)] if numero % FREQUENCE_EMBEDS == 0 else []
+
+
+class _FauxSalon:
+    """Remplace un discord.TextChannel : history() génère les messages au fur et à mesure."""
+
+    def __init__(self, nombre: int):
+        self.id = 1
+        self.name = "mesure"
+        self.nombre = nombre
+
+    async def history(self, limit=None, oldest_first=None):
+        auteurs = [_Auteur(i) for i in range(50)]
+        debut = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        for numero in range(self.nombre):
+            yield _Message(numero, auteurs, debut)
+            # Discord envoie l'historique par pages de 100 : on rend la main au même rythme
+            if numero % 100 == 99:
+                await asyncio.sleep(0)
+
+
+async def _archiver(nombre: int) -> archivage.ResultatArchive:
+    return await archivage.archiver_salon(_FauxSalon(nombre))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesure archiver_salon() sur un faux historique.")
+    parser.add_argument("messages", type=int, nargs="?", default=100_000, help="Nombre de messages générés")
+    parser.add_argument("--tracemalloc", action="store_true", help="Mesure aussi le pic de mémoire allouée (plus lent)")
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dossier:
+        archivage.DOSSIER_ARCHIVES = dossier
+
+        if arguments.tracemalloc:
+            tracemalloc.start()
+
+        debut = time.perf_counter()
+        resultat = asyncio.run(_archiver(arguments.messages))
+        duree = time.perf_counter() - debut
+
+        print(f"{resultat.messages} messages archivés en {duree:.2f} s ({resultat.messages / duree:,.0f} msg/s)")
+        print(f"Fichier : {resultat.taille / 1024:,.0f} Kio")
+
+        if arguments.tracemalloc:
+            _, pic = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"Pic de mémoire allouée (tracemalloc) : {pic / 1024:,.0f} Kio")
+
+    # ru_maxrss est en Kio sous Linux
+    if resource is not None:
+        print(f"RSS maximum du processus : {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:,.0f} Mio")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# ============================================
+# ⏱️ MESURE : CONSTRUCTION DES EMBEDS
+# ============================================
+# Compare, pour l'embed de /shop :
+# - tout formater à chaque commande (prix compris)
+# - construire_embed_boutique() (texte des articles formaté une fois)
+# - copier un embed tout prêt avec Embed.copy()
+#
+# Lancement (depuis le dossier "Sky Bot") :
+#     python -m benchmarks.embeds
+# ============================================
+
+import time
+import tracemalloc
+
+import discord
+
+from cogs.shop import (
+    EMOJI_SKYCOIN, EMOJI_VIP, FACTURE_MENSUELLE_ROLE, PRIX_ROLE_PERSO, PRIX_VIP,
+    construire_embed_boutique
+)
+from utils.embeds import embed_succes, formater_nombre
+
+
+# Nombre de constructions par mesure
+REPETITIONS = 20_000
+
+# Solde affiché dans les embeds mesurés
+SOLDE = 1234
+
+
+def _mesurer(nom: str, fonction):
+    """Affiche le temps et la mémoire moyens d'un appel à `fonction`."""
+    # Temps
+    debut = time.perf_counter()
+    for _ in range(REPETITIONS):
+        fonction()
+    duree = time.perf_counter() - debut
+
+    # Mémoire allouée pendant un appel (mesurée à part : tracemalloc ralentit beaucoup)
+    tracemalloc.start()
+    total = 0
+    for _ in range(REPETITIONS // 10):
+        tracemalloc.reset_peak()
+        avant, _ = tracemalloc.get_traced_memory()
+        fonction()
+        _, pic = tracemalloc.get_traced_memory()
+        total += pic - avant
+    tracemalloc.stop()
+
+    print(
+        f"{nom:<34} {duree / REPETITIONS * 1e6:8.2f} µs"
+        f"   {total / (REPETITIONS // 10) / 1024:6.2f} Kio alloués par appel"
+    )
+
+
+def _description(solde: int) -> str:
+    return (
+        f"Bienvenue dans la boutique officielle !\n"
+        f"Dépense tes **Skycoins** durement gagnés ici.\n\n"
+        f"💰 **TON SOLDE ACTUEL**\n"
+        f"# `{formater_nombre(solde)}` {EMOJI_SKYCOIN}\n"
+        f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+    )
+
+
+def boutique_tout_formater() -> discord.Embed:
+    """L'ancienne construction de /shop : les prix sont formatés à chaque fois."""
+    embed = discord.Embed(title="🛒  BOUTIQUE DU SERVEUR", description=_description(SOLDE), color=0xFFD700)
+    embed.add_field(
+        name=f"{EMOJI_VIP}  Statut VIP (1 Mois)",
+        value=(
+            f"> **Prix :** `{formater_nombre(PRIX_VIP)}` {EMOJI_SKYCOIN}\n"
+            "🔹 Accès aux salons privés\n"
+            "🔹 Grade exclusif en haut de la liste\n"
+            "🔹 Badges et avantages spéciaux\n"
+            "⏳ *Expire automatiquement après 30 jours*"
+        ),
+        inline=False
+    )
+    embed.add_field(name="\u200b", value="━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━", inline=False)
+    embed.add_field(
+        name="🎨  Création de Rôle Personnalisé",
+        value=(
+            f"> **Prix :** `{formater_nombre(PRIX_ROLE_PERSO)}` {EMOJI_SKYCOIN}\n"
+            "🔸 Choisis ton **Nom** unique\n"
+            "🔸 Choisis ta **Couleur** préférée\n"
+            "🔸 Ajoute un **Emoji** personnalisé\n"
+            f"💸 *Coût d'entretien : {formater_nombre(FACTURE_MENSUELLE_ROLE)} {EMOJI_SKYCOIN}/mois*"
+        ),
+        inline=False
+    )
+    embed.set_footer(text="🛒 Clique sur les boutons ci-dessous pour commander !")
+    return embed
+
+
+def main():
+    modele = construire_embed_boutique(0)
+
+    def boutique_copiee() -> discord.Embed:
+        embed = modele.copy()
+        embed.description = _description(SOLDE)
+        return embed
+
+    # Les trois méthodes doivent donner exactement le même embed
+    attendu = construire_embed_boutique(SOLDE).to_dict()
+    assert boutique_tout_formater().to_dict() == attendu
+    assert boutique_copiee().to_dict() == attendu
+
+    print(f"{REPETITIONS} constructions par mesure\n")
+    _mesurer("/shop : tout formater", boutique_tout_formater)
+    _mesurer("/shop : construire_embed_boutique", lambda: construire_embed_boutique(SOLDE))
+    _mesurer("/shop : Embed.copy()", boutique_copiee)
+    _mesurer("embed_succes", lambda: embed_succes("Achat réussi", "Tu es VIP !"))
+
+
+if __name__ == "__main__":
+    main()
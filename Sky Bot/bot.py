@@ -11,6 +11,11 @@ import asyncio
 import os
 
 from config import GUILD_ID
+from utils.notifications import FileNotifications
+from utils.file_roles import FileRoles
+from utils.provisionnement import ProvisionnementRoles
+from utils.cache_permissions import CachePermissions
+from utils.aiguillage import AiguillageMessages
 
 
 class SkyBot(commands.Bot):
@@ -36,6 +41,21 @@ class SkyBot(commands.Bot):
         
         # L'objet "guild" représente ton serveur Discord
         self.guild_object = discord.Object(id=GUILD_ID)
+        
+        # File d'envoi des messages privés (rappels, notifications de la boutique...)
+        self.notifications = FileNotifications(self)
+        
+        # File des ajouts / retraits / suppressions de rôles
+        self.file_roles = FileRoles(self)
+        
+        # Création des rôles perso achetés (avec annulation en cas d'erreur)
+        self.provisionnement = ProvisionnementRoles(self)
+        
+        # Permissions par salon, partagées par les listeners de messages
+        self.permissions = CachePermissions(self)
+        
+        # Distribution des messages aux cogs (un seul on_message pour tout le bot)
+        self.aiguillage = AiguillageMessages(self)
     
     async def setup_hook(self):
         """
@@ -46,15 +66,20 @@ class SkyBot(commands.Bot):
         """
         print("🔧 Chargement des modules...")
         
+        self.notifications.demarrer()
+        self.file_roles.demarrer()
+        
         # Liste des cogs à charger
         # Chaque cog est dans un fichier séparé dans le dossier "cogs/"
         cogs_a_charger = [
             "cogs.economie",      # Système d'économie (/day, /week, /month, /solde)
+            "cogs.rappels",       # Rappels en DM quand /day, /week, /month sont disponibles
             "cogs.reglement",     # Système de règlement avec bouton
             "cogs.annonces",      # Annonces tournage + recrutement
             "cogs.shop",          # Boutique (rôles VIP et perso)
             "cogs.giveaway",      # Système de giveaway
             "cogs.moderation",    # Commandes de modération (/clear, /clear-salon)
+            "cogs.administration", # Outils admin (/export)
 
             # Protection anti-ping de Sky
             # Supprime automatiquement les messages qui mentionnent Sky
@@ -107,6 +132,17 @@ class SkyBot(commands.Bot):
             )
         )
     
+    async def on_message(self, message: discord.Message):
+        """
+        Cette fonction s'exécute pour chaque message reçu.
+        Les cogs ne l'écoutent pas directement : ils s'enregistrent
+        dans self.aiguillage, qui ne leur transmet que les messages utiles.
+        """
+        await self.aiguillage.traiter(message)
+        
+        # Commandes texte (préfixe "!")
+        await self.process_commands(message)
+    
     async def on_command_error(self, ctx, error):
         """
         Gère les erreurs des commandes.
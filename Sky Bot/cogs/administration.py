@@ -0,0 +1,285 @@
+# ============================================
+# 🔧 COG ADMINISTRATION
+# ============================================
+# Ce module regroupe les outils réservés aux admins :
+# - /export : Exporte l'économie et la boutique (CSV ou NDJSON compressé)
+# - /metriques : Affiche les compteurs et temps de réponse du bot
+# ============================================
+
+import asyncio
+import csv
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import discord
+from discord.ext import commands
+from discord import app_commands
+
+from config import GUILD_ID
+from utils.database import DOSSIER_DATA, iterer_json, iterer_archive
+from utils.embeds import embed_succes, embed_erreur, embed_info, formater_nombre
+from utils.metriques import metriques
+
+
+# ============================================
+# ⚙️ CONFIGURATION
+# ============================================
+
+# Dossier où sont écrits les exports
+DOSSIER_EXPORTS = os.path.join(DOSSIER_DATA, "exports")
+
+# Nombre de lignes écrites d'un coup dans le fichier compressé
+TAILLE_LOT_EXPORT = 1000
+
+# Au-delà de cette taille, le fichier reste sur le disque au lieu d'être envoyé
+# (limite d'upload de Discord pour un serveur sans boost)
+TAILLE_MAX_PIECE_JOINTE = 8 * 1024 * 1024
+
+
+# ============================================
+# 📤 FONCTIONS D'EXPORT
+# ============================================
+
+def _format_date(timestamp) -> str:
+    """Convertit un timestamp en date ISO lisible (vide si absent)."""
+    if not timestamp:
+        return ""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+def _lignes_economie():
+    """Une ligne par membre : son solde (membres archivés compris)."""
+    for user_id, solde in iterer_json("economy.json"):
+        yield {"user_id": user_id, "solde": solde, "archive": False}
+    for user_id, data in iterer_archive():
+        yield {"user_id": user_id, "solde": data.get("solde", 0), "archive": True}
+
+
+def _lignes_vip():
+    """Une ligne par VIP : sa date d'expiration."""
+    for user_id, expiration in iterer_json("vip_roles.json"):
+        yield {
+            "user_id": user_id,
+            "expiration": expiration,
+            "expiration_iso": _format_date(expiration)
+        }
+
+
+def _lignes_roles_perso():
+    """Une ligne par rôle personnalisé."""
+    for proprietaire_id, data in iterer_json("custom_roles.json"):
+        yield {
+            "proprietaire_id": proprietaire_id,
+            "role_id": data.get("role_id"),
+            "nom": data.get("nom"),
+            "couleur": f"{data.get('couleur', 0):06X}",
+            "membres": " ".join(str(m) for m in data.get("membres", [])),
+            "derniere_facture": _format_date(data.get("derniere_facture")),
+            "date_creation": _format_date(data.get("date_creation"))
+        }
+
+
+# Chaque jeu de données : (générateur de lignes, colonnes du CSV)
+JEUX_DE_DONNEES = {
+    "economie": (_lignes_economie, ["user_id", "solde", "archive"]),
+    "vip": (_lignes_vip, ["user_id", "expiration", "expiration_iso"]),
+    "roles_perso": (
+        _lignes_roles_perso,
+        ["proprietaire_id", "role_id", "nom", "couleur", "membres", "derniere_facture", "date_creation"]
+    ),
+}
+
+
+def exporter_donnees(jeu: str, format_export: str) -> tuple[str, int]:
+    """
+    Écrit un jeu de données dans un fichier compressé (.gz).
+
+    Les lignes sont lues une par une et écrites par lots de TAILLE_LOT_EXPORT :
+    la mémoire utilisée ne dépend pas de la taille des données.
+    Cette fonction est bloquante, elle doit tourner dans un thread.
+
+    Arguments:
+        jeu: "economie", "vip" ou "roles_perso"
+        format_export: "csv" ou "ndjson"
+
+    Retourne:
+        (chemin du fichier, nombre de lignes exportées)
+    """
+    generateur, colonnes = JEUX_DE_DONNEES[jeu]
+
+    os.makedirs(DOSSIER_EXPORTS, exist_ok=True)
+    horodatage = datetime.now().strftime("%Y%m%d-%H%M%S")
+    chemin = os.path.join(DOSSIER_EXPORTS, f"{jeu}-{horodatage}.{format_export}.gz")
+
+    nb_lignes = 0
+    lot = []
+
+    with gzip.open(chemin, "wt", encoding="utf-8", newline="") as fichier:
+        if format_export == "csv":
+            writer = csv.DictWriter(fichier, fieldnames=colonnes)
+            writer.writeheader()
+            ecrire_lot = writer.writerows
+        else:
+            def ecrire_lot(lignes):
+                fichier.write("".join(json.dumps(l, ensure_ascii=False) + "\n" for l in lignes))
+
+        for ligne in generateur():
+            lot.append(ligne)
+            if len(lot) >= TAILLE_LOT_EXPORT:
+                ecrire_lot(lot)
+                nb_lignes += len(lot)
+                lot = []
+
+        if lot:
+            ecrire_lot(lot)
+            nb_lignes += len(lot)
+
+    return chemin, nb_lignes
+
+
+# ============================================
+# 🧠 COG PRINCIPAL
+# ============================================
+
+class Administration(commands.Cog):
+    """
+    Cog pour les outils d'administration du bot.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    # ================================
+    # 📤 COMMANDE /export
+    # ================================
+    @app_commands.command(
+        name="export",
+        description="[ADMIN] Exporte les soldes, VIP et rôles perso dans un fichier compressé"
+    )
+    @app_commands.describe(
+        donnees="Les données à exporter",
+        format="Le format du fichier"
+    )
+    @app_commands.choices(
+        donnees=[
+            app_commands.Choice(name="Tout", value="tout"),
+            app_commands.Choice(name="Soldes (économie)", value="economie"),
+            app_commands.Choice(name="VIP", value="vip"),
+            app_commands.Choice(name="Rôles personnalisés", value="roles_perso"),
+        ],
+        format=[
+            app_commands.Choice(name="CSV", value="csv"),
+            app_commands.Choice(name="NDJSON", value="ndjson"),
+        ]
+    )
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    async def export(
+        self,
+        interaction: discord.Interaction,
+        donnees: app_commands.Choice[str],
+        format: app_commands.Choice[str]
+    ):
+        """
+        Exporte les données demandées.
+        L'écriture se fait dans un thread : le bot continue de répondre
+        aux autres commandes pendant l'export.
+        """
+        await interaction.response.defer(ephemeral=True)
+
+        jeux = list(JEUX_DE_DONNEES) if donnees.value == "tout" else [donnees.value]
+        debut = time.perf_counter()
+
+        try:
+            resultats = []
+            for jeu in jeux:
+                resultats.append(await asyncio.to_thread(exporter_donnees, jeu, format.value))
+        except OSError as e:
+            embed = embed_erreur("Export impossible", f"Une erreur s'est produite : {e}")
+            return await interaction.followup.send(embed=embed, ephemeral=True)
+
+        duree = time.perf_counter() - debut
+        taille_totale = sum(os.path.getsize(chemin) for chemin, _ in resultats)
+
+        lignes = [
+            f"📄 `{os.path.basename(chemin)}` — **{formater_nombre(nb)}** ligne{'s' if nb > 1 else ''}"
+            for chemin, nb in resultats
+        ]
+
+        # Petits exports : envoyés en pièce jointe. Gros exports : laissés sur le disque.
+        if taille_totale <= TAILLE_MAX_PIECE_JOINTE:
+            fichiers = [discord.File(chemin) for chemin, _ in resultats]
+        else:
+            fichiers = []
+            lignes.append(f"\n💾 Fichiers trop lourds pour Discord, disponibles dans `{DOSSIER_EXPORTS}`")
+
+        embed = embed_succes(
+            "Export terminé !",
+            "\n".join(lignes) + f"\n\n⏱️ {duree:.1f}s"
+        )
+        await interaction.followup.send(embed=embed, files=fichiers, ephemeral=True)
+
+    # ================================
+    # 📊 COMMANDE /metriques
+    # ================================
+    @app_commands.command(
+        name="metriques",
+        description="[ADMIN] Affiche les compteurs et les temps de réponse du bot"
+    )
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    async def afficher_metriques(self, interaction: discord.Interaction):
+        """
+        Affiche le contenu du registre de métriques (utils/metriques.py).
+        """
+        embed = embed_info("Métriques du bot")
+
+        def ajouter_champ(nom: str, lignes: list[str]):
+            texte = "\n".join(lignes) or "*Aucune donnée*"
+            # Un champ d'embed est limité à 1024 caractères
+            if len(texte) > 1024:
+                texte = texte[:1020] + "\n…"
+            embed.add_field(name=nom, value=texte, inline=False)
+
+        ajouter_champ("📈 Compteurs", [
+            f"`{nom}` : **{formater_nombre(valeur)}**"
+            for nom, valeur in sorted(metriques.compteurs.items())
+        ])
+        ajouter_champ("📦 Files et jauges", [
+            f"`{nom}` : **{formater_nombre(int(valeur))}**"
+            for nom, valeur in sorted(metriques.jauges().items())
+        ])
+
+        def ligne_percentiles(etiquette: str, histogramme) -> str | None:
+            resume = histogramme.resume()
+            if not resume["n"]:
+                return None
+            return (
+                f"{etiquette} : p50 **{resume['p50']:.0f}** · p95 **{resume['p95']:.0f}** · "
+                f"p99 **{resume['p99']:.0f}** ({formater_nombre(resume['n'])} mesures)"
+            )
+
+        lignes_latences = [
+            ligne_percentiles(f"`{nom}`", histogramme)
+            for nom, histogramme in sorted(metriques.histogrammes.items())
+        ]
+        ajouter_champ("⏱️ Durées", [ligne for ligne in lignes_latences if ligne])
+
+        # Détail par salon (ex: latences de PingGuard), un champ par métrique
+        for nom, details in sorted(metriques.details.items()):
+            lignes_salons = [
+                ligne_percentiles(f"<#{salon_id}>", histogramme)
+                for salon_id, histogramme in sorted(
+                    details.items(), key=lambda x: x[1].nombre_total, reverse=True
+                )
+            ]
+            ajouter_champ(f"📍 {nom} par salon", [ligne for ligne in lignes_salons if ligne])
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(Administration(bot))
@@ -5,27 +5,33 @@
 # - /day, /week, /month (récompenses avec cooldown)
 # - /solde (voir son argent)
 # - /classement (top des plus riches)
+# - Archivage quotidien des membres inactifs
 # ============================================
 
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 
 from config import (
     GUILD_ID,
     RECOMPENSE_JOUR, RECOMPENSE_SEMAINE, RECOMPENSE_MOIS,
     COOLDOWN_JOUR, COOLDOWN_SEMAINE, COOLDOWN_MOIS,
+    DUREE_INACTIVITE_ARCHIVAGE,
     EMOJI_SKYCOIN
 )
 from utils.database import (
-    obtenir_solde, modifier_solde,
+    modifier_solde,
     verifier_cooldown, enregistrer_cooldown,
-    obtenir_classement
+    obtenir_solde_partage, obtenir_classement_partage,
+    obtenir_classement_gains,
+    archiver_membres_inactifs, nombre_membres_archives
 )
 from utils.embeds import (
     embed_succes, embed_erreur, embed_economie,
     formater_temps, formater_nombre
 )
+from utils.metriques import metriques
+from utils.verrous import verrou_utilisateur
 
 
 class Economie(commands.Cog):
@@ -38,6 +44,12 @@ class Economie(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
+        self.archiver_inactifs.start()
+        metriques.enregistrer_jauge("archive.membres", nombre_membres_archives)
+    
+    def cog_unload(self):
+        """Appelé quand le cog est déchargé."""
+        self.archiver_inactifs.cancel()
     
     # ================================
     # 📅 COMMANDE /day
@@ -54,22 +66,28 @@ class Economie(commands.Cog):
         """
         user_id = interaction.user.id
         
-        # Vérifie si le cooldown est terminé
-        peut_utiliser, temps_restant = verifier_cooldown(
-            user_id, "day", COOLDOWN_JOUR
-        )
-        
-        if not peut_utiliser:
-            # Le joueur doit encore attendre
-            embed = embed_erreur(
-                "Patience !",
-                f"Tu pourras récupérer ta récompense quotidienne dans **{formater_temps(temps_restant)}** !"
+        # Un seul passage à la fois par membre : spammer la commande
+        # ne permet pas de toucher la récompense deux fois
+        async with verrou_utilisateur(user_id):
+            # Vérifie si le cooldown est terminé
+            peut_utiliser, temps_restant = verifier_cooldown(
+                user_id, "day", COOLDOWN_JOUR
             )
-            return await interaction.response.send_message(embed=embed, ephemeral=True)
-        
-        # Ajoute les Skycoins et enregistre le cooldown
-        nouveau_solde = modifier_solde(user_id, RECOMPENSE_JOUR)
-        enregistrer_cooldown(user_id, "day")
+            
+            if not peut_utiliser:
+                # Le joueur doit encore attendre
+                embed = embed_erreur(
+                    "Patience !",
+                    f"Tu pourras récupérer ta récompense quotidienne dans **{formater_temps(temps_restant)}** !"
+                )
+                return await interaction.response.send_message(embed=embed, ephemeral=True)
+            
+            # Ajoute les Skycoins et enregistre le cooldown
+            nouveau_solde = modifier_solde(user_id, RECOMPENSE_JOUR)
+            horodatage = enregistrer_cooldown(user_id, "day")
+            
+            # Prévient les autres cogs (ex: les rappels en DM) que le cooldown a commencé
+            self.bot.dispatch("cooldown_enregistre", user_id, "day", horodatage)
         
         # Message de succès
         embed = embed_economie(
@@ -96,19 +114,21 @@ class Economie(commands.Cog):
         """
         user_id = interaction.user.id
         
-        peut_utiliser, temps_restant = verifier_cooldown(
-            user_id, "week", COOLDOWN_SEMAINE
-        )
-        
-        if not peut_utiliser:
-            embed = embed_erreur(
-                "Patience !",
-                f"Tu pourras récupérer ta récompense hebdomadaire dans **{formater_temps(temps_restant)}** !"
+        async with verrou_utilisateur(user_id):
+            peut_utiliser, temps_restant = verifier_cooldown(
+                user_id, "week", COOLDOWN_SEMAINE
             )
-            return await interaction.response.send_message(embed=embed, ephemeral=True)
-        
-        nouveau_solde = modifier_solde(user_id, RECOMPENSE_SEMAINE)
-        enregistrer_cooldown(user_id, "week")
+            
+            if not peut_utiliser:
+                embed = embed_erreur(
+                    "Patience !",
+                    f"Tu pourras récupérer ta récompense hebdomadaire dans **{formater_temps(temps_restant)}** !"
+                )
+                return await interaction.response.send_message(embed=embed, ephemeral=True)
+            
+            nouveau_solde = modifier_solde(user_id, RECOMPENSE_SEMAINE)
+            horodatage = enregistrer_cooldown(user_id, "week")
+            self.bot.dispatch("cooldown_enregistre", user_id, "week", horodatage)
         
         embed = embed_economie(
             "Récompense Hebdomadaire !",
@@ -134,19 +154,21 @@ class Economie(commands.Cog):
         """
         user_id = interaction.user.id
         
-        peut_utiliser, temps_restant = verifier_cooldown(
-            user_id, "month", COOLDOWN_MOIS
-        )
-        
-        if not peut_utiliser:
-            embed = embed_erreur(
-                "Patience !",
-                f"Tu pourras récupérer ta récompense mensuelle dans **{formater_temps(temps_restant)}** !"
+        async with verrou_utilisateur(user_id):
+            peut_utiliser, temps_restant = verifier_cooldown(
+                user_id, "month", COOLDOWN_MOIS
             )
-            return await interaction.response.send_message(embed=embed, ephemeral=True)
-        
-        nouveau_solde = modifier_solde(user_id, RECOMPENSE_MOIS)
-        enregistrer_cooldown(user_id, "month")
+            
+            if not peut_utiliser:
+                embed = embed_erreur(
+                    "Patience !",
+                    f"Tu pourras récupérer ta récompense mensuelle dans **{formater_temps(temps_restant)}** !"
+                )
+                return await interaction.response.send_message(embed=embed, ephemeral=True)
+            
+            nouveau_solde = modifier_solde(user_id, RECOMPENSE_MOIS)
+            horodatage = enregistrer_cooldown(user_id, "month")
+            self.bot.dispatch("cooldown_enregistre", user_id, "month", horodatage)
         
         embed = embed_economie(
             "Récompense Mensuelle !",
@@ -177,7 +199,7 @@ class Economie(commands.Cog):
         """
         # Si pas de membre spécifié, on prend l'utilisateur qui a fait la commande
         cible = membre or interaction.user
-        solde = obtenir_solde(cible.id)
+        solde = await obtenir_solde_partage(cible.id)
         
         # Détermine si c'est son propre solde ou celui d'un autre
         if cible.id == interaction.user.id:
@@ -199,14 +221,39 @@ class Economie(commands.Cog):
         name="classement",
         description="Affiche le top 10 des membres les plus riches !"
     )
+    @app_commands.describe(periode="Classer par solde total, ou par gains sur une période (optionnel)")
+    @app_commands.choices(periode=[
+        app_commands.Choice(name="Solde total", value="tout"),
+        app_commands.Choice(name="Gains des dernières 24h", value="24h"),
+        app_commands.Choice(name="Gains des 7 derniers jours", value="7j"),
+        app_commands.Choice(name="Gains des 30 derniers jours", value="30j"),
+    ])
     @app_commands.guilds(discord.Object(id=GUILD_ID))
-    async def classement(self, interaction: discord.Interaction):
+    async def classement(
+        self,
+        interaction: discord.Interaction,
+        periode: app_commands.Choice[str] = None
+    ):
         """
-        Affiche le classement des 10 membres les plus riches.
+        Affiche le classement des 10 membres les plus riches,
+        ou de ceux qui ont le plus gagné sur une période (24h, 7 jours, 30 jours).
         """
         await interaction.response.defer()  # Peut prendre du temps
         
-        classement = obtenir_classement(10)
+        fenetre = periode.value if periode else "tout"
+        
+        if fenetre == "tout":
+            # Lecture partagée : si 50 membres font /classement en même temps,
+            # le fichier n'est lu qu'une fois
+            obtenir_top = obtenir_classement_partage
+            titre = "🏆 Classement des Skycoins"
+        else:
+            async def obtenir_top(limite):
+                return obtenir_classement_gains(fenetre, limite)
+            libelles = {"24h": "dernières 24h", "7j": "7 derniers jours", "30j": "30 derniers jours"}
+            titre = f"🏆 Top des gains — {libelles[fenetre]}"
+        
+        classement = await obtenir_top(10)
         
         if not classement:
             embed = embed_erreur(
@@ -238,22 +285,46 @@ class Economie(commands.Cog):
             lignes.append(f"{emoji} {nom} — **{formater_nombre(solde)}** {EMOJI_SKYCOIN}")
         
         embed = embed_economie(
-            "🏆 Classement des Skycoins",
+            titre,
             "\n".join(lignes)
         )
         
         # Ajoute la position de l'utilisateur s'il n'est pas dans le top 10
-        user_solde = obtenir_solde(interaction.user.id)
+        user_solde = None
         position = None
-        for i, (user_id, _) in enumerate(obtenir_classement(100), start=1):
+        for i, (user_id, montant) in enumerate(await obtenir_top(100), start=1):
             if int(user_id) == interaction.user.id:
                 position = i
+                user_solde = montant
                 break
         
         if position and position > 10:
             embed.set_footer(text=f"Ta position : #{position} avec {formater_nombre(user_solde)} Skycoins")
         
         await interaction.followup.send(embed=embed)
+    
+    # ================================
+    # 🧊 TÂCHE : ARCHIVER LES INACTIFS
+    # ================================
+    @tasks.loop(hours=24)
+    async def archiver_inactifs(self):
+        """
+        Déplace les membres inactifs ou partis dans l'archive compressée,
+        pour que economy.json et cooldowns.json ne contiennent que les membres actifs.
+        """
+        guild = self.bot.get_guild(GUILD_ID)
+        
+        # Sans la liste complète des membres, on ne juge pas qui est parti
+        membres_presents = {m.id for m in guild.members} if guild and guild.chunked else None
+        
+        # Pas de thread ici : les commandes écrivent dans les mêmes fichiers
+        nb = archiver_membres_inactifs(membres_presents, DUREE_INACTIVITE_ARCHIVAGE)
+        metriques.incrementer("archive.membres_archives", nb)
+    
+    @archiver_inactifs.before_loop
+    async def avant_archivage(self):
+        """Attend que le bot soit prêt avant de démarrer la tâche."""
+        await self.bot.wait_until_ready()
 
 
 # ============================================
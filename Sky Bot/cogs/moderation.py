@@ -2,16 +2,51 @@
 # 🛡️ COG MODÉRATION
 # ============================================
 # Ce module gère les commandes de modération :
-# - /clear : Supprime entre 1 et 100 messages
-# - /clear-salon : Supprime et recrée le salon
+# - /clear : Supprime des messages (avec filtres : membre, bots, texte...)
+# - /purge-membre : Supprime les messages récents d'un membre dans tous les salons
+# - /clear-salon : Supprime et recrée le salon, ou toute une catégorie
+#   (avec archive optionnelle)
 # ============================================
 
+import asyncio
+import os
+import re
+import time
+from datetime import datetime, timedelta, timezone
+
 import discord
 from discord.ext import commands
 from discord import app_commands
 
 from config import GUILD_ID
-from utils.embeds import embed_succes, embed_erreur, embed_info
+from utils.embeds import embed_succes, embed_erreur, embed_info, embed_attente, formater_nombre
+from utils.purge import FiltrePurge, ResultatPurge, purger_salon, purger_salons
+from utils.archivage import ResultatArchive, archiver_salon
+from utils.recreation import SuppressionImpossible, recreer_categorie
+
+
+# ============================================
+# ⚙️ CONFIGURATION
+# ============================================
+
+# Nombre maximum de messages supprimés par un /clear
+NB_MAX_CLEAR = 10000
+
+# Nombre maximum de messages parcourus par un /clear (utile avec des filtres)
+LIMITE_ANALYSE_CLEAR = 50000
+
+# /clear : durée maximum de la suppression (secondes)
+# Doit rester sous 15 minutes : après, Discord refuse de modifier la réponse de la commande.
+DUREE_MAX_CLEAR = 600
+
+# /purge-membre : messages supprimés au maximum par salon
+NB_MAX_PURGE_MEMBRE_SALON = 5000
+
+# /purge-membre : durée maximum de la suppression, tous salons confondus (secondes)
+DUREE_MAX_PURGE_MEMBRE = 600
+
+# /clear-salon d'une catégorie : nombre de salons archivés en même temps
+NB_ARCHIVES_SIMULTANEES = 3
 
 
 class Moderation(commands.Cog):
@@ -30,33 +65,93 @@ class Moderation(commands.Cog):
         description="[ADMIN] Supprime un nombre de messages dans le salon"
     )
     @app_commands.describe(
-        nombre="Nombre de messages à supprimer (1-100)"
+        nombre=f"Nombre de messages à supprimer (1-{NB_MAX_CLEAR})",
+        membre="Seulement les messages de ce membre",
+        bots="Seulement les messages des bots",
+        contient="Seulement les messages qui contiennent ce texte (expression régulière)",
+        pieces_jointes="Seulement les messages avec une pièce jointe",
+        depuis_heures="Seulement les messages des X dernières heures",
+        avant_heures="Seulement les messages envoyés il y a plus de X heures"
     )
     @app_commands.default_permissions(administrator=True)
     @app_commands.guilds(discord.Object(id=GUILD_ID))
     async def clear(
         self,
         interaction: discord.Interaction,
-        nombre: app_commands.Range[int, 1, 100]
+        nombre: app_commands.Range[int, 1, NB_MAX_CLEAR],
+        membre: discord.User = None,
+        bots: bool = False,
+        contient: str = None,
+        pieces_jointes: bool = False,
+        depuis_heures: app_commands.Range[int, 1, 87600] = None,
+        avant_heures: app_commands.Range[int, 1, 87600] = None
     ):
         """
-        Supprime entre 1 et 100 messages récents du salon.
-        Note Discord : seuls les messages de moins de 14 jours peuvent être supprimés en masse.
+        Supprime les messages du salon qui correspondent aux filtres, du plus récent au plus ancien.
+        L'historique est parcouru petit à petit : le nombre de messages n'est pas limité à 100.
+        Note Discord : les messages de plus de 14 jours sont supprimés un par un (plus lent).
+        La suppression s'arrête après DUREE_MAX_CLEAR secondes.
         """
+        motif = None
+        if contient:
+            try:
+                motif = re.compile(contient, re.IGNORECASE)
+            except re.error as e:
+                embed = embed_erreur("Expression invalide", f"Le filtre `contient` est invalide : {e}")
+                return await interaction.response.send_message(embed=embed, ephemeral=True)
+        
+        maintenant = datetime.now(timezone.utc)
+        filtre = FiltrePurge(
+            auteur_id=membre.id if membre else None,
+            bots=bots,
+            motif=motif,
+            pieces_jointes=pieces_jointes,
+            apres=maintenant - timedelta(hours=depuis_heures) if depuis_heures else None,
+            avant=maintenant - timedelta(hours=avant_heures) if avant_heures else None
+        )
+        
         await interaction.response.defer(ephemeral=True)
         
+        async def progression(resultat: ResultatPurge):
+            embed = embed_attente(
+                "Suppression en cours...",
+                f"🔎 **{formater_nombre(resultat.analyses)}** message(s) parcouru(s)\n"
+                f"🧹 **{formater_nombre(resultat.supprimes)}** / {formater_nombre(nombre)} supprimé(s)"
+            )
+            try:
+                await interaction.edit_original_response(embed=embed)
+            except discord.HTTPException:
+                pass
+        
         try:
-            # purge() supprime les messages en masse (max 14 jours d'ancienneté)
-            messages_supprimes = await interaction.channel.purge(limit=nombre)
+            resultat = await purger_salon(
+                interaction.channel,
+                filtre,
+                nombre_max=nombre,
+                limite_analyse=LIMITE_ANALYSE_CLEAR,
+                progression=progression,
+                raison=f"Clear par {interaction.user.name}",
+                echeance=time.monotonic() + DUREE_MAX_CLEAR
+            )
             
-            nb = len(messages_supprimes)
+            nb = resultat.supprimes
+            details = f"🔎 {formater_nombre(resultat.analyses)} message(s) parcouru(s)"
+            if resultat.anciens:
+                details += f"\n🐢 Dont {formater_nombre(resultat.anciens)} de plus de 14 jours (supprimés un par un)"
+            if resultat.echecs:
+                details += f"\n⚠️ {formater_nombre(resultat.echecs)} message(s) n'ont pas pu être supprimés"
+            if resultat.interrompu:
+                details += (
+                    "\n\n⏱️ Temps maximum atteint : tout n'a pas été parcouru. "
+                    "Relance la commande pour continuer."
+                )
             
             embed = embed_succes(
                 "Messages supprimés !",
-                f"🧹 **{nb}** message{'s' if nb > 1 else ''} "
-                f"{'ont été supprimés' if nb > 1 else 'a été supprimé'} dans ce salon."
+                f"🧹 **{formater_nombre(nb)}** message{'s' if nb > 1 else ''} "
+                f"{'ont été supprimés' if nb > 1 else 'a été supprimé'} dans ce salon.\n\n{details}"
             )
-            await interaction.followup.send(embed=embed, ephemeral=True)
+            await interaction.edit_original_response(embed=embed)
         
         except discord.Forbidden:
             embed = embed_erreur(
@@ -64,38 +159,145 @@ class Moderation(commands.Cog):
                 "Je n'ai pas la permission de supprimer des messages dans ce salon !\n"
                 "Vérifie que j'ai la permission **Gérer les messages**."
             )
-            await interaction.followup.send(embed=embed, ephemeral=True)
+            await interaction.edit_original_response(embed=embed)
         
         except discord.HTTPException as e:
             embed = embed_erreur(
                 "Erreur",
-                f"Une erreur s'est produite : {e}\n\n"
-                "💡 **Note :** Discord ne permet pas de supprimer en masse "
-                "des messages de plus de **14 jours**."
+                f"Une erreur s'est produite : {e}"
+            )
+            await interaction.edit_original_response(embed=embed)
+    
+    # ================================
+    # 🧽 COMMANDE /purge-membre
+    # ================================
+    @app_commands.command(
+        name="purge-membre",
+        description="[ADMIN] Supprime les messages récents d'un membre dans tous les salons"
+    )
+    @app_commands.describe(
+        membre="Le membre dont les messages seront supprimés",
+        heures="Supprime ses messages des X dernières heures (max 14 jours)"
+    )
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    async def purge_membre(
+        self,
+        interaction: discord.Interaction,
+        membre: discord.User,
+        heures: app_commands.Range[int, 1, 336] = 24
+    ):
+        """
+        Après un raid : parcourt tous les salons (et fils actifs) en parallèle
+        et supprime les messages du membre par paquets de 100.
+        La suppression s'arrête après DUREE_MAX_PURGE_MEMBRE secondes.
+        """
+        await interaction.response.defer(ephemeral=True)
+        
+        guild = interaction.guild
+        
+        # Seulement les salons où le bot peut lire l'historique et supprimer
+        salons = []
+        for salon in [*guild.text_channels, *guild.threads]:
+            permissions = self.bot.permissions.permissions(salon, guild.me)
+            if permissions.read_message_history and permissions.manage_messages:
+                salons.append(salon)
+        
+        filtre = FiltrePurge(
+            auteur_id=membre.id,
+            apres=datetime.now(timezone.utc) - timedelta(hours=heures)
+        )
+        
+        def totaux(resultats: dict) -> tuple[int, int]:
+            return (
+                sum(r.analyses for r in resultats.values()),
+                sum(r.supprimes for r in resultats.values())
+            )
+        
+        async def progression(resultats: dict, termines: int):
+            analyses, supprimes = totaux(resultats)
+            embed = embed_attente(
+                f"Suppression des messages de {membre}...",
+                f"📂 **{termines}** / {len(salons)} salon(s) terminé(s)\n"
+                f"🔎 **{formater_nombre(analyses)}** message(s) parcouru(s)\n"
+                f"🧹 **{formater_nombre(supprimes)}** message(s) supprimé(s)"
+            )
+            try:
+                await interaction.edit_original_response(embed=embed)
+            except discord.HTTPException:
+                pass
+        
+        debut = datetime.now(timezone.utc)
+        resultats = await purger_salons(
+            salons,
+            filtre,
+            nombre_max_par_salon=NB_MAX_PURGE_MEMBRE_SALON,
+            duree_max=DUREE_MAX_PURGE_MEMBRE,
+            progression=progression,
+            raison=f"Purge de {membre} par {interaction.user.name}"
+        )
+        duree = (datetime.now(timezone.utc) - debut).total_seconds()
+        
+        analyses, supprimes = totaux(resultats)
+        
+        # Salons les plus touchés
+        par_salon = sorted(
+            ((salon_id, r.supprimes) for salon_id, r in resultats.items() if r.supprimes),
+            key=lambda x: x[1], reverse=True
+        )
+        lignes = [f"<#{salon_id}> : **{formater_nombre(nb)}**" for salon_id, nb in par_salon[:10]]
+        if len(par_salon) > 10:
+            lignes.append(f"… et {len(par_salon) - 10} autre(s) salon(s)")
+        
+        erreurs = sum(1 for r in resultats.values() if r.erreur is not None)
+        interrompus = sum(1 for r in resultats.values() if r.interrompu)
+        
+        description = (
+            f"🧹 **{formater_nombre(supprimes)}** message(s) de {membre.mention} supprimé(s) "
+            f"({formater_nombre(analyses)} parcourus dans {len(salons)} salon(s), {duree:.0f}s)"
+        )
+        if lignes:
+            description += "\n\n" + "\n".join(lignes)
+        if interrompus:
+            description += (
+                f"\n\n⏱️ Temps maximum atteint : {interrompus} salon(s) pas entièrement parcouru(s). "
+                "Relance la commande pour continuer."
             )
-            await interaction.followup.send(embed=embed, ephemeral=True)
+        if erreurs:
+            description += f"\n\n⚠️ {erreurs} salon(s) en erreur (permissions ?)"
+        
+        await interaction.edit_original_response(embed=embed_succes("Purge terminée !", description))
     
     # ================================
     # 💣 COMMANDE /clear-salon
     # ================================
     @app_commands.command(
         name="clear-salon",
-        description="[ADMIN] Vide entièrement un salon en le recréant à l'identique"
+        description="[ADMIN] Vide entièrement un salon (ou une catégorie) en le recréant à l'identique"
     )
     @app_commands.describe(
-        confirmation="Tape 'confirmer' pour valider (action irréversible !)"
+        confirmation="Tape 'confirmer' pour valider (action irréversible !)",
+        archiver="Sauvegarde d'abord tout l'historique dans un fichier compressé",
+        categorie="Vide TOUS les salons textuels de cette catégorie (au lieu du salon actuel)"
     )
     @app_commands.default_permissions(administrator=True)
     @app_commands.guilds(discord.Object(id=GUILD_ID))
     async def clear_salon(
         self,
         interaction: discord.Interaction,
-        confirmation: str
+        confirmation: str,
+        archiver: bool = False,
+        categorie: discord.CategoryChannel = None
     ):
         """
         Supprime le salon et le recrée au même endroit avec les mêmes
         permissions, catégorie, topic, slowmode, NSFW, etc.
         C'est la méthode la plus efficace pour vider TOUS les messages.
+        
+        Avec archiver=True, l'historique est d'abord écrit dans data/archives/
+        (si l'archive échoue, le salon n'est pas touché).
+        
+        Avec une catégorie, tous ses salons textuels sont recréés (voir _clear_categorie).
         """
         # Vérifie la confirmation
         if confirmation.lower() != "confirmer":
@@ -108,11 +310,14 @@ class Moderation(commands.Cog):
             )
             return await interaction.response.send_message(embed=embed, ephemeral=True)
         
+        if categorie is not None:
+            return await self._clear_categorie(interaction, categorie, archiver)
+        
         salon = interaction.channel
         
         # Sauvegarde toutes les propriétés du salon
         nom = salon.name
-        categorie = salon.category
+        categorie_salon = salon.category
         position = salon.position
         topic = salon.topic
         slowmode = salon.slowmode_delay
@@ -121,11 +326,35 @@ class Moderation(commands.Cog):
         
         await interaction.response.defer(ephemeral=True)
         
+        archive = None
+        if archiver:
+            async def progression(resultat: ResultatArchive):
+                embed = embed_attente(
+                    "Archivage en cours...",
+                    f"📦 **{formater_nombre(resultat.messages)}** message(s) archivé(s)"
+                )
+                try:
+                    await interaction.edit_original_response(embed=embed)
+                except discord.HTTPException:
+                    pass
+            
+            try:
+                archive = await archiver_salon(salon, progression=progression)
+                print(f"📦 Clear-salon : #{nom} archivé ({archive.messages} messages) dans {archive.chemin}")
+            except Exception as e:
+                # Quelle que soit l'erreur, le salon n'est pas vidé sans archive complète
+                print(f"❌ Clear-salon : archivage de #{nom} impossible : {e!r}")
+                embed = embed_erreur(
+                    "Archivage impossible",
+                    f"Le salon n'a pas été vidé.\nUne erreur s'est produite : {e}"
+                )
+                return await interaction.edit_original_response(embed=embed)
+        
         try:
             # Crée le nouveau salon avec les mêmes propriétés
             nouveau_salon = await salon.guild.create_text_channel(
                 name=nom,
-                category=categorie,
+                category=categorie_salon,
                 topic=topic,
                 slowmode_delay=slowmode,
                 nsfw=nsfw,
@@ -138,12 +367,18 @@ class Moderation(commands.Cog):
             await salon.delete(reason=f"Clear-salon par {interaction.user.name}")
             
             # Envoie un message de confirmation dans le nouveau salon
-            embed = embed_succes(
-                "Salon vidé !",
+            description = (
                 f"🧹 Le salon **#{nom}** a été vidé avec succès !\n\n"
                 f"📋 Toutes les permissions ont été conservées.\n"
-                f"👤 Action effectuée par {interaction.user.mention}"
             )
+            if archive is not None:
+                description += (
+                    f"📦 {formater_nombre(archive.messages)} message(s) archivé(s) "
+                    f"dans `{os.path.basename(archive.chemin)}`\n"
+                )
+            description += f"👤 Action effectuée par {interaction.user.mention}"
+            
+            embed = embed_succes("Salon vidé !", description)
             await nouveau_salon.send(embed=embed)
         
         except discord.Forbidden:
@@ -166,6 +401,98 @@ class Moderation(commands.Cog):
                 await interaction.followup.send(embed=embed, ephemeral=True)
             except:
                 pass
+    
+    async def _clear_categorie(
+        self,
+        interaction: discord.Interaction,
+        categorie: discord.CategoryChannel,
+        archiver: bool
+    ):
+        """
+        /clear-salon sur tous les salons textuels d'une catégorie :
+        archive optionnelle (plusieurs salons à la fois), puis recréation
+        en parallèle et remise en ordre en une seule requête (utils/recreation.py).
+        """
+        salons = categorie.text_channels
+        if not salons:
+            embed = embed_erreur("Catégorie vide", f"La catégorie **{categorie.name}** n'a aucun salon textuel.")
+            return await interaction.response.send_message(embed=embed, ephemeral=True)
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        async def afficher(titre: str, texte: str):
+            try:
+                await interaction.edit_original_response(embed=embed_attente(titre, texte))
+            except discord.HTTPException:
+                pass
+        
+        nb_archives = 0
+        if archiver:
+            await afficher("Archivage en cours...", f"📦 Archivage de **{len(salons)}** salon(s)...")
+            
+            semaphore = asyncio.Semaphore(NB_ARCHIVES_SIMULTANEES)
+            
+            async def archiver_un(salon: discord.TextChannel) -> ResultatArchive:
+                async with semaphore:
+                    return await archiver_salon(salon)
+            
+            archives = await asyncio.gather(*(archiver_un(s) for s in salons), return_exceptions=True)
+            erreurs = [(s, a) for s, a in zip(salons, archives) if isinstance(a, BaseException)]
+            if erreurs:
+                salon, erreur = erreurs[0]
+                embed = embed_erreur(
+                    "Archivage impossible",
+                    f"Aucun salon n'a été vidé.\n"
+                    f"{len(erreurs)} salon(s) en erreur, dont #{salon.name} : {erreur}"
+                )
+                return await interaction.edit_original_response(embed=embed)
+            
+            nb_archives = sum(archive.messages for archive in archives)
+            for archive in archives:
+                print(f"📦 Clear-salon : {archive.messages} messages archivés dans {archive.chemin}")
+        
+        async def progression(termines: int, total: int):
+            await afficher("Recréation en cours...", f"♻️ **{termines}** / {total} salon(s) recréé(s)")
+        
+        resultats = await recreer_categorie(
+            self.bot,
+            categorie,
+            raison=f"Clear-salon de la catégorie {categorie.name} par {interaction.user.name}",
+            progression=progression
+        )
+        
+        recrees = {ancien_id: r for ancien_id, r in resultats.items() if isinstance(r, discord.TextChannel)}
+        non_supprimes = [r for r in resultats.values() if isinstance(r, SuppressionImpossible)]
+        erreurs = [
+            r for r in resultats.values()
+            if isinstance(r, Exception) and not isinstance(r, SuppressionImpossible)
+        ]
+        
+        description = (
+            f"🧹 **{len(recrees)}** / {len(salons)} salon(s) de **{categorie.name}** vidé(s) !\n\n"
+            f"📋 Permissions, sujets, slowmode et NSFW conservés.\n"
+        )
+        if archiver:
+            description += f"📦 {formater_nombre(nb_archives)} message(s) archivé(s) dans `data/archives`.\n"
+        if erreurs:
+            description += f"⚠️ {len(erreurs)} salon(s) n'ont pas pu être recréés (ils n'ont pas été supprimés) : {erreurs[0]}\n"
+        if non_supprimes:
+            description += (
+                f"⚠️ {len(non_supprimes)} salon(s) n'ont pas pu être supprimés : ils existent encore "
+                f"avec leur historique, à côté de leur copie. {non_supprimes[0]}\n"
+            )
+        description += f"👤 Action effectuée par {interaction.user.mention}"
+        embed = embed_succes("Catégorie vidée !", description)
+        
+        # Le salon de la commande a peut-être été recréé : la confirmation va dans le nouveau
+        nouveau_salon = recrees.get(interaction.channel_id)
+        if nouveau_salon is not None:
+            await nouveau_salon.send(embed=embed)
+        else:
+            try:
+                await interaction.edit_original_response(embed=embed)
+            except discord.HTTPException:
+                pass
 
 
 async def setup(bot):
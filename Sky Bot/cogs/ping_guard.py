@@ -2,7 +2,8 @@
 # 🛡️ PROTECTION ANTI-PING POUR SKY
 # ============================================
 # Ce module supprime automatiquement les messages
-# qui mentionnent Sky.
+# qui mentionnent Sky (ou un autre membre protégé,
+# voir UTILISATEURS_PROTEGES).
 #
 # Important :
 # Discord envoie souvent la notification AVANT que
@@ -11,9 +12,18 @@
 # mais il peut supprimer le message très vite.
 # ============================================
 
+import asyncio
+import re
+import time
+from collections import OrderedDict, deque
+from datetime import timedelta
+
 import discord
 from discord.ext import commands
 
+from utils.aiguillage import MessageRecu
+from utils.metriques import metriques
+
 
 # ============================================
 # ⚙️ CONFIGURATION
@@ -25,11 +35,138 @@ SKY_ID = 1340405386318053388
 # Si True, les admins/modérateurs ne sont pas supprimés
 IGNORER_MODERATEURS = True
 
+# Membres protégés : {ID Discord: règles de protection}
+# - "nom" : affiché dans les logs
+# - "ignorer_moderateurs" : les admins/modos peuvent le mentionner
+# - "reponses" : supprime aussi les réponses qui le notifient (@ activé)
+UTILISATEURS_PROTEGES = {
+    SKY_ID: {
+        "nom": "Sky",
+        "ignorer_moderateurs": IGNORER_MODERATEURS,
+        "reponses": True,
+    },
+}
+
+# Toutes les mentions d'utilisateur du texte : <@123...> ou <@!123...>
+# Chaque ID trouvé est cherché dans UTILISATEURS_PROTEGES (dictionnaire) :
+# le coût ne dépend pas du nombre de membres protégés.
+MOTIF_MENTION = re.compile(r"<@!?(\d+)>")
+
+# Nombre de messages récents (avec mention) dont on retient l'empreinte du texte,
+# pour ignorer les éditions qui ne changent pas le texte (aperçus de liens...).
+# Les autres messages sont comparés au cache de discord.py, sinon vérifiés sur le texte brut.
+TAILLE_CACHE_EDITIONS = 5000
+
+# --- MODE RAID ---
+# Si SEUIL_RAID messages sont supprimés en moins de FENETRE_RAID secondes
+# dans un salon, il passe en mode raid : les messages à supprimer sont
+# regroupés pendant DELAI_REGROUPEMENT_RAID secondes puis supprimés
+# par paquets de 100 (une seule requête à Discord par paquet).
+SEUIL_RAID = 5
+FENETRE_RAID = 10
+DELAI_REGROUPEMENT_RAID = 1.5
+
+# Le salon repasse en mode normal après ce temps sans message supprimé (secondes)
+DUREE_MODE_RAID = 60
+
+# Exclusion temporaire (timeout) des membres qui recommencent pendant un raid
+# Mets EXCLURE_RECIDIVISTES = False pour désactiver
+EXCLURE_RECIDIVISTES = True
+SEUIL_RECIDIVE = 3              # messages supprimés pendant le raid
+DUREE_EXCLUSION_RAID = 600      # 10 minutes
+
 # Si tu veux un salon de logs, mets son ID ici.
 # Exemple : SALON_LOG_ID = 123456789012345678
 # Laisse None pour désactiver les logs.
 SALON_LOG_ID = None
 
+# Les suppressions sont résumées dans un seul message de log,
+# mis à jour toutes les INTERVALLE_RESUME_LOGS secondes.
+# Après DUREE_RESUME_LOGS secondes, un nouveau message de résumé est commencé.
+INTERVALLE_RESUME_LOGS = 10
+DUREE_RESUME_LOGS = 300
+
+# Nombre d'auteurs / salons listés et d'exemples détaillés dans un résumé
+NB_LIGNES_RESUME = 10
+NB_EXEMPLES_RESUME = 5
+
+
+# ============================================
+# 🚨 ÉTAT D'UN SALON (MODE RAID)
+# ============================================
+
+class _EtatSalon:
+    """Suivi des suppressions récentes d'un salon."""
+
+    def __init__(self):
+        # Horodatages des suppressions des FENETRE_RAID dernières secondes
+        self.suppressions: deque[float] = deque()
+        # Le mode raid dure jusqu'à cette date (time.monotonic())
+        self.raid_jusqua = 0.0
+        # Messages en attente de suppression groupée : (message, événement, noms, reçu à)
+        self.tampon: list[tuple[discord.Message, str, str, float]] = []
+        # {auteur_id: nombre de messages supprimés pendant le raid}
+        self.recidives: dict[int, int] = {}
+        self.exclus: set[int] = set()
+        self.tache: asyncio.Task | None = None
+
+
+# ============================================
+# 📝 RÉSUMÉ DES LOGS
+# ============================================
+
+class _ResumeLogs:
+    """Suppressions regroupées dans un même message de log."""
+
+    def __init__(self):
+        self.debut = time.monotonic()
+        self.horodatage = int(time.time())
+        self.total = 0
+        # {(auteur, auteur_id): nombre}, {mention du salon: nombre}
+        self.par_auteur: dict[tuple[str, int], int] = {}
+        self.par_salon: dict[str, int] = {}
+        self.exemples: list[str] = []
+        # Message de log déjà envoyé pour ce résumé (modifié ensuite)
+        self.message: discord.Message | None = None
+        self.modifie = False
+
+    def ajouter(self, message: discord.Message, evenement: str, noms: str):
+        auteur = (str(message.author), message.author.id)
+        self.par_auteur[auteur] = self.par_auteur.get(auteur, 0) + 1
+        salon = message.channel.mention
+        self.par_salon[salon] = self.par_salon.get(salon, 0) + 1
+        self.total += 1
+        self.modifie = True
+
+        if len(self.exemples) < NB_EXEMPLES_RESUME:
+            self.exemples.append(
+                f"• `{message.author}` dans {salon} — protégé(s) : {noms} — `{evenement}`"
+            )
+
+    def texte(self) -> str:
+        """Le contenu du message de log (limité à 2000 caractères par Discord)."""
+        auteurs = sorted(self.par_auteur.items(), key=lambda x: x[1], reverse=True)
+        salons = sorted(self.par_salon.items(), key=lambda x: x[1], reverse=True)
+
+        lignes = [
+            f"🛡️ **PingGuard** — depuis <t:{self.horodatage}:T>",
+            f"**{self.total}** message(s) supprimé(s)",
+            "",
+            "**Auteurs :**",
+            *(f"`{nom}` / `{user_id}` : **{nombre}**" for (nom, user_id), nombre in auteurs[:NB_LIGNES_RESUME]),
+        ]
+        if len(auteurs) > NB_LIGNES_RESUME:
+            lignes.append(f"… et {len(auteurs) - NB_LIGNES_RESUME} autre(s)")
+
+        lignes += ["", "**Salons :**", *(f"{salon} : **{nombre}**" for salon, nombre in salons[:NB_LIGNES_RESUME])]
+        if len(salons) > NB_LIGNES_RESUME:
+            lignes.append(f"… et {len(salons) - NB_LIGNES_RESUME} autre(s)")
+
+        lignes += ["", "**Exemples :**", *self.exemples]
+
+        texte = "\n".join(lignes)
+        return texte if len(texte) <= 2000 else texte[:1997] + "…"
+
 
 # ============================================
 # 🧠 COG PRINCIPAL
@@ -38,36 +175,178 @@ SALON_LOG_ID = None
 class PingGuard(commands.Cog):
     """
     Cog qui surveille les messages et supprime ceux
-    qui mentionnent Sky.
+    qui mentionnent un membre protégé.
     """
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+        # message_id -> empreinte (hash) du dernier texte vu, du plus ancien au plus récent
+        self._empreintes: OrderedDict[int, int] = OrderedDict()
+
+        # salon_id -> suivi du mode raid
+        self._salons: dict[int, _EtatSalon] = {}
+
+        # Résumé des logs en cours et salon de logs (cherché une seule fois)
+        self._resume: _ResumeLogs | None = None
+        # Résumé fermé dont la dernière publication est en cours
+        self._resume_ferme: _ResumeLogs | None = None
+        self._tache_resume: asyncio.Task | None = None
+        self._salon_log_cache: discord.TextChannel | None = None
+
+    async def cog_load(self):
+        # Seuls les messages qui mentionnent quelqu'un sont transmis par l'aiguillage du bot
+        self.bot.aiguillage.enregistrer("pingguard", self._sur_message, mention=True)
+
+    async def cog_unload(self):
+        """Arrête les suppressions groupées, puis publie ce qui reste du résumé des logs."""
+        self.bot.aiguillage.retirer("pingguard")
+        for etat in self._salons.values():
+            if etat.tache:
+                etat.tache.cancel()
+
+        if self._tache_resume:
+            self._tache_resume.cancel()
+            # Attend l'arrêt de la boucle : elle peut être en train de publier
+            try:
+                await self._tache_resume
+            except asyncio.CancelledError:
+                pass
+
+        # Suppressions enregistrées depuis la dernière publication
+        for resume in (self._resume_ferme, self._resume):
+            if resume is not None and resume.modifie:
+                try:
+                    await self._publier_resume(resume)
+                except discord.HTTPException as erreur:
+                    print(f"❌ PingGuard : impossible d'envoyer le résumé des logs : {erreur}")
+
     # ============================================
     # 📩 MESSAGE CRÉÉ
     # ============================================
+    # Appelé par l'aiguillage du bot (utils/aiguillage.py) pour les
+    # messages des serveurs qui contiennent une mention.
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        await self._traiter_message(message, evenement="création")
+    async def _sur_message(self, message_recu: MessageRecu):
+        message = message_recu.message
+        self._memoriser_empreinte(message.id, hash(message_recu.contenu))
+        await self._traiter_message(message, evenement="création", recu=message_recu.recu)
 
     # ============================================
     # ✏️ MESSAGE MODIFIÉ
     # ============================================
+    # on_raw_message_edit reçoit TOUTES les éditions, même celles
+    # des messages qui ne sont plus dans le cache de discord.py
+    # (contrairement à on_message_edit).
 
     @commands.Cog.listener()
-    async def on_message_edit(self, ancien_message: discord.Message, nouveau_message: discord.Message):
-        await self._traiter_message(nouveau_message, evenement="édition")
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        recu = time.time()
+        if payload.guild_id is None:
+            return
+
+        contenu = payload.data.get("content")
+
+        # Mise à jour sans texte : rien de nouveau à vérifier
+        if contenu is None:
+            return
+
+        # Texte identique (aperçu de lien ajouté, message épinglé...) : déjà vérifié
+        empreinte = hash(contenu)
+        ancienne = self._empreintes.get(payload.message_id)
+        if ancienne is None and payload.cached_message is not None:
+            ancienne = hash(payload.cached_message.content)
+        self._memoriser_empreinte(payload.message_id, empreinte)
+
+        if ancienne == empreinte:
+            return
+
+        # Vérification sur le payload brut : le message n'est construit
+        # (ou récupéré auprès de Discord) que s'il mentionne un membre protégé
+        if not self._mention_protegee_brute(payload.data, contenu):
+            return
+
+        message = getattr(payload, "message", None)  # Fourni par discord.py 2.5+
+
+        if message is None:
+            salon = self.bot.get_channel(payload.channel_id)
+            if salon is None:
+                return
+            try:
+                message = await salon.fetch_message(payload.message_id)
+            except discord.HTTPException:
+                return
+
+        await self._traiter_message(message, evenement="édition", recu=recu)
+
+    def _memoriser_empreinte(self, message_id: int, empreinte: int):
+        """Retient l'empreinte du texte d'un message (taille limitée)."""
+        self._empreintes[message_id] = empreinte
+        self._empreintes.move_to_end(message_id)
+        if len(self._empreintes) > TAILLE_CACHE_EDITIONS:
+            self._empreintes.popitem(last=False)
+
+    @staticmethod
+    def _mention_protegee_brute(donnees: dict, contenu: str) -> bool:
+        """
+        Vérifie sur les données brutes de Discord si un membre protégé est notifié.
+        """
+
+        if "<@" in contenu:
+            for user_id in MOTIF_MENTION.findall(contenu):
+                if int(user_id) in UTILISATEURS_PROTEGES:
+                    return True
+
+        # Réponse avec @ activé : la personne notifiée est dans "mentions"
+        if donnees.get("message_reference"):
+            for utilisateur in donnees.get("mentions", ()):
+                if int(utilisateur["id"]) in UTILISATEURS_PROTEGES:
+                    return True
+
+        return False
 
     # ============================================
     # 🔍 TRAITEMENT PRINCIPAL
     # ============================================
 
-    async def _traiter_message(self, message: discord.Message, evenement: str):
+    def _cibles_mentionnees(self, message: discord.Message) -> dict[int, dict]:
+        """
+        Retourne les membres protégés notifiés par le message : {ID: règles}.
+        """
+
+        contenu = message.content or ""
+        cibles = {}
+
+        # Filtre rapide : la plupart des messages ne contiennent aucune mention
+        if "<@" in contenu:
+            for user_id in MOTIF_MENTION.findall(contenu):
+                regles = UTILISATEURS_PROTEGES.get(int(user_id))
+                if regles is not None:
+                    cibles[int(user_id)] = regles
+
+        # Réponse avec @ activé : la mention n'apparaît pas dans le texte
+        reference = message.reference
+        if reference is not None and isinstance(reference.resolved, discord.Message):
+            auteur_id = reference.resolved.author.id
+            regles = UTILISATEURS_PROTEGES.get(auteur_id)
+            if (
+                regles is not None
+                and regles.get("reponses", True)
+                and any(utilisateur.id == auteur_id for utilisateur in message.mentions)
+            ):
+                cibles[auteur_id] = regles
+
+        # Un membre protégé peut évidemment se mentionner lui-même
+        cibles.pop(message.author.id, None)
+        return cibles
+
+    async def _traiter_message(self, message: discord.Message, evenement: str, recu: float):
         """
-        Vérifie si un message ping Sky.
+        Vérifie si un message ping un membre protégé.
         Si oui, le bot tente de le supprimer.
+
+        Arguments:
+            recu: Le moment où le bot a reçu l'événement (time.time())
         """
 
         try:
@@ -75,30 +354,26 @@ class PingGuard(commands.Cog):
             if message.guild is None:
                 return
 
-            # Ignore les messages du bot lui-même
-            if self.bot.user and message.author.id == self.bot.user.id:
-                return
+            cibles = self._cibles_mentionnees(message)
 
-            # Sky peut évidemment se mentionner elle-même
-            if message.author.id == SKY_ID:
+            if not cibles:
                 return
 
-            # Vérifie si Sky est mentionnée directement
-            sky_mentionnee = any(utilisateur.id == SKY_ID for utilisateur in message.mentions)
-
-            # Fallback robuste au cas où Discord ne remplit pas bien message.mentions
-            # Exemples possibles : <@134...> ou <@!134...>
-            contenu = message.content or ""
-            sky_mentionnee_texte = (
-                f"<@{SKY_ID}>" in contenu
-                or f"<@!{SKY_ID}>" in contenu
-            )
+            # Temps entre l'envoi du message (date de son ID) et sa réception par le bot
+            if evenement == "création":
+                metriques.mesurer(
+                    "pingguard.reception_ms",
+                    (recu - message.created_at.timestamp()) * 1000,
+                    detail=str(message.channel.id)
+                )
 
-            if not sky_mentionnee and not sky_mentionnee_texte:
+            # Ignore les messages du bot lui-même
+            if self.bot.user and message.author.id == self.bot.user.id:
                 return
 
             # Option : ne pas supprimer les messages des modos/admins
-            if IGNORER_MODERATEURS:
+            # (seulement si TOUS les membres mentionnés l'autorisent)
+            if all(regles.get("ignorer_moderateurs", IGNORER_MODERATEURS) for regles in cibles.values()):
                 est_modo = await self._auteur_est_moderateur(message)
                 if est_modo:
                     return
@@ -109,26 +384,29 @@ class PingGuard(commands.Cog):
             if membre_bot is None:
                 return
 
-            permissions_bot = message.channel.permissions_for(membre_bot)
+            # Permissions gardées en cache par le bot (l'absence est signalée une fois par salon)
+            if not self.bot.permissions.verifier(message.channel, membre_bot, "manage_messages", "PingGuard"):
+                return
 
-            if not permissions_bot.manage_messages:
-                print(
-                    f"⚠️ PingGuard : permission 'Gérer les messages' manquante "
-                    f"dans le salon #{message.channel}."
-                )
+            noms = ", ".join(regles.get("nom", str(user_id)) for user_id, regles in cibles.items())
+
+            # Salon en raid : le message sera supprimé avec les autres, en un seul appel
+            if self._signaler_suppression(message, evenement, noms, recu):
                 return
 
             # Supprime le message
             await message.delete()
+            self._mesurer_suppression(message, evenement, recu)
 
             print(
                 f"🛡️ PingGuard : message supprimé | "
                 f"Auteur: {message.author} ({message.author.id}) | "
                 f"Salon: #{message.channel} | "
+                f"Protégé(s): {noms} | "
                 f"Événement: {evenement}"
             )
 
-            await self._journaliser_suppression(message, evenement)
+            self._journaliser_suppression(message, evenement, noms)
 
         except discord.NotFound:
             # Le message a déjà été supprimé
@@ -143,6 +421,146 @@ class PingGuard(commands.Cog):
         except Exception as erreur:
             print(f"❌ PingGuard : erreur inattendue : {erreur}")
 
+    # ============================================
+    # 🚨 MODE RAID
+    # ============================================
+
+    def _signaler_suppression(self, message: discord.Message, evenement: str, noms: str, recu: float) -> bool:
+        """
+        Compte une suppression dans le salon et active le mode raid si besoin.
+
+        Retourne:
+            True si le message a été mis de côté pour une suppression groupée,
+            False s'il doit être supprimé tout de suite (mode normal)
+        """
+        etat = self._salons.get(message.channel.id)
+        if etat is None:
+            etat = self._salons[message.channel.id] = _EtatSalon()
+
+        maintenant = time.monotonic()
+        etat.suppressions.append(maintenant)
+        while maintenant - etat.suppressions[0] > FENETRE_RAID:
+            etat.suppressions.popleft()
+
+        if maintenant >= etat.raid_jusqua:
+            if len(etat.suppressions) < SEUIL_RAID:
+                return False
+
+            print(f"🚨 PingGuard : mode raid activé dans #{message.channel}")
+            etat.recidives.clear()
+            etat.exclus.clear()
+
+        etat.raid_jusqua = maintenant + DUREE_MODE_RAID
+        etat.tampon.append((message, evenement, noms, recu))
+        etat.recidives[message.author.id] = etat.recidives.get(message.author.id, 0) + 1
+
+        if etat.tache is None or etat.tache.done():
+            etat.tache = asyncio.create_task(self._boucle_raid(message.channel, etat))
+
+        return True
+
+    async def _boucle_raid(self, salon: discord.abc.Messageable, etat: _EtatSalon):
+        """Supprime les messages regroupés jusqu'à la fin du raid."""
+        while True:
+            await asyncio.sleep(DELAI_REGROUPEMENT_RAID)
+
+            if etat.tampon:
+                lot, etat.tampon = etat.tampon, []
+                try:
+                    await self._supprimer_lot(salon, lot)
+                except Exception as erreur:
+                    print(f"❌ PingGuard : erreur pendant la suppression groupée : {erreur}")
+                try:
+                    await self._exclure_recidivistes(salon.guild, etat)
+                except Exception as erreur:
+                    print(f"❌ PingGuard : erreur pendant l'exclusion des récidivistes : {erreur}")
+
+            elif time.monotonic() >= etat.raid_jusqua:
+                print(f"✅ PingGuard : fin du mode raid dans #{salon}")
+                if self._salons.get(salon.id) is etat:
+                    del self._salons[salon.id]
+                return
+
+    async def _supprimer_lot(self, salon: discord.abc.Messageable, lot: list[tuple[discord.Message, str, str, float]]):
+        """Supprime des messages par paquets de 100 (une requête par paquet)."""
+        # Un même message peut avoir été signalé deux fois (création puis édition)
+        uniques = {entree[0].id: entree for entree in lot}
+        entrees = list(uniques.values())
+
+        for debut in range(0, len(entrees), 100):
+            paquet = entrees[debut:debut + 100]
+            messages = [message for message, _, _, _ in paquet]
+
+            try:
+                await salon.delete_messages(messages, reason="PingGuard : mode raid")
+                supprimes = paquet
+            except discord.HTTPException as erreur:
+                # Ex: un message déjà supprimé fait échouer tout le paquet : un par un
+                print(f"⚠️ PingGuard : suppression groupée refusée ({erreur}), suppression une par une")
+                supprimes = []
+                for entree in paquet:
+                    message = entree[0]
+                    try:
+                        await message.delete()
+                        supprimes.append(entree)
+                    except discord.NotFound:
+                        pass
+                    except discord.HTTPException as erreur_message:
+                        # Un message refusé n'empêche pas de traiter les autres (ni les exclusions)
+                        print(f"❌ PingGuard : impossible de supprimer le message {message.id} : {erreur_message}")
+
+            print(f"🛡️ PingGuard : {len(supprimes)} message(s) supprimé(s) en mode raid | Salon: #{salon}")
+
+            for message, evenement, noms, recu in supprimes:
+                self._mesurer_suppression(message, evenement, recu)
+                self._journaliser_suppression(message, evenement, noms)
+
+    async def _exclure_recidivistes(self, guild: discord.Guild, etat: _EtatSalon):
+        """Exclut temporairement les membres qui continuent pendant le raid."""
+        if not EXCLURE_RECIDIVISTES:
+            return
+
+        for auteur_id, nombre in etat.recidives.items():
+            if nombre < SEUIL_RECIDIVE or auteur_id in etat.exclus:
+                continue
+
+            etat.exclus.add(auteur_id)
+            membre = guild.get_member(auteur_id)
+            if membre is None:
+                continue
+
+            try:
+                await membre.timeout(
+                    timedelta(seconds=DUREE_EXCLUSION_RAID),
+                    reason="PingGuard : pings répétés pendant un raid"
+                )
+                print(f"🔇 PingGuard : {membre} exclu temporairement (raid)")
+            except discord.HTTPException as erreur:
+                print(f"❌ PingGuard : impossible d'exclure {membre} : {erreur}")
+
+    # ============================================
+    # ⏱️ MESURES DE LATENCE
+    # ============================================
+
+    @staticmethod
+    def _mesurer_suppression(message: discord.Message, evenement: str, recu: float):
+        """
+        Enregistre les durées d'une suppression réussie (visibles avec /metriques) :
+        - réception -> suppression : le temps passé dans le bot
+        - envoi -> suppression : le temps pendant lequel le message a été visible
+        """
+        maintenant = time.time()
+        salon_id = str(message.channel.id)
+
+        metriques.mesurer("pingguard.suppression_ms", (maintenant - recu) * 1000, detail=salon_id)
+
+        if evenement == "création":
+            metriques.mesurer(
+                "pingguard.total_ms",
+                (maintenant - message.created_at.timestamp()) * 1000,
+                detail=salon_id
+            )
+
     # ============================================
     # 👮 VÉRIFICATION MODÉRATEUR / ADMIN
     # ============================================
@@ -151,60 +569,113 @@ class PingGuard(commands.Cog):
         """
         Retourne True si l'auteur est propriétaire, admin,
         ou possède des permissions de modération dans le salon.
-        """
 
-        if message.guild.owner_id == message.author.id:
-            return True
+        La règle et son cache sont partagés par tout le bot (bot.permissions).
+        """
 
-        membre = message.guild.get_member(message.author.id)
+        membre = message.author
+        if not isinstance(membre, discord.Member):
+            # Édition d'un message hors du cache : l'auteur n'est qu'un utilisateur
+            membre = message.guild.get_member(message.author.id)
 
-        if membre is None:
-            try:
-                membre = await message.guild.fetch_member(message.author.id)
-            except discord.HTTPException:
-                return False
+            if membre is None:
+                try:
+                    membre = await message.guild.fetch_member(message.author.id)
+                except discord.HTTPException:
+                    return False
 
-        permissions_salon = message.channel.permissions_for(membre)
-
-        return (
-            membre.guild_permissions.administrator
-            or permissions_salon.manage_messages
-            or permissions_salon.moderate_members
-        )
+        return self.bot.permissions.est_moderateur(message.channel, membre)
 
     # ============================================
     # 📝 LOGS OPTIONNELS
     # ============================================
 
-    async def _journaliser_suppression(self, message: discord.Message, evenement: str):
+    def _journaliser_suppression(self, message: discord.Message, evenement: str, noms: str):
         """
-        Envoie un log dans un salon dédié si SALON_LOG_ID est configuré.
+        Ajoute une suppression au résumé envoyé dans SALON_LOG_ID (si configuré).
+        Aucun appel à Discord ici : le résumé est envoyé par _boucle_resume.
         """
 
         if SALON_LOG_ID is None:
             return
 
+        resume = self._resume
+        if resume is None:
+            resume = self._resume = _ResumeLogs()
+
+        resume.ajouter(message, evenement, noms)
+
+        if self._tache_resume is None or self._tache_resume.done():
+            self._tache_resume = asyncio.create_task(self._boucle_resume())
+
+    async def _boucle_resume(self):
+        """
+        Publie le résumé toutes les INTERVALLE_RESUME_LOGS secondes.
+        Tant qu'un résumé est ouvert, son message est modifié au lieu d'en envoyer un nouveau.
+        """
+        while self._resume is not None:
+            await asyncio.sleep(INTERVALLE_RESUME_LOGS)
+
+            resume = self._resume
+
+            # Résumé trop vieux : il est fermé AVANT sa dernière publication,
+            # les suppressions faites pendant l'envoi iront dans un nouveau message
+            # (et la boucle continue tant que self._resume n'est pas None)
+            if time.monotonic() - resume.debut >= DUREE_RESUME_LOGS:
+                self._resume = None
+                self._resume_ferme = resume
+
+            if resume.modifie:
+                try:
+                    await self._publier_resume(resume)
+                except discord.HTTPException as erreur:
+                    print(f"❌ PingGuard : impossible d'envoyer le résumé des logs : {erreur}")
+            self._resume_ferme = None
+
+    async def _publier_resume(self, resume: "_ResumeLogs"):
+        """Envoie (ou modifie) le message du résumé."""
+        contenu = resume.texte()
+        resume.modifie = False
+
+        try:
+            if resume.message is not None:
+                try:
+                    await resume.message.edit(content=contenu)
+                    return
+                except discord.NotFound:
+                    resume.message = None  # Message supprimé entre-temps : on en renvoie un
+
+            salon = await self._salon_log()
+            if salon is None:
+                return
+
+            resume.message = await salon.send(
+                content=contenu,
+                allowed_mentions=discord.AllowedMentions.none()
+            )
+        except asyncio.CancelledError:
+            # Arrêt du cog pendant l'envoi : cog_unload republiera ce résumé
+            resume.modifie = True
+            raise
+
+    async def _salon_log(self) -> discord.TextChannel | None:
+        """Retourne le salon de logs (cherché une seule fois)."""
+        if self._salon_log_cache is not None:
+            return self._salon_log_cache
+
         salon = self.bot.get_channel(SALON_LOG_ID)
 
         if salon is None:
             try:
                 salon = await self.bot.fetch_channel(SALON_LOG_ID)
             except discord.HTTPException:
-                return
+                return None
 
         if not isinstance(salon, discord.TextChannel):
-            return
+            return None
 
-        await salon.send(
-            content=(
-                "🛡️ **PingGuard**\n"
-                f"Message supprimé.\n"
-                f"Auteur : `{message.author}` / `{message.author.id}`\n"
-                f"Salon : {message.channel.mention}\n"
-                f"Événement : `{evenement}`"
-            ),
-            allowed_mentions=discord.AllowedMentions.none()
-        )
+        self._salon_log_cache = salon
+        return salon
 
 
 # ============================================
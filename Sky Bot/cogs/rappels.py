@@ -0,0 +1,177 @@
+# ============================================
+# 🔔 COG RAPPELS
+# ============================================
+# Ce module envoie un message privé quand une
+# récompense (/day, /week, /month) est à nouveau
+# disponible, pour les membres qui l'ont demandé.
+#
+# - /rappels : Active ou désactive ses rappels
+#
+# Chaque rappel en attente est une échéance dans un
+# Echeancier : le bot dort jusqu'au prochain rappel dû
+# au lieu de vérifier tous les membres régulièrement.
+# ============================================
+
+import asyncio
+import time
+
+import discord
+from discord.ext import commands
+from discord import app_commands
+
+from config import GUILD_ID, COOLDOWN_JOUR, COOLDOWN_SEMAINE, COOLDOWN_MOIS
+from utils.database import (
+    charger_json, iterer_json,
+    obtenir_rappels, sauvegarder_rappels
+)
+from utils.echeancier import Echeancier
+from utils.embeds import embed_succes, embed_info
+
+
+# Durée de chaque cooldown et commande à rappeler
+COOLDOWNS_RAPPELES = {
+    "day": (COOLDOWN_JOUR, "Ta récompense **quotidienne** est disponible ! Utilise `/day` 🎁"),
+    "week": (COOLDOWN_SEMAINE, "Ta récompense **hebdomadaire** est disponible ! Utilise `/week` 🎁"),
+    "month": (COOLDOWN_MOIS, "Ta récompense **mensuelle** est disponible ! Utilise `/month` 🎁"),
+}
+
+
+def _lister_cooldowns_a_rappeler(abonnes: dict) -> list[tuple[str, str, float]]:
+    """
+    Parcourt cooldowns.json et retourne les cooldowns des membres inscrits
+    qui n'ont pas encore été rappelés. Fonction bloquante (lecture disque).
+
+    Retourne:
+        Liste de tuples (user_id, type_cooldown, timestamp_du_cooldown)
+    """
+    resultats = []
+    for cle, horodatage in iterer_json("cooldowns.json"):
+        user_id, _, type_cooldown = cle.rpartition("_")
+        if type_cooldown not in COOLDOWNS_RAPPELES or user_id not in abonnes:
+            continue
+        if abs(abonnes[user_id].get(type_cooldown, 0) - horodatage) < 1:
+            continue  # Déjà rappelé avant le redémarrage
+        resultats.append((user_id, type_cooldown, horodatage))
+    return resultats
+
+
+class Rappels(commands.Cog):
+    """
+    Cog pour les rappels de récompenses en message privé.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.abonnes = obtenir_rappels()
+        self.echeancier = Echeancier()
+        self._tache = None
+
+    async def cog_load(self):
+        """Reconstruit les rappels depuis les cooldowns enregistrés, puis lance la boucle."""
+        a_rappeler = await asyncio.to_thread(_lister_cooldowns_a_rappeler, dict(self.abonnes))
+        for user_id, type_cooldown, horodatage in a_rappeler:
+            self._programmer(user_id, type_cooldown, horodatage)
+
+        self._tache = asyncio.create_task(self._boucle_rappels())
+
+    async def cog_unload(self):
+        """Appelé quand le cog est déchargé."""
+        if self._tache:
+            self._tache.cancel()
+
+    def _programmer(self, user_id: str, type_cooldown: str, horodatage: float):
+        """Programme le rappel d'un cooldown."""
+        duree, _ = COOLDOWNS_RAPPELES[type_cooldown]
+        self.echeancier.programmer((user_id, type_cooldown), horodatage + duree)
+
+    # ================================
+    # 📡 ÉVÉNEMENT : COOLDOWN ENREGISTRÉ
+    # ================================
+    @commands.Cog.listener()
+    async def on_cooldown_enregistre(self, user_id: int, type_cooldown: str, horodatage: float):
+        """
+        Déclenché par le cog Économie après /day, /week ou /month.
+        """
+        if str(user_id) in self.abonnes and type_cooldown in COOLDOWNS_RAPPELES:
+            self._programmer(str(user_id), type_cooldown, horodatage)
+
+    # ================================
+    # ⏰ BOUCLE D'ENVOI DES RAPPELS
+    # ================================
+    async def _boucle_rappels(self):
+        """
+        Dort jusqu'au prochain rappel, puis envoie d'un coup tous ceux qui sont dus.
+        Les rappels manqués pendant que le bot était éteint partent au démarrage.
+        """
+        await self.bot.wait_until_ready()
+
+        while True:
+            dus = await self.echeancier.attendre_dus()
+
+            for (user_id, type_cooldown), echeance in dus:
+                if user_id not in self.abonnes:
+                    continue
+
+                duree, texte = COOLDOWNS_RAPPELES[type_cooldown]
+                self.bot.notifications.envoyer(
+                    int(user_id),
+                    embed=embed_info("Rappel", texte)
+                )
+                # Retient ce cooldown comme "déjà rappelé" (pour les redémarrages)
+                self.abonnes[user_id][type_cooldown] = echeance - duree
+
+            # Une seule sauvegarde pour tout le lot
+            if dus:
+                sauvegarder_rappels(self.abonnes)
+
+    # ================================
+    # 🔔 COMMANDE /rappels
+    # ================================
+    @app_commands.command(
+        name="rappels",
+        description="Reçois un message privé quand tes récompenses sont disponibles"
+    )
+    @app_commands.describe(actif="True pour activer les rappels, False pour les désactiver")
+    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    async def rappels(self, interaction: discord.Interaction, actif: bool):
+        """
+        Active ou désactive les rappels de récompenses en DM.
+        """
+        user_id = str(interaction.user.id)
+
+        if not actif:
+            self.abonnes.pop(user_id, None)
+            for type_cooldown in COOLDOWNS_RAPPELES:
+                self.echeancier.annuler((user_id, type_cooldown))
+            sauvegarder_rappels(self.abonnes)
+
+            embed = embed_info("Rappels désactivés", "Tu ne recevras plus de rappels. 🔕")
+            return await interaction.response.send_message(embed=embed, ephemeral=True)
+
+        # Programme les rappels des cooldowns en cours.
+        # Ceux déjà terminés sont marqués comme rappelés : la récompense est disponible tout de suite.
+        self.abonnes[user_id] = {}
+        cooldowns = charger_json("cooldowns.json", {})
+        maintenant = time.time()
+
+        for type_cooldown, (duree, _) in COOLDOWNS_RAPPELES.items():
+            horodatage = cooldowns.get(f"{user_id}_{type_cooldown}")
+            if horodatage is None:
+                continue
+            if horodatage + duree > maintenant:
+                self._programmer(user_id, type_cooldown, horodatage)
+            else:
+                self.abonnes[user_id][type_cooldown] = horodatage
+
+        sauvegarder_rappels(self.abonnes)
+
+        embed = embed_succes(
+            "Rappels activés !",
+            "Je t'enverrai un message privé dès que `/day`, `/week` ou `/month` sera disponible. 🔔\n"
+            "Pense à garder tes messages privés ouverts !"
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(Rappels(bot))
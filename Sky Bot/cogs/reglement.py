@@ -13,6 +13,7 @@ from discord import app_commands
 from config import GUILD_ID, ROLE_REGLEMENT_ID
 from utils.embeds import embed_succes, embed_erreur, embed_info
 from utils.checks import a_le_role
+from utils.file_roles import MembreIntrouvable
 
 
 class BoutonReglement(discord.ui.View):
@@ -62,16 +63,22 @@ class BoutonReglement(discord.ui.View):
             )
             return await interaction.response.send_message(embed=embed, ephemeral=True)
         
+        # Lors d'une vague d'arrivées, la file des rôles peut mettre
+        # quelques secondes : on répond d'abord "en cours..." à Discord
+        await interaction.response.defer(ephemeral=True)
+        
         # Attribue le rôle
         try:
-            await membre.add_roles(role, reason="Acceptation du règlement")
+            await interaction.client.file_roles.ajouter_role(
+                membre, role, raison="Acceptation du règlement"
+            )
             
             embed = embed_succes(
                 "Bienvenue !",
                 f"Tu as accepté le règlement et reçu le rôle {role.mention} !\n\n"
                 "Tu as maintenant accès à tous les salons du serveur. 🎉"
             )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await interaction.followup.send(embed=embed, ephemeral=True)
             
         except discord.Forbidden:
             embed = embed_erreur(
@@ -79,7 +86,22 @@ class BoutonReglement(discord.ui.View):
                 "Je n'ai pas la permission d'attribuer ce rôle.\n"
                 "Vérifie que mon rôle est au-dessus du rôle à attribuer !"
             )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await interaction.followup.send(embed=embed, ephemeral=True)
+        
+        except MembreIntrouvable:
+            embed = embed_erreur(
+                "Membre introuvable",
+                "Tu n'es plus sur le serveur : le rôle n'a pas pu être attribué."
+            )
+            await interaction.followup.send(embed=embed, ephemeral=True)
+        
+        except discord.HTTPException as e:
+            embed = embed_erreur(
+                "Erreur",
+                f"Le rôle n'a pas pu être attribué, réessaie dans quelques instants.\n"
+                f"Une erreur s'est produite : {e}"
+            )
+            await interaction.followup.send(embed=embed, ephemeral=True)
 
 
 class Reglement(commands.Cog):
@@ -8,6 +8,9 @@
 # - Partage de rôle personnalisé (50 Skycoins)
 # ============================================
 
+import asyncio
+import time
+
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands
@@ -19,15 +22,86 @@ from config import (
     PRIX_ROLE_PERSO,
     PRIX_PARTAGE_ROLE,
     FACTURE_MENSUELLE_ROLE,
+    PERIODE_FACTURATION_ROLE,
     EMOJI_SKYCOIN, EMOJI_VIP
 )
 from utils.database import (
-    obtenir_solde, modifier_solde,
-    ajouter_vip, obtenir_vip_expires, supprimer_vip,
-    sauvegarder_role_perso, obtenir_roles_perso,
-    ajouter_membre_role_perso, supprimer_role_perso
+    obtenir_solde, obtenir_solde_partage, modifier_solde,
+    ajouter_vip, obtenir_vip, supprimer_vips, verifier_vip_expire,
+    obtenir_roles_perso, obtenir_membres_role_perso,
+    ajouter_membre_role_perso, supprimer_role_perso,
+    marquer_facture_role_perso, obtenir_factures_dues,
+    obtenir_roles_du_membre, retirer_membres_roles_perso,
+    obtenir_curseur_facturation, sauvegarder_curseur_facturation
 )
 from utils.embeds import embed_succes, embed_erreur, embed_info, formater_nombre
+from utils.echeancier import Echeancier
+from utils.file_roles import MembreIntrouvable
+from utils.verrous import verrou_utilisateur
+
+
+# ============================================
+# ⚙️ CONFIGURATION
+# ============================================
+
+# Toutes les combien de minutes une tranche de factures est traitée
+INTERVALLE_TRANCHE_FACTURATION = 15
+
+# Nombre maximum de rôles perso facturés par tranche
+TAILLE_TRANCHE_FACTURATION = 10
+
+# Les départs arrivés pendant ce délai sont traités ensemble (secondes)
+DELAI_REGROUPEMENT_DEPARTS = 2
+
+
+# ============================================
+# 📋 ARTICLES DE LA BOUTIQUE (/shop)
+# ============================================
+# Les articles et leurs prix ne changent pas pendant que le bot tourne :
+# leur texte est formaté une seule fois, seul le solde change à chaque /shop.
+
+TEXTE_ARTICLE_VIP = (
+    f"> **Prix :** `{formater_nombre(PRIX_VIP)}` {EMOJI_SKYCOIN}\n"
+    "🔹 Accès aux salons privés\n"
+    "🔹 Grade exclusif en haut de la liste\n"
+    "🔹 Badges et avantages spéciaux\n"
+    "⏳ *Expire automatiquement après 30 jours*"
+)
+
+TEXTE_ARTICLE_ROLE_PERSO = (
+    f"> **Prix :** `{formater_nombre(PRIX_ROLE_PERSO)}` {EMOJI_SKYCOIN}\n"
+    "🔸 Choisis ton **Nom** unique\n"
+    "🔸 Choisis ta **Couleur** préférée\n"
+    "🔸 Ajoute un **Emoji** personnalisé\n"
+    f"💸 *Coût d'entretien : {formater_nombre(FACTURE_MENSUELLE_ROLE)} {EMOJI_SKYCOIN}/mois*"
+)
+
+
+def construire_embed_boutique(solde: int) -> discord.Embed:
+    """Construit l'embed de la boutique (sans l'image)."""
+    embed = discord.Embed(
+        title="🛒  BOUTIQUE DU SERVEUR",
+        description=(
+            f"Bienvenue dans la boutique officielle !\n"
+            f"Dépense tes **Skycoins** durement gagnés ici.\n\n"
+            f"💰 **TON SOLDE ACTUEL**\n"
+            f"# `{formater_nombre(solde)}` {EMOJI_SKYCOIN}\n"
+            f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+        ),
+        color=0xFFD700  # Or Plus Brillant
+    )
+    
+    # --- ARTICLE 1 : VIP ---
+    embed.add_field(name=f"{EMOJI_VIP}  Statut VIP (1 Mois)", value=TEXTE_ARTICLE_VIP, inline=False)
+    
+    # --- SEPARATEUR ---
+    embed.add_field(name="\u200b", value="━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━", inline=False)
+    
+    # --- ARTICLE 2 : ROLE PERSO ---
+    embed.add_field(name="🎨  Création de Rôle Personnalisé", value=TEXTE_ARTICLE_ROLE_PERSO, inline=False)
+    
+    embed.set_footer(text="🛒 Clique sur les boutons ci-dessous pour commander !")
+    return embed
 
 
 # ============================================
@@ -71,77 +145,76 @@ class ModalPersonnalisationRole(discord.ui.Modal):
         user = interaction.user
         guild = interaction.guild
         
-        # Vérifie que l'utilisateur a assez d'argent
-        solde = obtenir_solde(user.id)
-        if solde < PRIX_ROLE_PERSO:
-            embed = embed_erreur(
-                "Solde insuffisant",
-                f"Il te faut **{formater_nombre(PRIX_ROLE_PERSO)}** {EMOJI_SKYCOIN} Skycoins.\n"
-                f"Tu n'as que **{formater_nombre(solde)}** Skycoins."
-            )
-            return await interaction.response.send_message(embed=embed, ephemeral=True)
-        
-        # Vérifie la couleur
-        try:
-            couleur_int = int(self.couleur.value, 16)
-        except ValueError:
-            embed = embed_erreur(
-                "Couleur invalide",
-                "La couleur doit être un code hexadécimal valide.\n"
-                "Exemple : `FF5733` (orange) ou `3498DB` (bleu)"
-            )
-            return await interaction.response.send_message(embed=embed, ephemeral=True)
-        
-        # Prépare le nom du rôle (avec emoji si fourni)
-        nom_final = self.nom_role.value
-        if self.emoji.value:
-            nom_final = f"{self.emoji.value} {nom_final}"
-        
-        try:
-            # Crée le rôle
-            # On le place juste en dessous du rôle le plus haut du bot
-            bot_member = guild.get_member(interaction.client.user.id)
-            position = bot_member.top_role.position - 1
+        # Tout l'achat se fait sous le verrou du membre : un double envoi
+        # du formulaire ne peut pas créer deux rôles avec un seul solde
+        async with verrou_utilisateur(user.id):
+            # Relu sous le verrou : un autre formulaire a peut-être déjà créé son rôle
+            if str(user.id) in obtenir_roles_perso():
+                embed = embed_info(
+                    "Tu as déjà un rôle !",
+                    "Tu possèdes déjà un rôle personnalisé.\n"
+                    "Utilise `/partager-role` pour le partager avec quelqu'un !"
+                )
+                return await interaction.response.send_message(embed=embed, ephemeral=True)
             
-            role = await guild.create_role(
-                name=nom_final,
-                colour=discord.Colour(couleur_int),
-                reason=f"Rôle personnalisé acheté par {user.name}"
-            )
-            
-            # Déplace le rôle à la bonne position
-            await role.edit(position=max(1, position))
-            
-            # Attribue le rôle à l'utilisateur
-            await user.add_roles(role)
+            # Vérifie que l'utilisateur a assez d'argent
+            solde = obtenir_solde(user.id)
+            if solde < PRIX_ROLE_PERSO:
+                embed = embed_erreur(
+                    "Solde insuffisant",
+                    f"Il te faut **{formater_nombre(PRIX_ROLE_PERSO)}** {EMOJI_SKYCOIN} Skycoins.\n"
+                    f"Tu n'as que **{formater_nombre(solde)}** Skycoins."
+                )
+                return await interaction.response.send_message(embed=embed, ephemeral=True)
             
-            # Retire l'argent
-            modifier_solde(user.id, -PRIX_ROLE_PERSO)
+            # Vérifie la couleur
+            try:
+                couleur_int = int(self.couleur.value, 16)
+            except ValueError:
+                embed = embed_erreur(
+                    "Couleur invalide",
+                    "La couleur doit être un code hexadécimal valide.\n"
+                    "Exemple : `FF5733` (orange) ou `3498DB` (bleu)"
+                )
+                return await interaction.response.send_message(embed=embed, ephemeral=True)
             
-            # Sauvegarde dans la base de données
-            sauvegarder_role_perso(user.id, role.id, nom_final, couleur_int)
+            # Prépare le nom du rôle (avec emoji si fourni)
+            nom_final = self.nom_role.value
+            if self.emoji.value:
+                nom_final = f"{self.emoji.value} {nom_final}"
             
-            embed = embed_succes(
-                "Rôle créé !",
-                f"Ton rôle {role.mention} a été créé avec succès !\n\n"
-                f"💰 **-{formater_nombre(PRIX_ROLE_PERSO)}** Skycoins\n\n"
-                f"⚠️ **Attention** : Tu devras payer **{formater_nombre(FACTURE_MENSUELLE_ROLE)}** Skycoins "
-                f"par mois pour le garder !"
-            )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            # La création peut prendre quelques secondes (plusieurs appels à Discord)
+            await interaction.response.defer(ephemeral=True)
             
-        except discord.Forbidden:
-            embed = embed_erreur(
-                "Erreur de permissions",
-                "Je n'ai pas la permission de créer des rôles !"
-            )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
-        except Exception as e:
-            embed = embed_erreur(
-                "Erreur",
-                f"Une erreur s'est produite : {e}"
-            )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            try:
+                # Prélève, crée, place et attribue le rôle (tout est annulé en cas d'erreur)
+                role = await interaction.client.provisionnement.creer_role_perso(
+                    user, nom_final, couleur_int, prix=PRIX_ROLE_PERSO
+                )
+                
+                embed = embed_succes(
+                    "Rôle créé !",
+                    f"Ton rôle {role.mention} a été créé avec succès !\n\n"
+                    f"💰 **-{formater_nombre(PRIX_ROLE_PERSO)}** Skycoins\n\n"
+                    f"⚠️ **Attention** : Tu devras payer **{formater_nombre(FACTURE_MENSUELLE_ROLE)}** Skycoins "
+                    f"par mois pour le garder !"
+                )
+                await interaction.followup.send(embed=embed, ephemeral=True)
+                
+            except discord.Forbidden:
+                embed = embed_erreur(
+                    "Erreur de permissions",
+                    "Je n'ai pas la permission de créer des rôles !\n"
+                    "Tes Skycoins n'ont pas été prélevés."
+                )
+                await interaction.followup.send(embed=embed, ephemeral=True)
+            except Exception as e:
+                embed = embed_erreur(
+                    "Erreur",
+                    f"Une erreur s'est produite : {e}\n"
+                    "Tes Skycoins n'ont pas été prélevés."
+                )
+                await interaction.followup.send(embed=embed, ephemeral=True)
 
 
 # ============================================
@@ -170,53 +243,68 @@ class VueBoutique(discord.ui.View):
         user = interaction.user
         guild = interaction.guild
         
-        # Vérifie le solde
-        solde = obtenir_solde(user.id)
-        if solde < PRIX_VIP:
-            embed = embed_erreur(
-                "Solde insuffisant",
-                f"Il te faut **{formater_nombre(PRIX_VIP)}** {EMOJI_SKYCOIN} Skycoins.\n"
-                f"Tu n'as que **{formater_nombre(solde)}** Skycoins."
-            )
-            return await interaction.response.send_message(embed=embed, ephemeral=True)
-        
-        # Récupère le rôle VIP
-        role_vip = guild.get_role(ROLE_VIP_ID)
-        if not role_vip:
-            embed = embed_erreur(
-                "Erreur de configuration",
-                "Le rôle VIP n'a pas été trouvé !"
-            )
-            return await interaction.response.send_message(embed=embed, ephemeral=True)
-        
-        # Vérifie si l'utilisateur a déjà le rôle
-        if role_vip in user.roles:
-            embed = embed_info(
-                "Déjà VIP !",
-                "Tu possèdes déjà le rôle VIP. 👑"
-            )
-            return await interaction.response.send_message(embed=embed, ephemeral=True)
-        
-        try:
-            # Attribue le rôle et retire l'argent
-            await user.add_roles(role_vip)
-            modifier_solde(user.id, -PRIX_VIP)
-            ajouter_vip(user.id, 30)  # 30 jours
+        # Un double-clic attend la fin du premier achat au lieu de le doubler
+        async with verrou_utilisateur(user.id):
+            # Vérifie le solde
+            solde = obtenir_solde(user.id)
+            if solde < PRIX_VIP:
+                embed = embed_erreur(
+                    "Solde insuffisant",
+                    f"Il te faut **{formater_nombre(PRIX_VIP)}** {EMOJI_SKYCOIN} Skycoins.\n"
+                    f"Tu n'as que **{formater_nombre(solde)}** Skycoins."
+                )
+                return await interaction.response.send_message(embed=embed, ephemeral=True)
             
-            embed = embed_succes(
-                "Achat réussi !",
-                f"Tu as acheté le rôle {role_vip.mention} pour **1 mois** !\n\n"
-                f"💰 **-{formater_nombre(PRIX_VIP)}** Skycoins\n\n"
-                f"Profite bien de tes avantages VIP ! 👑"
-            )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            # Récupère le rôle VIP
+            role_vip = guild.get_role(ROLE_VIP_ID)
+            if not role_vip:
+                embed = embed_erreur(
+                    "Erreur de configuration",
+                    "Le rôle VIP n'a pas été trouvé !"
+                )
+                return await interaction.response.send_message(embed=embed, ephemeral=True)
             
-        except discord.Forbidden:
-            embed = embed_erreur(
-                "Erreur de permissions",
-                "Je n'ai pas la permission d'attribuer ce rôle !"
-            )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            # Vérifie si l'utilisateur est déjà VIP. user.roles vient du clic et peut
+            # être en retard : le VIP enregistré (relu sous le verrou) fait foi
+            if not verifier_vip_expire(user.id) or role_vip in user.roles:
+                embed = embed_info(
+                    "Déjà VIP !",
+                    "Tu possèdes déjà le rôle VIP. 👑"
+                )
+                return await interaction.response.send_message(embed=embed, ephemeral=True)
+            
+            # La file des rôles peut être chargée : on prévient Discord qu'on répondra plus tard
+            await interaction.response.defer(ephemeral=True)
+            
+            try:
+                # Attribue le rôle et retire l'argent
+                await interaction.client.file_roles.ajouter_role(user, role_vip, raison="Achat VIP")
+                modifier_solde(user.id, -PRIX_VIP)
+                expiration = ajouter_vip(user.id, 30)  # 30 jours
+                interaction.client.dispatch("vip_ajoute", user.id, expiration)
+                
+                embed = embed_succes(
+                    "Achat réussi !",
+                    f"Tu as acheté le rôle {role_vip.mention} pour **1 mois** !\n\n"
+                    f"💰 **-{formater_nombre(PRIX_VIP)}** Skycoins\n\n"
+                    f"Profite bien de tes avantages VIP ! 👑"
+                )
+                await interaction.followup.send(embed=embed, ephemeral=True)
+                
+            except discord.Forbidden:
+                embed = embed_erreur(
+                    "Erreur de permissions",
+                    "Je n'ai pas la permission d'attribuer ce rôle !"
+                )
+                await interaction.followup.send(embed=embed, ephemeral=True)
+            
+            except MembreIntrouvable:
+                embed = embed_erreur(
+                    "Membre introuvable",
+                    "Tu n'es plus sur le serveur : l'achat a été annulé.\n"
+                    "Tes Skycoins n'ont pas été prélevés."
+                )
+                await interaction.followup.send(embed=embed, ephemeral=True)
     
     @discord.ui.button(
         label=f"🎨 Rôle Personnalisé ({formater_nombre(PRIX_ROLE_PERSO)} SC)",
@@ -259,13 +347,28 @@ class Shop(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
-        # Démarre la tâche de vérification des VIP expirés
-        self.verifier_vip_expires.start()
         self.facturer_roles_perso.start()
+        
+        # Programme l'expiration de chaque VIP enregistré
+        self.echeancier_vip = Echeancier()
+        for user_id, expiration in obtenir_vip().items():
+            self.echeancier_vip.programmer(user_id, expiration)
+        self._tache_vip = None
+        
+        # Membres partis du serveur, en attente de nettoyage des rôles perso
+        self._departs: set[int] = set()
+        self._tache_departs = None
+    
+    async def cog_load(self):
+        """Démarre la tâche qui retire les VIP expirés."""
+        self._tache_vip = asyncio.create_task(self._boucle_vip_expires())
     
     def cog_unload(self):
         """Appelé quand le cog est déchargé."""
-        self.verifier_vip_expires.cancel()
+        if self._tache_vip:
+            self._tache_vip.cancel()
+        if self._tache_departs:
+            self._tache_departs.cancel()
         self.facturer_roles_perso.cancel()
     
     # ================================
@@ -280,56 +383,15 @@ class Shop(commands.Cog):
         """
         Affiche la boutique avec tous les articles disponibles.
         """
-        solde = obtenir_solde(interaction.user.id)
+        solde = await obtenir_solde_partage(interaction.user.id)
         
-        embed = discord.Embed(
-            title="🛒  BOUTIQUE DU SERVEUR",
-            description=(
-                f"Bienvenue dans la boutique officielle !\n"
-                f"Dépense tes **Skycoins** durement gagnés ici.\n\n"
-                f"💰 **TON SOLDE ACTUEL**\n"
-                f"# `{formater_nombre(solde)}` {EMOJI_SKYCOIN}\n"
-                f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
-            ),
-            color=0xFFD700  # Or Plus Brillant
-        )
+        embed = construire_embed_boutique(solde)
         
         # --- IMAGE D'ILLUSTRATION (Thumbnail) ---
         if interaction.guild.icon:
             embed.set_thumbnail(url=interaction.guild.icon.url)
         else:
             embed.set_thumbnail(url=self.bot.user.avatar.url if self.bot.user.avatar else None)
-
-        # --- ARTICLE 1 : VIP ---
-        embed.add_field(
-            name=f"{EMOJI_VIP}  Statut VIP (1 Mois)",
-            value=(
-                f"> **Prix :** `{formater_nombre(PRIX_VIP)}` {EMOJI_SKYCOIN}\n"
-                "🔹 Accès aux salons privés\n"
-                "🔹 Grade exclusif en haut de la liste\n"
-                "🔹 Badges et avantages spéciaux\n"
-                "⏳ *Expire automatiquement après 30 jours*"
-            ),
-            inline=False
-        )
-        
-        # --- SEPARATEUR ---
-        embed.add_field(name="\u200b", value="━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━", inline=False)
-        
-        # --- ARTICLE 2 : ROLE PERSO ---
-        embed.add_field(
-            name=f"🎨  Création de Rôle Personnalisé",
-            value=(
-                f"> **Prix :** `{formater_nombre(PRIX_ROLE_PERSO)}` {EMOJI_SKYCOIN}\n"
-                "🔸 Choisis ton **Nom** unique\n"
-                "🔸 Choisis ta **Couleur** préférée\n"
-                "🔸 Ajoute un **Emoji** personnalisé\n"
-                f"💸 *Coût d'entretien : {formater_nombre(FACTURE_MENSUELLE_ROLE)} {EMOJI_SKYCOIN}/mois*"
-            ),
-            inline=False
-        )
-        
-        embed.set_footer(text="🛒 Clique sur les boutons ci-dessous pour commander !")
         
         await interaction.response.send_message(
             embed=embed,
@@ -375,184 +437,279 @@ class Shop(commands.Cog):
             )
             return await interaction.response.send_message(embed=embed, ephemeral=True)
         
-        # Vérifie le solde
-        solde = obtenir_solde(user.id)
-        if solde < PRIX_PARTAGE_ROLE:
-            embed = embed_erreur(
-                "Solde insuffisant",
-                f"Il te faut **{PRIX_PARTAGE_ROLE}** {EMOJI_SKYCOIN} Skycoins."
-            )
-            return await interaction.response.send_message(embed=embed, ephemeral=True)
-        
-        # Récupère le rôle
-        role_data = roles_perso[str(user.id)]
-        role = interaction.guild.get_role(role_data["role_id"])
-        
-        if not role:
-            embed = embed_erreur(
-                "Rôle introuvable",
-                "Ton rôle semble avoir été supprimé !"
-            )
-            return await interaction.response.send_message(embed=embed, ephemeral=True)
+        # Le partage est payé par le propriétaire : on sérialise ses achats
+        async with verrou_utilisateur(user.id):
+            # Vérifie le solde
+            solde = obtenir_solde(user.id)
+            if solde < PRIX_PARTAGE_ROLE:
+                embed = embed_erreur(
+                    "Solde insuffisant",
+                    f"Il te faut **{PRIX_PARTAGE_ROLE}** {EMOJI_SKYCOIN} Skycoins."
+                )
+                return await interaction.response.send_message(embed=embed, ephemeral=True)
+            
+            # Récupère le rôle
+            role_data = roles_perso[str(user.id)]
+            role = interaction.guild.get_role(role_data["role_id"])
+            
+            if not role:
+                embed = embed_erreur(
+                    "Rôle introuvable",
+                    "Ton rôle semble avoir été supprimé !"
+                )
+                return await interaction.response.send_message(embed=embed, ephemeral=True)
+            
+            # Vérifie si le membre a déjà le rôle (relu sous le verrou :
+            # membre.roles peut ne pas encore montrer un partage qui vient d'être fait)
+            if membre.id in obtenir_membres_role_perso(user.id) or role in membre.roles:
+                embed = embed_info(
+                    "Déjà partagé",
+                    f"{membre.mention} a déjà ton rôle !"
+                )
+                return await interaction.response.send_message(embed=embed, ephemeral=True)
+            
+            await interaction.response.defer(ephemeral=True)
+            
+            try:
+                # Attribue le rôle et retire l'argent
+                await self.bot.file_roles.ajouter_role(
+                    membre, role, raison=f"Rôle partagé par {user.name}"
+                )
+                modifier_solde(user.id, -PRIX_PARTAGE_ROLE)
+                ajouter_membre_role_perso(user.id, membre.id)
+                
+                embed = embed_succes(
+                    "Rôle partagé !",
+                    f"Tu as partagé ton rôle {role.mention} avec {membre.mention} !\n\n"
+                    f"💰 **-{PRIX_PARTAGE_ROLE}** Skycoins"
+                )
+                await interaction.followup.send(embed=embed, ephemeral=True)
+                
+            except discord.Forbidden:
+                embed = embed_erreur(
+                    "Erreur de permissions",
+                    "Je n'ai pas la permission d'attribuer ce rôle !"
+                )
+                await interaction.followup.send(embed=embed, ephemeral=True)
+            
+            except MembreIntrouvable:
+                embed = embed_erreur(
+                    "Membre introuvable",
+                    f"{membre.mention} n'est plus sur le serveur : le partage a été annulé.\n"
+                    "Tes Skycoins n'ont pas été prélevés."
+                )
+                await interaction.followup.send(embed=embed, ephemeral=True)
+    
+    # ================================
+    # 🚪 DÉPART D'UN MEMBRE
+    # ================================
+    
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        """
+        Retire un membre parti de tous ses rôles perso.
+        S'il était propriétaire, son rôle est supprimé.
+        """
+        if member.guild.id != GUILD_ID:
+            return
         
-        # Vérifie si le membre a déjà le rôle
-        if role in membre.roles:
-            embed = embed_info(
-                "Déjà partagé",
-                f"{membre.mention} a déjà ton rôle !"
-            )
-            return await interaction.response.send_message(embed=embed, ephemeral=True)
+        # Réponse immédiate grâce à l'index : la plupart des membres n'ont aucun rôle perso
+        if not obtenir_roles_du_membre(member.id):
+            return
         
-        try:
-            # Attribue le rôle et retire l'argent
-            await membre.add_roles(role)
-            modifier_solde(user.id, -PRIX_PARTAGE_ROLE)
-            ajouter_membre_role_perso(user.id, membre.id)
+        # Regroupe les départs (ex: vague de bannissements) en une seule écriture
+        self._departs.add(member.id)
+        if self._tache_departs is None or self._tache_departs.done():
+            self._tache_departs = asyncio.create_task(self._traiter_departs())
+    
+    async def _traiter_departs(self):
+        """Nettoie les rôles perso de tous les membres partis récemment."""
+        # Les départs arrivés pendant un nettoyage sont traités au tour suivant
+        while self._departs:
+            await asyncio.sleep(DELAI_REGROUPEMENT_DEPARTS)
             
-            embed = embed_succes(
-                "Rôle partagé !",
-                f"Tu as partagé ton rôle {role.mention} avec {membre.mention} !\n\n"
-                f"💰 **-{PRIX_PARTAGE_ROLE}** Skycoins"
-            )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            departs, self._departs = self._departs, set()
             
-        except discord.Forbidden:
-            embed = embed_erreur(
-                "Erreur de permissions",
-                "Je n'ai pas la permission d'attribuer ce rôle !"
-            )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            # Pas de nettoyage pendant un achat ou une facture d'un de ces membres
+            # (verrous pris dans l'ordre des IDs pour ne jamais se bloquer mutuellement)
+            verrous = [verrou_utilisateur(user_id) for user_id in sorted(departs)]
+            for verrou in verrous:
+                await verrou.acquire()
+            try:
+                supprimes = retirer_membres_roles_perso(departs)
+            finally:
+                for verrou in verrous:
+                    verrou.release()
+            
+            guild = self.bot.get_guild(GUILD_ID)
+            if not guild:
+                continue
+            
+            for role_id in supprimes.values():
+                role = guild.get_role(role_id)
+                if role:
+                    self.bot.file_roles.supprimer_role(role, raison="Propriétaire parti du serveur")
     
     # ================================
-    # ⏰ TÂCHE : VÉRIFIER LES VIP EXPIRÉS
+    # ⏰ EXPIRATION DES VIP
     # ================================
-    @tasks.loop(hours=1)
-    async def verifier_vip_expires(self):
+    # Chaque VIP est une échéance dans un Echeancier : le bot dort
+    # jusqu'à la prochaine expiration (au lieu de tout vérifier
+    # toutes les heures) et la traite à la seconde près.
+    
+    async def _boucle_vip_expires(self):
         """
-        Vérifie toutes les heures si des VIP ont expiré.
-        Retire automatiquement le rôle si c'est le cas.
+        Attend la prochaine expiration, puis retire d'un coup tous les VIP expirés.
+        Les VIP expirés pendant que le bot était éteint sont traités au démarrage.
         """
-        expires = obtenir_vip_expires()
+        await self.bot.wait_until_ready()
+        
+        while True:
+            dus = await self.echeancier_vip.attendre_dus()
+            try:
+                await self.retirer_vip_expires([int(user_id) for user_id, _ in dus])
+            except Exception as e:
+                print(f"❌ Erreur lors du retrait des VIP expirés : {e}")
+    
+    @commands.Cog.listener()
+    async def on_vip_ajoute(self, user_id: int, expiration: float):
+        """
+        Déclenché après un achat VIP : programme son expiration.
+        Réveille la boucle si cette expiration est la plus proche.
+        """
+        self.echeancier_vip.programmer(str(user_id), expiration)
+    
+    async def retirer_vip_expires(self, user_ids: list):
+        """
+        Retire le rôle VIP des membres donnés et les supprime de la base de données.
+        """
+        # Relit les expirations : un VIP a pu être racheté entre-temps
+        vip = obtenir_vip()
+        maintenant = time.time()
+        expires = []
+        for user_id in user_ids:
+            expiration = vip.get(str(user_id))
+            if expiration is None:
+                continue
+            if expiration > maintenant:
+                self.echeancier_vip.programmer(str(user_id), expiration)
+            else:
+                expires.append(user_id)
         
         if not expires:
             return
         
         # Récupère le serveur
         guild = self.bot.get_guild(GUILD_ID)
-        if not guild:
-            return
-        
-        role_vip = guild.get_role(ROLE_VIP_ID)
+        role_vip = guild.get_role(ROLE_VIP_ID) if guild else None
         if not role_vip:
+            # Serveur ou rôle introuvable : on réessaiera dans une heure
+            for user_id in expires:
+                self.echeancier_vip.programmer(str(user_id), maintenant + 3600)
             return
         
         for user_id in expires:
             try:
                 membre = guild.get_member(user_id)
                 if membre and role_vip in membre.roles:
-                    await membre.remove_roles(role_vip, reason="VIP expiré")
+                    # Pas d'await : la file des rôles regroupe et étale les retraits
+                    self.bot.file_roles.retirer_role(membre, role_vip, raison="VIP expiré")
                     
-                    # Envoie un DM à l'utilisateur
-                    try:
-                        embed = embed_info(
-                            "VIP Expiré",
-                            "Ton statut VIP a expiré ! 👑\n"
-                            "Tu peux le racheter dans `/shop`."
-                        )
-                        await membre.send(embed=embed)
-                    except:
-                        pass  # Ignore si on ne peut pas envoyer de DM
-                
-                # Supprime de la base de données
-                supprimer_vip(user_id)
+                    # Envoie un DM à l'utilisateur (via la file des notifications)
+                    embed = embed_info(
+                        "VIP Expiré",
+                        "Ton statut VIP a expiré ! 👑\n"
+                        "Tu peux le racheter dans `/shop`."
+                    )
+                    self.bot.notifications.envoyer(membre.id, embed=embed)
                 
             except Exception as e:
                 print(f"Erreur lors du retrait VIP pour {user_id}: {e}")
-    
-    @verifier_vip_expires.before_loop
-    async def avant_verif_vip(self):
-        """Attend que le bot soit prêt avant de démarrer la tâche."""
-        await self.bot.wait_until_ready()
+        
+        # Supprime de la base de données (une seule sauvegarde pour tout le lot)
+        supprimer_vips(expires)
     
     # ================================
     # ⏰ TÂCHE : FACTURER LES RÔLES PERSO
     # ================================
-    @tasks.loop(hours=24)
+    @tasks.loop(minutes=INTERVALLE_TRANCHE_FACTURATION)
     async def facturer_roles_perso(self):
         """
-        Vérifie tous les jours si des factures de rôles perso sont dues.
-        """
-        import time
-        roles_perso = obtenir_roles_perso()
-        
-        if not roles_perso:
-            return
+        Facture une petite tranche de rôles perso dont la facture est due.
         
+        Les rôles sont parcourus par date d'échéance : un curseur sauvegardé
+        sur le disque retient le dernier rôle traité. La facturation est ainsi
+        étalée sur la journée, et un redémarrage reprend là où elle s'était arrêtée.
+        """
         guild = self.bot.get_guild(GUILD_ID)
         if not guild:
             return
         
-        maintenant = time.time()
-        un_mois = 30 * 24 * 60 * 60  # 30 jours en secondes
+        curseur = obtenir_curseur_facturation()
+        dus = obtenir_factures_dues(PERIODE_FACTURATION_ROLE, apres=curseur, limite=TAILLE_TRANCHE_FACTURATION)
         
-        for user_id, data in list(roles_perso.items()):
-            derniere_facture = data.get("derniere_facture", 0)
-            
-            # Vérifie si un mois s'est écoulé
-            if maintenant - derniere_facture < un_mois:
-                continue
-            
+        if not dus:
+            # Tour terminé : le prochain repart du début (rôles en échec, nouvelles échéances...)
+            if curseur is not None:
+                sauvegarder_curseur_facturation(None)
+            return
+        
+        for echeance, user_id, data in dus:
             user_id_int = int(user_id)
-            solde = obtenir_solde(user_id_int)
             
-            if solde >= FACTURE_MENSUELLE_ROLE:
-                # L'utilisateur peut payer
-                modifier_solde(user_id_int, -FACTURE_MENSUELLE_ROLE)
-                
-                # Met à jour la date de facturation
-                roles_perso[user_id]["derniere_facture"] = maintenant
-                from utils.database import sauvegarder_json
-                sauvegarder_json("custom_roles.json", roles_perso)
-                
-                # Notifie l'utilisateur
-                try:
-                    membre = guild.get_member(user_id_int)
-                    if membre:
-                        embed = embed_info(
-                            "Facture Rôle Perso",
-                            f"Ta facture mensuelle de **{formater_nombre(FACTURE_MENSUELLE_ROLE)}** Skycoins "
-                            "a été prélevée pour ton rôle personnalisé !"
-                        )
-                        await membre.send(embed=embed)
-                except:
-                    pass
-            else:
-                # L'utilisateur ne peut pas payer, on supprime le rôle
-                role_id = data.get("role_id")
-                if role_id:
-                    role = guild.get_role(role_id)
-                    if role:
-                        try:
-                            await role.delete(reason="Facture mensuelle non payée")
-                        except:
-                            pass
+            # Pas de facture pendant qu'un achat du même membre est en cours
+            async with verrou_utilisateur(user_id_int):
+                # Relu sous le verrou : pendant l'attente, le rôle a pu être supprimé,
+                # recréé (autre role_id) ou déjà facturé
+                actuel = obtenir_roles_perso().get(user_id)
+                encore_du = (
+                    actuel is not None
+                    and actuel.get("role_id") == data.get("role_id")
+                    and actuel.get("derniere_facture", 0) + PERIODE_FACTURATION_ROLE <= time.time()
+                )
+                if not encore_du:
+                    sauvegarder_curseur_facturation((echeance, user_id))
+                    continue
                 
-                # Supprime de la base de données
-                supprimer_role_perso(user_id_int)
+                solde = obtenir_solde(user_id_int)
                 
-                # Notifie l'utilisateur
-                try:
-                    membre = guild.get_member(user_id_int)
-                    if membre:
+                if solde >= FACTURE_MENSUELLE_ROLE:
+                    # L'utilisateur peut payer. La date est enregistrée AVANT le prélèvement :
+                    # un arrêt entre les deux ne peut pas faire payer deux fois.
+                    if marquer_facture_role_perso(user_id_int, time.time()):
+                        modifier_solde(user_id_int, -FACTURE_MENSUELLE_ROLE)
+                        
+                        # Notifie l'utilisateur
+                        if guild.get_member(user_id_int):
+                            embed = embed_info(
+                                "Facture Rôle Perso",
+                                f"Ta facture mensuelle de **{formater_nombre(FACTURE_MENSUELLE_ROLE)}** Skycoins "
+                                "a été prélevée pour ton rôle personnalisé !"
+                            )
+                            self.bot.notifications.envoyer(user_id_int, embed=embed)
+                else:
+                    # L'utilisateur ne peut pas payer, on supprime le rôle
+                    role_id = actuel.get("role_id")
+                    if role_id:
+                        role = guild.get_role(role_id)
+                        if role:
+                            self.bot.file_roles.supprimer_role(role, raison="Facture mensuelle non payée")
+                    
+                    # Supprime de la base de données
+                    supprimer_role_perso(user_id_int)
+                    
+                    # Notifie l'utilisateur
+                    if guild.get_member(user_id_int):
                         embed = embed_erreur(
                             "Rôle Supprimé",
                             f"Tu n'avais pas assez de Skycoins pour payer la facture "
                             f"de **{formater_nombre(FACTURE_MENSUELLE_ROLE)}** Skycoins.\n"
                             "Ton rôle personnalisé a été supprimé. 😢"
                         )
-                        await membre.send(embed=embed)
-                except:
-                    pass
+                        self.bot.notifications.envoyer(user_id_int, embed=embed)
+            
+            # Avance le curseur après chaque rôle : un arrêt en pleine tranche reprend ici
+            sauvegarder_curseur_facturation((echeance, user_id))
     
     @facturer_roles_perso.before_loop
     async def avant_facturation(self):
@@ -47,6 +47,11 @@ COOLDOWN_JOUR = 86400       # 24 heures
 COOLDOWN_SEMAINE = 604800   # 7 jours
 COOLDOWN_MOIS = 2592000     # 30 jours
 
+# Après combien de temps sans activité un membre est archivé (en secondes)
+# Son solde et ses cooldowns sortent de economy.json / cooldowns.json
+# et y reviennent automatiquement à sa prochaine commande.
+DUREE_INACTIVITE_ARCHIVAGE = 7776000  # 90 jours
+
 
 # ============================================
 # 🛒 BOUTIQUE - PRIX
@@ -64,6 +69,9 @@ PRIX_PARTAGE_ROLE = 50
 # Facture mensuelle pour garder son rôle perso
 FACTURE_MENSUELLE_ROLE = 1000
 
+# Temps entre deux factures d'un rôle perso (en secondes)
+PERIODE_FACTURATION_ROLE = 2592000  # 30 jours
+
 
 # ============================================
 # 📝 LIENS DE RECRUTEMENT
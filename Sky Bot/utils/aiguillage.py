@@ -0,0 +1,189 @@
+# ============================================
+# 🚏 AIGUILLAGE DES MESSAGES
+# ============================================
+# Au lieu que chaque cog écoute on_message et refasse
+# les mêmes vérifications (serveur ? bot ? mention ?),
+# le bot reçoit chaque message UNE fois ici :
+#
+# 1. le message est préparé une seule fois (MessageRecu)
+# 2. des filtres rapides éliminent ce qui n'intéresse personne
+#    (messages privés, messages du bot lui-même)
+# 3. il n'est transmis qu'aux gestionnaires dont l'intérêt
+#    correspond : contient une mention, auteur non modérateur,
+#    salons précis, bots ignorés...
+#
+# Chaque gestionnaire est chronométré dans le registre
+# de métriques (aiguillage.<nom>_ms).
+# ============================================
+
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+import discord
+
+from utils.metriques import metriques
+
+
+class MessageRecu:
+    """
+    Un message préparé une seule fois pour tous les gestionnaires.
+
+    Les informations coûteuses (statut modérateur) ne sont calculées
+    que si un gestionnaire en a besoin, puis gardées pour les suivants.
+    """
+
+    __slots__ = ("message", "recu", "contenu", "salon_ids", "a_mention", "_bot", "_est_moderateur")
+
+    def __init__(self, bot: discord.Client, message: discord.Message, recu: float):
+        self.message = message
+        # Le moment où le bot a reçu le message (time.time())
+        self.recu = recu
+        self.contenu = message.content or ""
+
+        # Le salon et, pour un fil, son salon parent
+        salon = message.channel
+        self.salon_ids = {salon.id}
+        parent_id = getattr(salon, "parent_id", None)
+        if parent_id is not None:
+            self.salon_ids.add(parent_id)
+
+        # Mention dans le texte, ou réponse avec @ activé (visible seulement dans message.mentions)
+        self.a_mention = "<@" in self.contenu or bool(message.mentions)
+
+        self._bot = bot
+        self._est_moderateur: bool | None = None
+
+    @property
+    def est_moderateur(self) -> bool:
+        """Propriétaire, admin, ou permissions de modération dans le salon."""
+        if self._est_moderateur is None:
+            auteur = self.message.author
+            if not isinstance(auteur, discord.Member):
+                self._est_moderateur = False
+            else:
+                self._est_moderateur = self._bot.permissions.est_moderateur(self.message.channel, auteur)
+        return self._est_moderateur
+
+
+class _Gestionnaire:
+    """Une fonction appelée pour les messages qui correspondent à son intérêt."""
+
+    __slots__ = ("nom", "fonction", "mention", "non_moderateur", "salons", "ignorer_bots")
+
+    def __init__(
+        self,
+        nom: str,
+        fonction: Callable[[MessageRecu], Awaitable[None]],
+        mention: bool,
+        non_moderateur: bool,
+        salons: set[int] | None,
+        ignorer_bots: bool
+    ):
+        self.nom = nom
+        self.fonction = fonction
+        self.mention = mention
+        self.non_moderateur = non_moderateur
+        self.salons = salons
+        self.ignorer_bots = ignorer_bots
+
+    def interesse(self, recu: MessageRecu) -> bool:
+        # Du moins coûteux au plus coûteux : le statut modérateur en dernier
+        if self.mention and not recu.a_mention:
+            return False
+        if self.ignorer_bots and recu.message.author.bot:
+            return False
+        if self.salons is not None and self.salons.isdisjoint(recu.salon_ids):
+            return False
+        if self.non_moderateur and recu.est_moderateur:
+            return False
+        return True
+
+
+class AiguillageMessages:
+    """
+    Distribue les messages des serveurs aux gestionnaires des cogs.
+
+    Exemple:
+        # Dans cog_load
+        self.bot.aiguillage.enregistrer("pingguard", self._sur_message, mention=True)
+
+        # Dans cog_unload
+        self.bot.aiguillage.retirer("pingguard")
+    """
+
+    def __init__(self, bot: discord.Client):
+        self.bot = bot
+        self._gestionnaires: dict[str, _Gestionnaire] = {}
+
+    # ================================
+    # 📝 ENREGISTREMENT
+    # ================================
+
+    def enregistrer(
+        self,
+        nom: str,
+        fonction: Callable[[MessageRecu], Awaitable[None]],
+        *,
+        mention: bool = False,
+        non_moderateur: bool = False,
+        salons: set[int] | None = None,
+        ignorer_bots: bool = False
+    ):
+        """
+        Enregistre (ou remplace) un gestionnaire de messages.
+
+        Arguments:
+            nom: Nom unique, utilisé dans les métriques (ex: "pingguard")
+            fonction: Coroutine appelée avec un MessageRecu
+            mention: Seulement les messages qui mentionnent quelqu'un
+            non_moderateur: Seulement les messages des non-modérateurs
+            salons: Seulement ces salons (et leurs fils), None = tous
+            ignorer_bots: Ignore les messages des autres bots
+        """
+        self._gestionnaires[nom] = _Gestionnaire(
+            nom, fonction, mention, non_moderateur,
+            set(salons) if salons is not None else None, ignorer_bots
+        )
+
+    def retirer(self, nom: str):
+        """Retire un gestionnaire (ne fait rien s'il n'existe pas)."""
+        self._gestionnaires.pop(nom, None)
+
+    # ================================
+    # 📩 DISTRIBUTION
+    # ================================
+
+    async def traiter(self, message: discord.Message):
+        """Transmet un message aux gestionnaires intéressés (appelé par SkyBot.on_message)."""
+        recu = time.time()
+
+        # Filtres communs à tous les gestionnaires
+        if message.guild is None or not self._gestionnaires:
+            return
+        if self.bot.user is not None and message.author.id == self.bot.user.id:
+            return
+
+        metriques.incrementer("aiguillage.messages")
+        message_recu = MessageRecu(self.bot, message, recu)
+
+        choisis = [g for g in self._gestionnaires.values() if g.interesse(message_recu)]
+        if not choisis:
+            return
+
+        if len(choisis) == 1:
+            await self._executer(choisis[0], message_recu)
+        else:
+            # Un gestionnaire lent (ex: suppression en attente) ne retarde pas les autres
+            await asyncio.gather(*(self._executer(g, message_recu) for g in choisis))
+
+    async def _executer(self, gestionnaire: _Gestionnaire, message_recu: MessageRecu):
+        debut = time.perf_counter()
+        try:
+            await gestionnaire.fonction(message_recu)
+        except Exception as erreur:
+            metriques.incrementer(f"aiguillage.{gestionnaire.nom}.erreurs")
+            print(f"❌ Aiguillage : erreur dans le gestionnaire '{gestionnaire.nom}' : {erreur}")
+        finally:
+            metriques.incrementer(f"aiguillage.{gestionnaire.nom}.appels")
+            metriques.mesurer(f"aiguillage.{gestionnaire.nom}_ms", (time.perf_counter() - debut) * 1000)
@@ -0,0 +1,129 @@
+# ============================================
+# 📦 ARCHIVAGE D'UN SALON
+# ============================================
+# Sauvegarde tout l'historique d'un salon dans un fichier
+# NDJSON compressé (.ndjson.gz), une ligne par message :
+# auteur, date, texte, pièces jointes (URL), embeds...
+#
+# L'historique est lu petit à petit (async for) et écrit par
+# lots de TAILLE_LOT_ARCHIVE lignes : la mémoire utilisée ne
+# dépend pas du nombre de messages du salon.
+# La compression se fait dans un thread pour ne pas bloquer le bot.
+# ============================================
+
+import asyncio
+import gzip
+import json
+import os
+import time
+from datetime import datetime
+from typing import Awaitable, Callable
+
+import discord
+
+from utils.database import DOSSIER_DATA
+from utils.metriques import metriques
+
+
+# Dossier où sont écrites les archives
+DOSSIER_ARCHIVES = os.path.join(DOSSIER_DATA, "archives")
+
+# Nombre de messages écrits d'un coup dans le fichier compressé
+TAILLE_LOT_ARCHIVE = 1000
+
+
+class ResultatArchive:
+    """Résumé d'une archive (mis à jour pendant qu'elle avance)."""
+
+    def __init__(self, chemin: str):
+        self.chemin = chemin
+        self.messages = 0
+        self.duree = 0.0
+
+    @property
+    def taille(self) -> int:
+        """Taille du fichier compressé (octets)."""
+        return os.path.getsize(self.chemin) if os.path.exists(self.chemin) else 0
+
+
+def _ligne_message(message: discord.Message) -> str:
+    """Convertit un message en une ligne JSON."""
+    donnees = {
+        "id": message.id,
+        "date": message.created_at.isoformat(),
+        "auteur_id": message.author.id,
+        "auteur": str(message.author),
+        "bot": message.author.bot,
+        "contenu": message.content,
+    }
+    if message.edited_at:
+        donnees["modifie"] = message.edited_at.isoformat()
+    if message.reference and message.reference.message_id:
+        donnees["reponse_a"] = message.reference.message_id
+    if message.pinned:
+        donnees["epingle"] = True
+    if message.attachments:
+        donnees["pieces_jointes"] = [
+            {"nom": piece.filename, "url": piece.url, "taille": piece.size}
+            for piece in message.attachments
+        ]
+    if message.embeds:
+        donnees["embeds"] = [embed.to_dict() for embed in message.embeds]
+    return json.dumps(donnees, ensure_ascii=False) + "\n"
+
+
+async def archiver_salon(
+    salon: discord.TextChannel,
+    progression: Callable[[ResultatArchive], Awaitable[None]] | None = None,
+    intervalle_progression: float = 2
+) -> ResultatArchive:
+    """
+    Écrit tout l'historique du salon (du plus ancien au plus récent) dans
+    DOSSIER_ARCHIVES/<nom>-<id>-<date>.ndjson.gz.
+
+    Arguments:
+        salon: Le salon à archiver
+        progression: Coroutine appelée régulièrement avec le résultat en cours
+        intervalle_progression: Temps minimum entre deux appels (secondes)
+
+    Retourne:
+        Le ResultatArchive final (le fichier est supprimé en cas d'erreur)
+    """
+    os.makedirs(DOSSIER_ARCHIVES, exist_ok=True)
+    horodatage = datetime.now().strftime("%Y%m%d-%H%M%S")
+    chemin = os.path.join(DOSSIER_ARCHIVES, f"{salon.name}-{salon.id}-{horodatage}.ndjson.gz")
+
+    resultat = ResultatArchive(chemin)
+    debut = time.perf_counter()
+    derniere_progression = time.monotonic()
+    lot: list[str] = []
+
+    try:
+        with gzip.open(chemin, "wt", encoding="utf-8", newline="") as fichier:
+            async for message in salon.history(limit=None, oldest_first=True):
+                lot.append(_ligne_message(message))
+
+                if len(lot) >= TAILLE_LOT_ARCHIVE:
+                    await asyncio.to_thread(fichier.write, "".join(lot))
+                    resultat.messages += len(lot)
+                    lot = []
+
+                    if progression is not None and time.monotonic() - derniere_progression >= intervalle_progression:
+                        derniere_progression = time.monotonic()
+                        await progression(resultat)
+
+            if lot:
+                await asyncio.to_thread(fichier.write, "".join(lot))
+                resultat.messages += len(lot)
+    except BaseException:
+        # Archive incomplète : elle ne doit pas passer pour une sauvegarde valide
+        try:
+            os.remove(chemin)
+        except OSError:
+            pass
+        raise
+
+    resultat.duree = time.perf_counter() - debut
+    metriques.incrementer("archivage.messages", resultat.messages)
+    metriques.mesurer("archivage.duree_ms", resultat.duree * 1000)
+    return resultat
@@ -0,0 +1,88 @@
+# ============================================
+# 🗃️ CACHE EN MÉMOIRE AVEC EXPIRATION
+# ============================================
+# Garde le résultat d'un calcul coûteux (appel à Discord,
+# calcul de permissions...) pendant un temps limité.
+#
+# - Chaque valeur expire après `duree` secondes
+# - Le cache a une taille maximum : quand il est plein,
+#   les valeurs les moins récemment utilisées sont retirées
+# - Les listeners l'invalident quand la donnée change
+#   (rôles modifiés, permissions d'un salon...)
+# ============================================
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+# Valeur interne pour distinguer "absent" de "None"
+_ABSENT = object()
+
+
+class CacheTTL:
+    """
+    Dictionnaire dont les valeurs expirent.
+
+    Exemple:
+        cache = CacheTTL(duree=300)
+        est_modo = cache.obtenir((guild_id, membre_id, salon_id))
+        if est_modo is None:
+            est_modo = calculer(...)
+            cache.definir((guild_id, membre_id, salon_id), est_modo)
+    """
+
+    def __init__(self, duree: float, taille_max: int = 10000):
+        self.duree = duree
+        self.taille_max = taille_max
+        # cle -> (valeur, date d'expiration), du moins au plus récemment utilisé
+        self._valeurs: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._valeurs)
+
+    def obtenir(self, cle: Hashable, defaut: Any = None) -> Any:
+        """Retourne la valeur en cache, ou `defaut` si absente ou expirée."""
+        entree = self._valeurs.get(cle, _ABSENT)
+        if entree is _ABSENT:
+            return defaut
+
+        valeur, expiration = entree
+        if time.monotonic() >= expiration:
+            del self._valeurs[cle]
+            return defaut
+
+        self._valeurs.move_to_end(cle)
+        return valeur
+
+    def definir(self, cle: Hashable, valeur: Any):
+        """Met une valeur en cache pour `duree` secondes."""
+        self._valeurs[cle] = (valeur, time.monotonic() + self.duree)
+        self._valeurs.move_to_end(cle)
+
+        while len(self._valeurs) > self.taille_max:
+            self._valeurs.popitem(last=False)
+
+    def supprimer(self, cle: Hashable):
+        """Retire une valeur du cache (ne fait rien si elle est absente)."""
+        self._valeurs.pop(cle, None)
+
+    def supprimer_si(self, condition: Callable[[Hashable], bool]) -> int:
+        """
+        Retire toutes les clés qui respectent la condition.
+
+        Exemple:
+            # Oublie tout ce qui concerne un salon
+            cache.supprimer_si(lambda cle: cle[2] == salon_id)
+
+        Retourne:
+            Le nombre de clés retirées
+        """
+        a_retirer = [cle for cle in self._valeurs if condition(cle)]
+        for cle in a_retirer:
+            del self._valeurs[cle]
+        return len(a_retirer)
+
+    def vider(self):
+        """Vide complètement le cache."""
+        self._valeurs.clear()
@@ -0,0 +1,154 @@
+# ============================================
+# 🔐 CACHE DES PERMISSIONS PAR SALON
+# ============================================
+# channel.permissions_for(membre) recalcule les permissions
+# à partir de tous les rôles et de toutes les exceptions du
+# salon. Les listeners de messages (PingGuard...) posent la
+# même question des milliers de fois : "le bot peut-il
+# supprimer des messages ici ?".
+#
+# Le résultat est gardé en mémoire par (salon, membre) et
+# oublié dès que quelque chose peut le changer :
+# - permissions d'un salon modifiées
+# - permissions d'un rôle modifiées / rôle supprimé
+# - rôles ou exclusion temporaire d'un membre (dont le bot) modifiés
+#
+# Chaque serveur a un CacheTTL : les valeurs expirent après
+# DUREE_CACHE_PERMISSIONS secondes et au plus
+# TAILLE_MAX_PERMISSIONS couples (salon, membre) sont gardés.
+#
+# est_moderateur() est LA règle "modérateur" du bot
+# (aiguillage des messages, PingGuard...).
+# ============================================
+
+import discord
+
+from utils.cache import CacheTTL
+
+
+# Durée pendant laquelle des permissions sont gardées en mémoire (secondes)
+DUREE_CACHE_PERMISSIONS = 300
+
+# Nombre maximum de couples (salon, membre) gardés par serveur
+TAILLE_MAX_PERMISSIONS = 10000
+
+
+class CachePermissions:
+    """
+    Permissions des membres dans les salons, calculées une seule fois.
+
+    Exemple:
+        if not bot.permissions.verifier(message.channel, message.guild.me, "manage_messages", "PingGuard"):
+            return
+    """
+
+    def __init__(self, bot: discord.Client):
+        self.bot = bot
+
+        # guild_id -> cache {(salon_id, membre_id): permissions}
+        self._permissions: dict[int, CacheTTL] = {}
+
+        # (salon_id, permission) déjà signalées comme manquantes
+        self._manquantes_signalees: set[tuple[int, str]] = set()
+
+        bot.add_listener(self._on_guild_channel_update, "on_guild_channel_update")
+        bot.add_listener(self._on_guild_channel_delete, "on_guild_channel_delete")
+        bot.add_listener(self._on_guild_role_update, "on_guild_role_update")
+        bot.add_listener(self._on_guild_role_delete, "on_guild_role_delete")
+        bot.add_listener(self._on_member_update, "on_member_update")
+
+    # ================================
+    # 🔍 LECTURE
+    # ================================
+
+    def permissions(self, salon: discord.abc.GuildChannel, membre: discord.Member) -> discord.Permissions:
+        """Retourne les permissions d'un membre dans un salon (depuis le cache si possible)."""
+        # La fin d'une exclusion temporaire n'envoie aucun événement :
+        # les permissions d'un membre exclu ne sont pas gardées
+        if membre.is_timed_out():
+            return salon.permissions_for(membre)
+
+        serveur = self._permissions.get(salon.guild.id)
+        if serveur is None:
+            serveur = self._permissions[salon.guild.id] = CacheTTL(
+                duree=DUREE_CACHE_PERMISSIONS, taille_max=TAILLE_MAX_PERMISSIONS
+            )
+
+        cle = (salon.id, membre.id)
+        permissions = serveur.obtenir(cle)
+        if permissions is None:
+            permissions = salon.permissions_for(membre)
+            serveur.definir(cle, permissions)
+        return permissions
+
+    def est_moderateur(self, salon: discord.abc.GuildChannel, membre: discord.Member) -> bool:
+        """Propriétaire, admin, ou permissions de modération dans le salon."""
+        if salon.guild.owner_id == membre.id:
+            return True
+        permissions = self.permissions(salon, membre)
+        return permissions.administrator or permissions.manage_messages or permissions.moderate_members
+
+    def verifier(self, salon: discord.abc.GuildChannel, membre: discord.Member, permission: str, module: str) -> bool:
+        """
+        Vérifie une permission. Si elle manque, un avertissement est affiché
+        une seule fois par salon (et de nouveau si elle revient puis disparaît).
+
+        Arguments:
+            salon: Le salon
+            membre: Le membre (souvent guild.me)
+            permission: Le nom de la permission (ex: "manage_messages")
+            module: Le nom affiché dans l'avertissement (ex: "PingGuard")
+        """
+        autorise = getattr(self.permissions(salon, membre), permission)
+        cle = (salon.id, permission)
+
+        if autorise:
+            self._manquantes_signalees.discard(cle)
+        elif cle not in self._manquantes_signalees:
+            self._manquantes_signalees.add(cle)
+            print(f"⚠️ {module} : permission '{permission}' manquante dans le salon #{salon}.")
+
+        return autorise
+
+    # ================================
+    # 🗑️ INVALIDATION
+    # ================================
+
+    def _oublier_salons(self, guild_id: int, salon_ids: set[int]):
+        serveur = self._permissions.get(guild_id)
+        if serveur is not None:
+            serveur.supprimer_si(lambda cle: cle[0] in salon_ids)
+
+    @staticmethod
+    def _salon_et_enfants(salon: discord.abc.GuildChannel) -> set[int]:
+        """Le salon, ses fils (threads) et, pour une catégorie, ses salons."""
+        ids = {salon.id}
+        ids.update(fil.id for fil in getattr(salon, "threads", []))
+        if isinstance(salon, discord.CategoryChannel):
+            for enfant in salon.channels:
+                ids.add(enfant.id)
+                ids.update(fil.id for fil in getattr(enfant, "threads", []))
+        return ids
+
+    async def _on_guild_channel_update(self, avant: discord.abc.GuildChannel, apres: discord.abc.GuildChannel):
+        if avant.overwrites != apres.overwrites or getattr(avant, "category_id", None) != getattr(apres, "category_id", None):
+            self._oublier_salons(apres.guild.id, self._salon_et_enfants(apres))
+
+    async def _on_guild_channel_delete(self, salon: discord.abc.GuildChannel):
+        self._oublier_salons(salon.guild.id, self._salon_et_enfants(salon))
+
+    async def _on_guild_role_update(self, avant: discord.Role, apres: discord.Role):
+        if avant.permissions != apres.permissions:
+            self._permissions.pop(apres.guild.id, None)
+
+    async def _on_guild_role_delete(self, role: discord.Role):
+        self._permissions.pop(role.guild.id, None)
+
+    async def _on_member_update(self, avant: discord.Member, apres: discord.Member):
+        # Rôles ajoutés / retirés (au bot lui-même aussi), ou exclusion temporaire
+        # donnée / levée (un membre exclu perd presque toutes ses permissions)
+        if avant.roles != apres.roles or avant.timed_out_until != apres.timed_out_until:
+            serveur = self._permissions.get(apres.guild.id)
+            if serveur is not None:
+                membre_id = apres.id
+                serveur.supprimer_si(lambda cle: cle[1] == membre_id)
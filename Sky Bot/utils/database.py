@@ -8,10 +8,13 @@
 # C'est comme un dictionnaire Python sauvegardé sur le disque.
 # ============================================
 
+import gzip
 import json
 import os
-from typing import Any
+from typing import Any, Callable, Hashable
 import time
+import heapq
+import asyncio
 
 
 # Chemin du dossier où sont stockées les données
@@ -73,10 +76,188 @@ def sauvegarder_json(nom_fichier: str, donnees: Any):
     """
     assurer_dossier_existe()
     chemin = os.path.join(DOSSIER_DATA, nom_fichier)
+    chemin_temporaire = chemin + ".tmp"
     
     # Sauvegarde avec une jolie indentation (indent=4)
-    with open(chemin, "w", encoding="utf-8") as fichier:
+    # On écrit d'abord dans un fichier temporaire puis on le renomme :
+    # un lecteur (ex: un export en arrière-plan) ne voit jamais un fichier à moitié écrit.
+    with open(chemin_temporaire, "w", encoding="utf-8") as fichier:
         json.dump(donnees, fichier, indent=4, ensure_ascii=False)
+    os.replace(chemin_temporaire, chemin)
+
+
+def iterer_json(nom_fichier: str, taille_bloc: int = 65536):
+    """
+    Parcourt un fichier JSON contenant un dictionnaire, entrée par entrée,
+    sans jamais le charger en entier en mémoire.
+    
+    Le fichier est lu par blocs de `taille_bloc` caractères : la mémoire
+    utilisée reste bornée même si le fichier fait plusieurs centaines de Mo.
+    
+    Arguments:
+        nom_fichier: Le nom du fichier (ex: "economy.json")
+        taille_bloc: Nombre de caractères lus à chaque fois
+    
+    Retourne:
+        Un générateur de tuples (cle, valeur)
+    
+    Exemple:
+        for user_id, solde in iterer_json("economy.json"):
+            print(user_id, solde)
+    """
+    chemin = os.path.join(DOSSIER_DATA, nom_fichier)
+    
+    if not os.path.exists(chemin):
+        return
+    
+    decodeur = json.JSONDecoder()
+    
+    with open(chemin, "r", encoding="utf-8") as fichier:
+        tampon = ""
+        position = 0
+        fin_fichier = False
+        
+        def lire_bloc() -> bool:
+            """Ajoute un bloc au tampon. Retourne False si le fichier est fini."""
+            nonlocal tampon, position, fin_fichier
+            bloc = fichier.read(taille_bloc)
+            if not bloc:
+                fin_fichier = True
+                return False
+            # On jette ce qui a déjà été lu pour garder un tampon petit
+            tampon = tampon[position:] + bloc
+            position = 0
+            return True
+        
+        def prochain_caractere() -> str:
+            """Saute les espaces et retourne le prochain caractère utile ('' à la fin)."""
+            nonlocal position
+            while True:
+                while position < len(tampon) and tampon[position] in " \t\r\n":
+                    position += 1
+                if position < len(tampon):
+                    return tampon[position]
+                if not lire_bloc():
+                    return ""
+        
+        def lire_valeur():
+            """Décode la prochaine valeur JSON, en relisant si elle est coupée."""
+            nonlocal position
+            while True:
+                premier = prochain_caractere()
+                # Un nombre coupé ("1." au lieu de "1.5") se décode sans erreur :
+                # on attend donc d'avoir le séparateur qui le suit.
+                complet = (
+                    premier in "\"{["
+                    or fin_fichier
+                    or tampon.find(",", position) != -1
+                    or tampon.find("}", position) != -1
+                )
+                if complet:
+                    try:
+                        valeur, position = decodeur.raw_decode(tampon, position)
+                        return valeur
+                    except json.JSONDecodeError:
+                        if fin_fichier:
+                            raise
+                # Valeur incomplète : on lit la suite et on réessaie
+                lire_bloc()
+        
+        try:
+            if prochain_caractere() != "{":
+                print(f"⚠️ Fichier {nom_fichier} : un dictionnaire JSON était attendu")
+                return
+            position += 1
+            
+            while True:
+                caractere = prochain_caractere()
+                if caractere == "}":
+                    return
+                if caractere == "":
+                    raise json.JSONDecodeError("'}' attendu", tampon, position)
+                if caractere == ",":
+                    position += 1
+                    continue
+                
+                cle = lire_valeur()
+                if prochain_caractere() != ":":
+                    raise json.JSONDecodeError("':' attendu", tampon, position)
+                position += 1
+                valeur = lire_valeur()
+                
+                yield cle, valeur
+        except json.JSONDecodeError:
+            print(f"⚠️ Fichier {nom_fichier} corrompu, lecture interrompue")
+
+
+# ============================================
+# ⚡ LECTURES PARTAGÉES (SINGLE-FLIGHT)
+# ============================================
+# Pendant un événement, des dizaines de membres font /solde
+# ou /classement en même temps. Au lieu de relire le même
+# fichier des dizaines de fois, le premier appel lance la
+# lecture et tous les autres attendent son résultat.
+# ============================================
+
+# Lectures en cours : {cle: tâche qui fait la lecture}
+_lectures_en_cours: dict[Hashable, asyncio.Future] = {}
+
+
+async def charger_partage(cle: Hashable, fonction: Callable, *args) -> Any:
+    """
+    Exécute `fonction(*args)` dans un thread, en partageant le résultat
+    entre tous les appels simultanés qui utilisent la même clé.
+    
+    Le résultat est partagé : il ne faut PAS le modifier.
+    `fonction` doit être une lecture pure : elle ne doit ni écrire de fichier
+    ni modifier un état en mémoire (index, caches...). Tout ce qui écrit
+    se fait sur la boucle du bot, avant l'appel.
+    
+    Arguments:
+        cle: Identifiant de la lecture (ex: "economy.json")
+        fonction: La fonction (bloquante) qui fait la lecture
+        args: Ses arguments
+    
+    Exemple:
+        economie = await charger_partage("economy.json", charger_json, "economy.json", {})
+    """
+    tache = _lectures_en_cours.get(cle)
+    
+    if tache is None:
+        tache = asyncio.ensure_future(asyncio.to_thread(fonction, *args))
+        _lectures_en_cours[cle] = tache
+        # Dès que la lecture est finie, les appels suivants relisent le disque
+        tache.add_done_callback(lambda _: _lectures_en_cours.pop(cle, None))
+    
+    # shield : si un appelant est annulé, la lecture continue pour les autres
+    return await asyncio.shield(tache)
+
+
+async def obtenir_solde_partage(user_id: int) -> int:
+    """
+    Version asynchrone de obtenir_solde() pour l'affichage (/solde, /shop).
+    Les appels simultanés partagent une seule lecture de economy.json.
+    """
+    # Membre archivé : il est ramené dans economy.json ICI, sur la boucle du bot
+    # (comme pour modifier_solde). Aucun thread n'écrit jamais les fichiers :
+    # deux écritures simultanées du même fichier perdraient des Skycoins.
+    _sortir_de_l_archive(user_id)
+    
+    economie = await charger_partage("economy.json", charger_json, "economy.json", {})
+    return economie.get(str(user_id), 0)
+
+
+async def obtenir_classement_partage(limite: int = 10) -> list:
+    """
+    Version asynchrone de obtenir_classement() pour /classement.
+    Les appels simultanés partagent un seul calcul du classement.
+    """
+    # L'index de l'archive est construit (au premier appel) sur la boucle, pas dans le thread :
+    # le thread reçoit une copie des soldes archivés et ne fait que lire economy.json
+    riches_archives = tuple(_charger_index_archive()["riches"])
+    return await charger_partage(
+        ("classement", limite), _calculer_classement, limite, riches_archives
+    )
 
 
 # ============================================
@@ -93,17 +274,19 @@ def obtenir_solde(user_id: int) -> int:
     Retourne:
         Le solde en Skycoins (0 si l'utilisateur n'a pas de compte)
     """
+    _sortir_de_l_archive(user_id)
     economie = charger_json("economy.json", {})
     return economie.get(str(user_id), 0)
 
 
-def modifier_solde(user_id: int, montant: int) -> int:
+def modifier_solde(user_id: int, montant: int, compter_gain: bool = True) -> int:
     """
     Ajoute ou retire des Skycoins au solde d'un utilisateur.
     
     Arguments:
         user_id: L'ID Discord de l'utilisateur
         montant: Le montant à ajouter (positif) ou retirer (négatif)
+        compter_gain: False pour un remboursement (ne compte pas dans les classements de gains)
     
     Retourne:
         Le nouveau solde
@@ -112,6 +295,7 @@ def modifier_solde(user_id: int, montant: int) -> int:
         modifier_solde(123456789, 500)   # Ajoute 500
         modifier_solde(123456789, -200)  # Retire 200
     """
+    _sortir_de_l_archive(user_id)
     economie = charger_json("economy.json", {})
     
     # Récupère le solde actuel ou 0
@@ -124,6 +308,10 @@ def modifier_solde(user_id: int, montant: int) -> int:
     economie[str(user_id)] = nouveau_solde
     sauvegarder_json("economy.json", economie)
     
+    # Les gains comptent pour les classements "cette semaine", "ce mois"...
+    if montant > 0 and compter_gain:
+        enregistrer_gain(user_id, montant)
+    
     return nouveau_solde
 
 
@@ -138,6 +326,7 @@ def definir_solde(user_id: int, montant: int) -> int:
     Retourne:
         Le nouveau solde
     """
+    _sortir_de_l_archive(user_id)
     economie = charger_json("economy.json", {})
     economie[str(user_id)] = max(0, montant)
     sauvegarder_json("economy.json", economie)
@@ -154,12 +343,151 @@ def obtenir_classement(limite: int = 10) -> list:
     Retourne:
         Liste de tuples (user_id, solde) triée par solde décroissant
     """
+    # Les plus gros soldes archivés restent dans le classement
+    return _calculer_classement(limite, _charger_index_archive()["riches"])
+
+
+def _calculer_classement(limite: int, riches_archives) -> list:
+    """
+    Calcule le classement à partir de economy.json et des plus gros soldes archivés.
+    Lecture seule : peut tourner dans un thread (voir charger_partage).
+    """
     economie = charger_json("economy.json", {})
+    candidats = list(economie.items()) + list(riches_archives)
     
     # Trie par solde décroissant
-    classement = sorted(economie.items(), key=lambda x: x[1], reverse=True)
+    return heapq.nlargest(limite, candidats, key=lambda x: x[1])
+
+
+# ============================================
+# 📈 FONCTIONS GAINS (CLASSEMENTS GLISSANTS)
+# ============================================
+# Les gains sont rangés dans des "seaux" d'une heure :
+#   {heure: {user_id: montant gagné pendant cette heure}}
+#
+# Pour chaque fenêtre (24h, 7j, 30j), on garde en mémoire le total
+# de chaque membre. Quand une heure sort de la fenêtre, on retire
+# juste ce seau du total : pas besoin de relire tout l'historique.
+# ============================================
+
+# Durée de chaque fenêtre, en heures
+FENETRES_GAINS = {
+    "24h": 24,
+    "7j": 24 * 7,
+    "30j": 24 * 30,
+}
+
+# État en mémoire (chargé depuis earnings.json au premier appel)
+_gains = None
+
+
+def _heure_actuelle() -> int:
+    """Numéro de l'heure actuelle (nombre d'heures depuis 1970)."""
+    return int(time.time() // 3600)
+
+
+def _charger_gains() -> dict:
+    """
+    Charge les seaux depuis le disque et recalcule les totaux de chaque fenêtre.
+    N'est fait qu'une seule fois, ensuite tout reste en mémoire.
+    """
+    global _gains
+    
+    if _gains is None:
+        heure = _heure_actuelle()
+        brut = charger_json("earnings.json", {})
+        seaux = {int(h): montants for h, montants in brut.items()}
+        
+        _gains = {"seaux": seaux, "totaux": {}, "debuts": {}}
+        for fenetre, duree in FENETRES_GAINS.items():
+            debut = heure - duree + 1
+            totaux = {}
+            for h, montants in seaux.items():
+                if debut <= h <= heure:
+                    for user_id, montant in montants.items():
+                        totaux[user_id] = totaux.get(user_id, 0) + montant
+            _gains["totaux"][fenetre] = totaux
+            _gains["debuts"][fenetre] = debut
     
-    return classement[:limite]
+    _faire_glisser_fenetres(_gains)
+    return _gains
+
+
+def _faire_glisser_fenetres(gains: dict):
+    """
+    Fait avancer chaque fenêtre jusqu'à l'heure actuelle.
+    Chaque seau sort de chaque fenêtre une seule fois : le coût est constant par heure écoulée.
+    """
+    heure = _heure_actuelle()
+    seaux = gains["seaux"]
+    
+    for fenetre, duree in FENETRES_GAINS.items():
+        ancien_debut = gains["debuts"][fenetre]
+        nouveau_debut = heure - duree + 1
+        
+        if nouveau_debut <= ancien_debut:
+            continue
+        
+        totaux = gains["totaux"][fenetre]
+        
+        if nouveau_debut - ancien_debut >= duree:
+            # Le bot n'a rien crédité depuis plus longtemps que la fenêtre :
+            # tous les anciens seaux sont sortis d'un coup
+            totaux.clear()
+        else:
+            for h in range(ancien_debut, nouveau_debut):
+                for user_id, montant in seaux.get(h, {}).items():
+                    reste = totaux.get(user_id, 0) - montant
+                    if reste > 0:
+                        totaux[user_id] = reste
+                    else:
+                        totaux.pop(user_id, None)
+        
+        gains["debuts"][fenetre] = nouveau_debut
+    
+    # Les seaux plus vieux que la plus grande fenêtre ne servent plus
+    plus_vieille_heure = heure - max(FENETRES_GAINS.values()) + 1
+    for h in [h for h in seaux if h < plus_vieille_heure]:
+        del seaux[h]
+
+
+def enregistrer_gain(user_id: int, montant: int):
+    """
+    Ajoute un gain dans le seau de l'heure actuelle.
+    Appelé automatiquement par modifier_solde() à chaque crédit.
+    
+    Arguments:
+        user_id: L'ID Discord de l'utilisateur
+        montant: Le montant gagné (positif)
+    """
+    gains = _charger_gains()
+    cle = str(user_id)
+    
+    seau = gains["seaux"].setdefault(_heure_actuelle(), {})
+    seau[cle] = seau.get(cle, 0) + montant
+    
+    for totaux in gains["totaux"].values():
+        totaux[cle] = totaux.get(cle, 0) + montant
+    
+    sauvegarder_json("earnings.json", gains["seaux"])
+
+
+def obtenir_classement_gains(fenetre: str, limite: int = 10) -> list:
+    """
+    Récupère le classement des membres qui ont le plus gagné sur une période.
+    
+    Arguments:
+        fenetre: "24h", "7j" ou "30j"
+        limite: Nombre maximum d'utilisateurs à retourner
+    
+    Retourne:
+        Liste de tuples (user_id, montant_gagne) triée par gains décroissants
+    
+    Exemple:
+        obtenir_classement_gains("7j", 10)  # Top 10 de la semaine
+    """
+    totaux = _charger_gains()["totaux"][fenetre]
+    return heapq.nlargest(limite, totaux.items(), key=lambda x: x[1])
 
 
 # ============================================
@@ -185,6 +513,7 @@ def verifier_cooldown(user_id: int, type_cooldown: str, duree_secondes: int) ->
         if not peut_utiliser:
             print(f"Attends encore {temps_restant} secondes !")
     """
+    _sortir_de_l_archive(user_id)
     cooldowns = charger_json("cooldowns.json", {})
     
     cle = f"{user_id}_{type_cooldown}"
@@ -203,25 +532,391 @@ def verifier_cooldown(user_id: int, type_cooldown: str, duree_secondes: int) ->
         return False, temps_restant
 
 
-def enregistrer_cooldown(user_id: int, type_cooldown: str):
+def enregistrer_cooldown(user_id: int, type_cooldown: str) -> float:
     """
     Enregistre qu'un utilisateur vient d'utiliser une commande.
     
     Arguments:
         user_id: L'ID Discord de l'utilisateur
         type_cooldown: Le type de cooldown ("day", "week", "month")
+    
+    Retourne:
+        Le timestamp enregistré
     """
+    _sortir_de_l_archive(user_id)
     cooldowns = charger_json("cooldowns.json", {})
     
     cle = f"{user_id}_{type_cooldown}"
     cooldowns[cle] = time.time()
     
     sauvegarder_json("cooldowns.json", cooldowns)
+    return cooldowns[cle]
+
+
+# ============================================
+# 🧊 ARCHIVE DES MEMBRES INACTIFS
+# ============================================
+# economy.json et cooldowns.json sont relus et réécrits en entier
+# à chaque /day, achat... Les membres inactifs depuis longtemps
+# (ou partis du serveur) sont déplacés dans une archive compressée,
+# une ligne JSON par membre (NDJSON) :
+#   {"user_id": "123", "solde": 1234, "cooldowns": {"day": timestamp, ...}}
+# Le format ligne par ligne permet de la parcourir (exports) sans la charger en entier.
+#
+# Ils en ressortent tout seuls à leur prochaine commande. L'archive
+# n'est PAS réécrite à ce moment-là : le membre est seulement noté
+# dans archive_sorties.json, et l'archive est compactée (lignes des
+# membres sortis retirées) lors de l'archivage quotidien.
+# En mémoire, on ne garde que leurs IDs et les plus gros soldes
+# archivés (pour que /classement reste juste).
+# ============================================
+
+FICHIER_ARCHIVE = "archive_membres.ndjson.gz"
+
+# Membres sortis de l'archive depuis le dernier compactage (liste d'IDs)
+FICHIER_SORTIES_ARCHIVE = "archive_sorties.json"
+
+# Erreurs possibles en lisant une archive abîmée (gzip tronqué, ligne invalide...)
+_ERREURS_ARCHIVE = (OSError, EOFError, json.JSONDecodeError, KeyError, TypeError)
+
+# Taille des blocs lus pour retrouver un membre dans l'archive (octets décompressés)
+TAILLE_BLOC_RECHERCHE_ARCHIVE = 1024 * 1024
+
+# Nombre de soldes archivés gardés en mémoire pour /classement
+TAILLE_CLASSEMENT_ARCHIVE = 100
+
+# Index en mémoire (construit depuis l'archive au premier appel)
+#   {"ids": {user_id, ...}, "riches": [(user_id, solde), ...], "sortis": {user_id, ...}}
+_index_archive = None
+
+
+def _lire_archive(chemin: str):
+    """Lit l'archive ligne par ligne : générateur de (user_id, {"solde", "cooldowns"})."""
+    with gzip.open(chemin, "rt", encoding="utf-8") as fichier:
+        for ligne in fichier:
+            if ligne.strip():
+                data = json.loads(ligne)
+                yield data.pop("user_id"), data
+
+
+def _charger_archive() -> dict:
+    """Lit toute l'archive compressée ({} si elle n'existe pas)."""
+    chemin = os.path.join(DOSSIER_DATA, FICHIER_ARCHIVE)
+    
+    if not os.path.exists(chemin):
+        return {}
+    
+    try:
+        return dict(_lire_archive(chemin))
+    except _ERREURS_ARCHIVE:
+        # On met le fichier de côté au lieu de l'écraser à la prochaine sauvegarde
+        os.replace(chemin, chemin + ".corrompu")
+        print(f"⚠️ Archive {FICHIER_ARCHIVE} corrompue, renommée en {FICHIER_ARCHIVE}.corrompu")
+        return {}
+
+
+def _sauvegarder_archive(archive: dict):
+    """Écrit l'archive compressée (fichier temporaire puis renommage, comme sauvegarder_json)."""
+    assurer_dossier_existe()
+    chemin = os.path.join(DOSSIER_DATA, FICHIER_ARCHIVE)
+    chemin_temporaire = chemin + ".tmp"
+    
+    with gzip.open(chemin_temporaire, "wt", encoding="utf-8") as fichier:
+        for user_id, data in archive.items():
+            fichier.write(json.dumps({"user_id": user_id, **data}, ensure_ascii=False) + "\n")
+    os.replace(chemin_temporaire, chemin)
+
+
+def _indexer_archive(archive: dict, sortis: set):
+    """Reconstruit l'index en mémoire (les membres déjà sortis n'y sont pas)."""
+    global _index_archive
+    
+    _index_archive = {
+        "ids": set(archive) - sortis,
+        "riches": heapq.nlargest(
+            TAILLE_CLASSEMENT_ARCHIVE,
+            ((user_id, data.get("solde", 0)) for user_id, data in archive.items() if user_id not in sortis),
+            key=lambda x: x[1]
+        ),
+        "sortis": sortis
+    }
+
+
+def _charger_index_archive() -> dict:
+    """Construit l'index de l'archive au premier appel."""
+    if _index_archive is None:
+        _indexer_archive(_charger_archive(), set(charger_json(FICHIER_SORTIES_ARCHIVE, [])))
+    return _index_archive
+
+
+def membre_archive(user_id: int) -> bool:
+    """True si le membre est actuellement dans l'archive."""
+    return str(user_id) in _charger_index_archive()["ids"]
+
+
+def nombre_membres_archives() -> int:
+    """Nombre de membres dans l'archive."""
+    return len(_charger_index_archive()["ids"])
+
+
+def _chercher_dans_archive(cle: str) -> dict | None:
+    """
+    Cherche un membre dans l'archive, ligne par ligne, sans la charger en entier.
+    Seule la ligne du membre est décodée (les autres sont reconnues à leur début).
+    """
+    chemin = os.path.join(DOSSIER_DATA, FICHIER_ARCHIVE)
+    debut = (json.dumps({"user_id": cle})[:-1] + ",").encode("utf-8")
+    
+    motif = b"\n" + debut
+    
+    try:
+        # Recherche par blocs d'octets : les lignes des autres membres ne sont ni découpées
+        # ni décodées. Le début du tampon garde la fin du bloc précédent (ligne coupée).
+        with gzip.open(chemin, "rb") as fichier:
+            tampon = b"\n"
+            while True:
+                bloc = fichier.read(TAILLE_BLOC_RECHERCHE_ARCHIVE)
+                tampon += bloc
+                position = tampon.find(motif)
+                if position != -1:
+                    fin = tampon.find(b"\n", position + 1)
+                    while fin == -1 and bloc:
+                        bloc = fichier.read(TAILLE_BLOC_RECHERCHE_ARCHIVE)
+                        tampon += bloc
+                        fin = tampon.find(b"\n", position + 1)
+                    data = json.loads(tampon[position + 1:fin if fin != -1 else None])
+                    data.pop("user_id")
+                    return data
+                if not bloc:
+                    return None
+                tampon = tampon[-len(motif):]
+    except _ERREURS_ARCHIVE as erreur:
+        print(f"⚠️ Archive {FICHIER_ARCHIVE} illisible, membre {cle} non retrouvé : {erreur}")
+    return None
+
+
+def _sortir_de_l_archive(user_id: int):
+    """
+    Ramène un membre archivé dans economy.json et cooldowns.json.
+    Ne coûte qu'un test dans un ensemble si le membre n'est pas archivé.
+    
+    L'archive n'est pas réécrite : le membre est noté dans FICHIER_SORTIES_ARCHIVE,
+    sa ligne sera retirée au prochain compactage (archiver_membres_inactifs).
+    """
+    if not membre_archive(user_id):
+        return
+    
+    cle = str(user_id)
+    data = _chercher_dans_archive(cle)
+    
+    if data is not None:
+        # Les fichiers "chauds" sont écrits en premier : un arrêt au milieu
+        # laisse le membre aux deux endroits, jamais nulle part.
+        # S'il y est déjà, la version chaude est gardée.
+        economie = charger_json("economy.json", {})
+        if cle not in economie:
+            economie[cle] = data.get("solde", 0)
+            sauvegarder_json("economy.json", economie)
+        
+        if data.get("cooldowns"):
+            cooldowns = charger_json("cooldowns.json", {})
+            for type_cooldown, horodatage in data["cooldowns"].items():
+                cooldowns.setdefault(f"{cle}_{type_cooldown}", horodatage)
+            sauvegarder_json("cooldowns.json", cooldowns)
+        
+        # Noté APRÈS les fichiers "chauds" : un arrêt entre les deux le
+        # laisse aux deux endroits, et la version chaude est gardée
+        _index_archive["sortis"].add(cle)
+        sauvegarder_json(FICHIER_SORTIES_ARCHIVE, sorted(_index_archive["sortis"]))
+    
+    _index_archive["ids"].discard(cle)
+    _index_archive["riches"] = [(u, s) for u, s in _index_archive["riches"] if u != cle]
+
+
+def archiver_membres_inactifs(membres_presents: set | None, duree_inactivite: int) -> int:
+    """
+    Déplace dans l'archive les membres inactifs ou partis du serveur.
+    
+    Un membre est inactif si son dernier /day, /week ou /month date de plus
+    de `duree_inactivite` et qu'il n'a rien gagné pendant les 30 derniers jours.
+    Sans aucun /day, /week ou /month enregistré, on ne sait pas quand il a
+    été actif pour la dernière fois : il n'est pas archivé sur ce critère
+    (ex: il dépense seulement, ou a reçu un remboursement / des Skycoins d'un admin).
+    
+    Arguments:
+        membres_presents: Les IDs des membres du serveur (None = ne pas
+                          archiver sur ce critère, ex: liste des membres incomplète)
+        duree_inactivite: Durée sans activité avant archivage (en secondes)
+    
+    Retourne:
+        Le nombre de membres archivés
+    """
+    maintenant = time.time()
+    economie = charger_json("economy.json", {})
+    cooldowns = charger_json("cooldowns.json", {})
+    
+    # Dernière activité de chaque membre (clés "user_id_type")
+    derniere_activite = {}
+    for cle, horodatage in cooldowns.items():
+        user_id = cle.rpartition("_")[0]
+        if horodatage > derniere_activite.get(user_id, 0):
+            derniere_activite[user_id] = horodatage
+    
+    gains_recents = _charger_gains()["totaux"]["30j"]
+    
+    a_archiver = set()
+    for user_id in economie.keys() | derniere_activite.keys():
+        parti = membres_presents is not None and int(user_id) not in membres_presents
+        inactif = (
+            user_id in derniere_activite
+            and maintenant - derniere_activite[user_id] >= duree_inactivite
+            and user_id not in gains_recents
+        )
+        if parti or inactif:
+            a_archiver.add(user_id)
+    
+    sortis = _charger_index_archive()["sortis"]
+    if not a_archiver and not sortis:
+        return 0
+    
+    # Un membre sorti puis de nouveau archivé ne doit plus être compté comme sorti
+    # (noté en premier : un arrêt juste après laisse sa version chaude, qui est gardée)
+    if sortis & a_archiver:
+        sortis = sortis - a_archiver
+        sauvegarder_json(FICHIER_SORTIES_ARCHIVE, sorted(sortis))
+    
+    # Compactage : les lignes des membres sortis depuis la dernière fois sont retirées
+    archive = _charger_archive()
+    for user_id in sortis:
+        archive.pop(user_id, None)
+    
+    for user_id in a_archiver:
+        entree = archive.setdefault(user_id, {"solde": 0, "cooldowns": {}})
+        if user_id in economie:
+            entree["solde"] = economie.pop(user_id)
+    
+    for cle in list(cooldowns):
+        user_id, _, type_cooldown = cle.rpartition("_")
+        if user_id in a_archiver:
+            archive[user_id]["cooldowns"][type_cooldown] = cooldowns.pop(cle)
+    
+    # L'archive est écrite en premier : un arrêt au milieu laisse
+    # les membres aux deux endroits, jamais nulle part
+    _sauvegarder_archive(archive)
+    sauvegarder_json("economy.json", economie)
+    sauvegarder_json("cooldowns.json", cooldowns)
+    
+    # En dernier : un arrêt avant laisse des IDs sortis absents de l'archive (sans effet)
+    sauvegarder_json(FICHIER_SORTIES_ARCHIVE, [])
+    
+    _indexer_archive(archive, set())
+    return len(a_archiver)
+
+
+def iterer_archive():
+    """
+    Parcourt les membres archivés (pour les exports), un par un,
+    sans charger toute l'archive en mémoire.
+    
+    Lecture seule : peut tourner dans un thread pendant que le bot
+    modifie l'archive (l'ancien fichier reste lisible jusqu'à la fin).
+    Les membres déjà sortis (pas encore compactés) sont ignorés.
+    
+    Retourne:
+        Générateur de (user_id, {"solde", "cooldowns"})
+    """
+    chemin = os.path.join(DOSSIER_DATA, FICHIER_ARCHIVE)
+    
+    if not os.path.exists(chemin):
+        return
+    
+    sortis = set(charger_json(FICHIER_SORTIES_ARCHIVE, []))
+    
+    try:
+        for user_id, data in _lire_archive(chemin):
+            if user_id not in sortis:
+                yield user_id, data
+    except _ERREURS_ARCHIVE:
+        print(f"⚠️ Archive {FICHIER_ARCHIVE} illisible, lecture interrompue")
+
+
+# ============================================
+# 🔔 FONCTIONS RAPPELS
+# ============================================
+
+def obtenir_rappels() -> dict:
+    """
+    Récupère les membres inscrits aux rappels.
+    
+    Retourne:
+        Dictionnaire {user_id: {type_cooldown: timestamp_du_cooldown_deja_rappele}}
+        Un dictionnaire vide = inscrit, mais aucun rappel envoyé pour l'instant.
+    """
+    return charger_json("rappels.json", {})
+
+
+def sauvegarder_rappels(rappels: dict):
+    """
+    Sauvegarde les inscriptions aux rappels.
+    """
+    sauvegarder_json("rappels.json", rappels)
 
 
 # ============================================
 # 🎭 FONCTIONS RÔLES PERSONNALISÉS
 # ============================================
+# En plus du fichier, un index en mémoire répond sans tout
+# parcourir à "qui a ce rôle ?" et "quels rôles a ce membre ?" :
+#   "membres": {proprietaire_id: {membre_id, ...}}
+#   "roles":   {membre_id: {proprietaire_id, ...}}
+# Toutes les écritures de custom_roles.json passent par les
+# fonctions ci-dessous, qui tiennent l'index à jour.
+# ============================================
+
+# Index en mémoire (construit depuis custom_roles.json au premier appel)
+_index_roles_perso = None
+
+
+def _charger_index_roles_perso() -> dict:
+    """
+    Construit l'index des membres des rôles perso.
+    N'est fait qu'une seule fois, ensuite il est tenu à jour à chaque écriture.
+    """
+    global _index_roles_perso
+    
+    if _index_roles_perso is None:
+        _index_roles_perso = {"membres": {}, "roles": {}}
+        for proprietaire_id, data in obtenir_roles_perso().items():
+            _indexer_role_perso(int(proprietaire_id), data.get("membres", []))
+    
+    return _index_roles_perso
+
+
+def _indexer_role_perso(proprietaire_id: int, membres):
+    """Ajoute des membres à un rôle dans l'index (dans les deux sens)."""
+    index = _index_roles_perso
+    index["membres"].setdefault(proprietaire_id, set()).update(membres)
+    for membre_id in membres:
+        index["roles"].setdefault(membre_id, set()).add(proprietaire_id)
+
+
+def _desindexer_membre(proprietaire_id: int, membre_id: int):
+    """Retire un membre d'un rôle dans l'index (dans les deux sens)."""
+    index = _index_roles_perso
+    index["membres"].get(proprietaire_id, set()).discard(membre_id)
+    roles = index["roles"].get(membre_id)
+    if roles is not None:
+        roles.discard(proprietaire_id)
+        if not roles:
+            del index["roles"][membre_id]
+
+
+def _desindexer_role_perso(proprietaire_id: int):
+    """Retire un rôle (et tous ses membres) de l'index."""
+    for membre_id in list(_index_roles_perso["membres"].get(proprietaire_id, ())):
+        _desindexer_membre(proprietaire_id, membre_id)
+    _index_roles_perso["membres"].pop(proprietaire_id, None)
+
 
 def obtenir_roles_perso() -> dict:
     """
@@ -244,6 +939,7 @@ def sauvegarder_role_perso(user_id: int, role_id: int, nom: str, couleur: int):
         couleur: La couleur du rôle (en entier)
     """
     roles = obtenir_roles_perso()
+    _charger_index_roles_perso()
     
     roles[str(user_id)] = {
         "role_id": role_id,
@@ -255,6 +951,9 @@ def sauvegarder_role_perso(user_id: int, role_id: int, nom: str, couleur: int):
     }
     
     sauvegarder_json("custom_roles.json", roles)
+    
+    _desindexer_role_perso(user_id)
+    _indexer_role_perso(user_id, [user_id])
 
 
 def ajouter_membre_role_perso(proprietaire_id: int, membre_id: int) -> bool:
@@ -268,14 +967,20 @@ def ajouter_membre_role_perso(proprietaire_id: int, membre_id: int) -> bool:
     Retourne:
         True si ajouté, False si le rôle n'existe pas
     """
+    index = _charger_index_roles_perso()
+    
+    # Déjà membre : rien à relire ni à écrire
+    if membre_id in index["membres"].get(proprietaire_id, ()):
+        return True
+    
     roles = obtenir_roles_perso()
     
     if str(proprietaire_id) not in roles:
         return False
     
-    if membre_id not in roles[str(proprietaire_id)]["membres"]:
-        roles[str(proprietaire_id)]["membres"].append(membre_id)
-        sauvegarder_json("custom_roles.json", roles)
+    roles[str(proprietaire_id)]["membres"].append(membre_id)
+    sauvegarder_json("custom_roles.json", roles)
+    _indexer_role_perso(proprietaire_id, [membre_id])
     
     return True
 
@@ -291,16 +996,150 @@ def supprimer_role_perso(user_id: int) -> int | None:
         L'ID du rôle Discord à supprimer, ou None si pas trouvé
     """
     roles = obtenir_roles_perso()
+    _charger_index_roles_perso()
     
     if str(user_id) in roles:
         role_id = roles[str(user_id)]["role_id"]
         del roles[str(user_id)]
         sauvegarder_json("custom_roles.json", roles)
+        _desindexer_role_perso(user_id)
         return role_id
     
     return None
 
 
+def obtenir_roles_du_membre(membre_id: int) -> set:
+    """
+    Récupère les rôles perso d'un membre (le sien et ceux partagés avec lui).
+    
+    Retourne:
+        Ensemble des IDs des propriétaires de ces rôles
+    """
+    return set(_charger_index_roles_perso()["roles"].get(membre_id, ()))
+
+
+def obtenir_membres_role_perso(proprietaire_id: int) -> set:
+    """
+    Récupère les membres qui ont le rôle perso d'un propriétaire.
+    
+    Retourne:
+        Ensemble des IDs des membres (vide si le rôle n'existe pas)
+    """
+    return set(_charger_index_roles_perso()["membres"].get(proprietaire_id, ()))
+
+
+def retirer_membres_roles_perso(membre_ids) -> dict:
+    """
+    Retire des membres (ex: partis du serveur) de tous leurs rôles perso,
+    en une seule lecture et une seule écriture du fichier.
+    
+    Grâce à l'index, seuls les rôles de ces membres sont touchés.
+    Le rôle d'un propriétaire retiré est supprimé.
+    
+    Arguments:
+        membre_ids: Les IDs des membres à retirer
+    
+    Retourne:
+        {proprietaire_id: role_id} des rôles supprimés (à supprimer sur Discord)
+    """
+    index = _charger_index_roles_perso()
+    concernes = [m for m in set(membre_ids) if m in index["roles"]]
+    
+    if not concernes:
+        return {}
+    
+    roles = obtenir_roles_perso()
+    supprimes = {}
+    
+    for membre_id in concernes:
+        for proprietaire_id in list(index["roles"].get(membre_id, ())):
+            data = roles.get(str(proprietaire_id))
+            
+            if proprietaire_id == membre_id:
+                # Le propriétaire est parti : son rôle disparaît
+                if data is not None:
+                    supprimes[proprietaire_id] = data["role_id"]
+                    del roles[str(proprietaire_id)]
+                _desindexer_role_perso(proprietaire_id)
+            else:
+                if data is not None:
+                    data["membres"] = [m for m in data["membres"] if m != membre_id]
+                _desindexer_membre(proprietaire_id, membre_id)
+    
+    sauvegarder_json("custom_roles.json", roles)
+    return supprimes
+
+
+def marquer_facture_role_perso(user_id: int, horodatage: float) -> bool:
+    """
+    Enregistre la date de la dernière facture d'un rôle personnalisé.
+    
+    Relit le fichier avant d'écrire : une modification faite entre-temps
+    (partage, suppression...) n'est pas écrasée.
+    
+    Arguments:
+        user_id: L'ID du propriétaire du rôle
+        horodatage: La date de la facture (timestamp)
+    
+    Retourne:
+        True si mis à jour, False si le rôle n'existe plus
+    """
+    roles = obtenir_roles_perso()
+    
+    if str(user_id) not in roles:
+        return False
+    
+    roles[str(user_id)]["derniere_facture"] = horodatage
+    sauvegarder_json("custom_roles.json", roles)
+    return True
+
+
+def obtenir_factures_dues(periode: int, apres: tuple | None = None, limite: int = 10) -> list:
+    """
+    Récupère les prochains rôles perso dont la facture est due,
+    triés par date d'échéance (puis par ID pour départager).
+    
+    Arguments:
+        periode: Temps entre deux factures (en secondes)
+        apres: (échéance, user_id) du dernier rôle traité : seuls les rôles
+               situés après lui dans l'ordre sont retournés
+        limite: Nombre maximum de rôles retournés
+    
+    Retourne:
+        Liste de (échéance, user_id, données du rôle)
+    """
+    maintenant = time.time()
+    
+    dus = (
+        (data.get("derniere_facture", 0) + periode, user_id, data)
+        for user_id, data in obtenir_roles_perso().items()
+    )
+    dus = (
+        (echeance, user_id, data) for echeance, user_id, data in dus
+        if echeance <= maintenant and (apres is None or (echeance, user_id) > apres)
+    )
+    
+    return heapq.nsmallest(limite, dus, key=lambda d: (d[0], d[1]))
+
+
+def obtenir_curseur_facturation() -> tuple | None:
+    """
+    Récupère l'endroit où la facturation des rôles perso s'est arrêtée.
+    
+    Retourne:
+        (échéance, user_id) du dernier rôle facturé, ou None pour repartir du début
+    """
+    curseur = charger_json("facturation.json", {}).get("curseur")
+    return tuple(curseur) if curseur else None
+
+
+def sauvegarder_curseur_facturation(curseur: tuple | None):
+    """
+    Sauvegarde l'endroit où la facturation des rôles perso s'est arrêtée.
+    """
+    sauvegarder_json("facturation.json", {"curseur": list(curseur) if curseur else None})
+
+
 # ============================================
 # 👑 FONCTIONS RÔLES VIP
 # ============================================
@@ -315,13 +1154,16 @@ def obtenir_vip() -> dict:
     return charger_json("vip_roles.json", {})
 
 
-def ajouter_vip(user_id: int, duree_jours: int = 30):
+def ajouter_vip(user_id: int, duree_jours: int = 30) -> float:
     """
     Ajoute un utilisateur comme VIP.
     
     Arguments:
         user_id: L'ID de l'utilisateur
         duree_jours: Durée du VIP en jours (défaut: 30)
+    
+    Retourne:
+        Le timestamp d'expiration
     """
     vip = obtenir_vip()
     
@@ -330,6 +1172,7 @@ def ajouter_vip(user_id: int, duree_jours: int = 30):
     
     vip[str(user_id)] = expiration
     sauvegarder_json("vip_roles.json", vip)
+    return expiration
 
 
 def verifier_vip_expire(user_id: int) -> bool:
@@ -361,6 +1204,20 @@ def supprimer_vip(user_id: int):
         sauvegarder_json("vip_roles.json", vip)
 
 
+def supprimer_vips(user_ids: list):
+    """
+    Retire le statut VIP de plusieurs utilisateurs en une seule sauvegarde.
+    """
+    vip = obtenir_vip()
+    
+    supprimes = [str(user_id) for user_id in user_ids if str(user_id) in vip]
+    for user_id in supprimes:
+        del vip[user_id]
+    
+    if supprimes:
+        sauvegarder_json("vip_roles.json", vip)
+
+
 def obtenir_vip_expires() -> list:
     """
     Récupère la liste des VIP qui ont expiré.
@@ -0,0 +1,126 @@
+# ============================================
+# ⏰ ÉCHÉANCIER (PLANIFICATEUR D'ÉVÉNEMENTS)
+# ============================================
+# Garde une liste d'échéances (rappels, expirations...)
+# et réveille le bot pile au bon moment.
+#
+# Au lieu de vérifier tout le monde toutes les X minutes,
+# on range les échéances dans un "tas" (heapq) : la plus
+# proche est toujours en haut. Le bot dort jusqu'à cette
+# échéance et ne traite que ce qui est dû.
+# ============================================
+
+import asyncio
+import heapq
+import time
+from typing import Hashable
+
+
+class Echeancier:
+    """
+    File d'échéances triée par date.
+
+    Chaque clé (ex: (user_id, "day")) n'a qu'une seule échéance :
+    la reprogrammer remplace l'ancienne.
+
+    Exemple:
+        echeancier = Echeancier()
+        echeancier.programmer(("123", "day"), time.time() + 60)
+
+        while True:
+            dus = await echeancier.attendre_dus()
+            for cle, echeance in dus:
+                ...
+    """
+
+    def __init__(self):
+        # Le tas contient des tuples (echeance, cle). Quand une clé est
+        # reprogrammée ou annulée, l'ancien tuple reste dans le tas et est
+        # ignoré quand il remonte en haut (on compare avec _echeances).
+        self._tas: list[tuple[float, Hashable]] = []
+        self._echeances: dict[Hashable, float] = {}
+        self._reveil = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._echeances)
+
+    def __contains__(self, cle: Hashable) -> bool:
+        return cle in self._echeances
+
+    def programmer(self, cle: Hashable, echeance: float):
+        """
+        Programme (ou reprogramme) une échéance.
+
+        Arguments:
+            cle: Identifiant de l'échéance
+            echeance: Timestamp (time.time()) auquel elle devient due
+        """
+        prochaine = self.prochaine_echeance()
+
+        self._echeances[cle] = echeance
+        heapq.heappush(self._tas, (echeance, cle))
+
+        # Nouvelle échéance plus proche que celle attendue : on réveille la boucle
+        if prochaine is None or echeance < prochaine:
+            self._reveil.set()
+
+        self._compacter()
+
+    def annuler(self, cle: Hashable):
+        """Annule une échéance (ne fait rien si elle n'existe pas)."""
+        self._echeances.pop(cle, None)
+
+    def prochaine_echeance(self) -> float | None:
+        """Retourne le timestamp de la prochaine échéance, ou None s'il n'y en a pas."""
+        while self._tas:
+            echeance, cle = self._tas[0]
+            if self._echeances.get(cle) == echeance:
+                return echeance
+            # Entrée périmée (annulée ou reprogrammée)
+            heapq.heappop(self._tas)
+        return None
+
+    def extraire_dus(self, maintenant: float | None = None) -> list[tuple[Hashable, float]]:
+        """
+        Retire et retourne toutes les échéances dues.
+
+        Retourne:
+            Liste de tuples (cle, echeance), de la plus ancienne à la plus récente
+        """
+        if maintenant is None:
+            maintenant = time.time()
+
+        dus = []
+        while self._tas and self._tas[0][0] <= maintenant:
+            echeance, cle = heapq.heappop(self._tas)
+            if self._echeances.get(cle) == echeance:
+                del self._echeances[cle]
+                dus.append((cle, echeance))
+        return dus
+
+    async def attendre_dus(self) -> list[tuple[Hashable, float]]:
+        """
+        Dort jusqu'à la prochaine échéance puis retourne tout ce qui est dû.
+        Se réveille plus tôt si une échéance plus proche est programmée entre-temps.
+        """
+        while True:
+            self._reveil.clear()
+            prochaine = self.prochaine_echeance()
+
+            if prochaine is not None:
+                delai = prochaine - time.time()
+                if delai <= 0:
+                    return self.extraire_dus()
+            else:
+                delai = None
+
+            try:
+                await asyncio.wait_for(self._reveil.wait(), timeout=delai)
+            except asyncio.TimeoutError:
+                pass
+
+    def _compacter(self):
+        """Reconstruit le tas quand il contient trop d'entrées périmées."""
+        if len(self._tas) > 2 * len(self._echeances) + 1000:
+            self._tas = [(echeance, cle) for cle, echeance in self._echeances.items()]
+            heapq.heapify(self._tas)
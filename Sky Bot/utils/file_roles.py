@@ -0,0 +1,244 @@
+# ============================================
+# 🎭 FILE DES MODIFICATIONS DE RÔLES
+# ============================================
+# Toutes les attributions, retraits et suppressions
+# de rôles passent par cette file au lieu d'appeler
+# add_roles / remove_roles / role.delete un par un.
+#
+# Avantages :
+# - plusieurs changements pour le même membre sont fusionnés
+#   (un ajout puis un retrait du même rôle s'annulent)
+# - une même opération demandée deux fois n'est faite qu'une fois
+# - seuls les rôles concernés sont envoyés à Discord (ajout ou
+#   retrait rôle par rôle) : jamais la liste complète des rôles,
+#   qui écraserait les changements faits en même temps par un modo
+#   ou un autre bot
+# - chaque "route" de l'API Discord a son propre limiteur
+#   de débit : une vague de retraits de VIP ne bloque pas
+#   sur les limites de Discord
+# ============================================
+
+import asyncio
+from collections import deque
+
+import discord
+
+from utils.limiteur import LimiteurDebit
+from utils.metriques import metriques
+
+
+# Débit maximum par route de l'API Discord : (requêtes par seconde, rafale)
+DEBITS_ROUTES = {
+    "roles_membre": (5, 5),         # PUT / DELETE /guilds/{guild}/members/{membre}/roles/{role}
+    "supprimer_role": (1, 2),       # DELETE /guilds/{guild}/roles/{role}
+}
+
+
+class MembreIntrouvable(Exception):
+    """Le membre a quitté le serveur avant que ses rôles soient modifiés."""
+
+
+class _ModificationMembre:
+    """Changements de rôles en attente pour un membre."""
+
+    def __init__(self):
+        self.ajouts: dict[int, discord.Role] = {}
+        self.retraits: dict[int, discord.Role] = {}
+        self.raisons: list[str] = []
+        self.futures: list[asyncio.Future] = []
+
+
+class FileRoles:
+    """
+    File centrale des opérations sur les rôles.
+
+    Chaque méthode retourne un Future : on peut l'attendre (await) pour
+    savoir si l'opération a réussi, ou l'ignorer dans une tâche de fond.
+    Si le membre a quitté le serveur, le Future lève MembreIntrouvable.
+
+    Exemple:
+        # Attend le résultat (lève discord.Forbidden si le bot n'a pas la permission)
+        await bot.file_roles.ajouter_role(membre, role, raison="Achat VIP")
+
+        # Sans attendre (ex: dans une boucle de retraits)
+        bot.file_roles.retirer_role(membre, role_vip, raison="VIP expiré")
+    """
+
+    def __init__(self, bot: discord.Client):
+        self.bot = bot
+
+        # Ordre d'arrivée des opérations (sans doublon)
+        self._ordre: deque = deque()
+        # ("membre", guild_id, membre_id) -> _ModificationMembre
+        self._membres: dict[tuple, _ModificationMembre] = {}
+        # ("role", role_id) -> (role, raison, futures)
+        self._suppressions: dict[tuple, tuple[discord.Role, str | None, list[asyncio.Future]]] = {}
+
+        self._limiteurs: dict[tuple, LimiteurDebit] = {}
+        self._signal = asyncio.Event()
+        self._tache: asyncio.Task | None = None
+
+        metriques.enregistrer_jauge("file_roles.en_attente", lambda: self.en_attente)
+
+    # ================================
+    # 📊 ÉTAT
+    # ================================
+
+    @property
+    def en_attente(self) -> int:
+        """Nombre d'opérations (membres à modifier + rôles à supprimer) en attente."""
+        return len(self._ordre)
+
+    # ================================
+    # ▶️ DÉMARRAGE / ARRÊT
+    # ================================
+
+    def demarrer(self):
+        """Lance le travailleur qui vide la file (à appeler une seule fois)."""
+        if self._tache is None:
+            self._tache = asyncio.create_task(self._travailleur())
+
+    def arreter(self):
+        """Arrête le travailleur."""
+        if self._tache is not None:
+            self._tache.cancel()
+            self._tache = None
+
+    # ================================
+    # 📥 AJOUT D'OPÉRATIONS
+    # ================================
+
+    def ajouter_role(self, membre: discord.Member, role: discord.Role, raison: str = None) -> asyncio.Future:
+        """Ajoute un rôle à un membre."""
+        modif = self._modification(membre)
+        modif.retraits.pop(role.id, None)
+        modif.ajouts[role.id] = role
+        return self._enregistrer(modif, raison)
+
+    def retirer_role(self, membre: discord.Member, role: discord.Role, raison: str = None) -> asyncio.Future:
+        """Retire un rôle à un membre."""
+        modif = self._modification(membre)
+        modif.ajouts.pop(role.id, None)
+        modif.retraits[role.id] = role
+        return self._enregistrer(modif, raison)
+
+    def supprimer_role(self, role: discord.Role, raison: str = None) -> asyncio.Future:
+        """Supprime un rôle du serveur."""
+        cle = ("role", role.id)
+        future = self._nouveau_future()
+
+        if cle in self._suppressions:
+            # Suppression déjà demandée : on attend la même
+            self._suppressions[cle][2].append(future)
+        else:
+            self._suppressions[cle] = (role, raison, [future])
+            self._ordre.append(cle)
+            self._signal.set()
+
+        return future
+
+    def _modification(self, membre: discord.Member) -> _ModificationMembre:
+        """Retourne (ou crée) les changements en attente d'un membre."""
+        cle = ("membre", membre.guild.id, membre.id)
+        modif = self._membres.get(cle)
+        if modif is None:
+            modif = _ModificationMembre()
+            self._membres[cle] = modif
+            self._ordre.append(cle)
+            self._signal.set()
+        return modif
+
+    def _enregistrer(self, modif: _ModificationMembre, raison: str | None) -> asyncio.Future:
+        if raison and raison not in modif.raisons:
+            modif.raisons.append(raison)
+        future = self._nouveau_future()
+        modif.futures.append(future)
+        return future
+
+    @staticmethod
+    def _nouveau_future() -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        # Évite l'avertissement "exception never retrieved" quand personne n'attend le résultat
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        return future
+
+    # ================================
+    # ⚙️ EXÉCUTION
+    # ================================
+
+    async def _attendre_route(self, route: str, guild_id: int):
+        """Respecte le débit de la route (un limiteur par route et par serveur)."""
+        cle = (route, guild_id)
+        limiteur = self._limiteurs.get(cle)
+        if limiteur is None:
+            par_seconde, rafale = DEBITS_ROUTES[route]
+            limiteur = LimiteurDebit(par_seconde=par_seconde, rafale=rafale)
+            self._limiteurs[cle] = limiteur
+        await limiteur.attendre()
+
+    async def _travailleur(self):
+        """Exécute les opérations une par une, dans leur ordre d'arrivée."""
+        await self.bot.wait_until_ready()
+
+        while True:
+            if not self._ordre:
+                self._signal.clear()
+                await self._signal.wait()
+                continue
+
+            cle = self._ordre.popleft()
+
+            if cle[0] == "membre":
+                modif = self._membres.pop(cle)
+                futures = modif.futures
+                operation = self._appliquer_modification(cle[1], cle[2], modif)
+            else:
+                role, raison, futures = self._suppressions.pop(cle)
+                operation = self._supprimer(role, raison)
+
+            try:
+                resultat = await operation
+            except Exception as erreur:
+                if not isinstance(erreur, (discord.HTTPException, MembreIntrouvable)):
+                    print(f"❌ File des rôles : erreur inattendue : {erreur}")
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(erreur)
+            else:
+                for future in futures:
+                    if not future.done():
+                        future.set_result(resultat)
+
+    async def _appliquer_modification(self, guild_id: int, membre_id: int, modif: _ModificationMembre):
+        """
+        Applique les changements fusionnés d'un membre, rôle par rôle.
+
+        Les rôles du cache (membre.roles) ne servent PAS à construire la requête :
+        ils peuvent être en retard sur Discord. Ajouter un rôle déjà présent ou
+        retirer un rôle absent ne change rien côté Discord.
+        """
+        guild = self.bot.get_guild(guild_id)
+        membre = guild.get_member(membre_id) if guild else None
+        if membre is None:
+            # Les appelants (achats...) ne doivent pas prélever de Skycoins
+            raise MembreIntrouvable(membre_id)
+
+        raison = " / ".join(modif.raisons) or None
+
+        for role in modif.ajouts.values():
+            await self._attendre_route("roles_membre", guild_id)
+            await membre.add_roles(role, reason=raison)
+
+        for role in modif.retraits.values():
+            await self._attendre_route("roles_membre", guild_id)
+            await membre.remove_roles(role, reason=raison)
+
+        return membre
+
+    async def _supprimer(self, role: discord.Role, raison: str | None):
+        """Supprime un rôle (ne fait rien s'il n'existe déjà plus)."""
+        await self._attendre_route("supprimer_role", role.guild.id)
+        try:
+            await role.delete(reason=raison)
+        except discord.NotFound:
+            pass
@@ -0,0 +1,52 @@
+# ============================================
+# 🚦 LIMITEUR DE DÉBIT
+# ============================================
+# Discord limite le nombre de requêtes qu'un bot peut
+# faire par seconde. Ce limiteur permet d'étaler nos
+# envois pour ne jamais dépasser un certain rythme.
+#
+# Principe du "seau de jetons" :
+# - le seau contient au maximum `rafale` jetons
+# - il se remplit de `par_seconde` jetons chaque seconde
+# - chaque requête consomme un jeton (ou attend qu'il y en ait un)
+# ============================================
+
+import asyncio
+import time
+
+
+class LimiteurDebit:
+    """
+    Limite le nombre d'opérations par seconde.
+
+    Exemple:
+        limiteur = LimiteurDebit(par_seconde=5, rafale=5)
+        await limiteur.attendre()   # Attend si on va trop vite
+        await membre.send("Coucou !")
+    """
+
+    def __init__(self, par_seconde: float, rafale: int = 1):
+        self.par_seconde = par_seconde
+        self.rafale = rafale
+        self._jetons = float(rafale)
+        self._derniere_recharge = time.monotonic()
+        self._verrou = asyncio.Lock()
+
+    def _recharger(self):
+        """Ajoute les jetons gagnés depuis la dernière recharge."""
+        maintenant = time.monotonic()
+        ecoule = maintenant - self._derniere_recharge
+        self._jetons = min(self.rafale, self._jetons + ecoule * self.par_seconde)
+        self._derniere_recharge = maintenant
+
+    async def attendre(self):
+        """
+        Attend qu'un jeton soit disponible, puis le consomme.
+        Les appels sont servis dans l'ordre d'arrivée.
+        """
+        async with self._verrou:
+            self._recharger()
+            if self._jetons < 1:
+                await asyncio.sleep((1 - self._jetons) / self.par_seconde)
+                self._recharger()
+            self._jetons -= 1
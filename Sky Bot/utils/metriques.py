@@ -0,0 +1,125 @@
+# ============================================
+# 📊 MÉTRIQUES DU BOT
+# ============================================
+# Un registre central où chaque module peut compter
+# des événements (messages envoyés, erreurs...) et
+# mesurer des durées. Les admins les consultent
+# avec la commande /metriques.
+#
+# - Compteur : un nombre qui augmente (ex: DM envoyés)
+# - Jauge : une valeur lue au moment de l'affichage (ex: taille d'une file)
+# - Histogramme : des durées, résumées en p50 / p95 / p99
+#   (avec, si besoin, un détail par salon, par route...)
+# ============================================
+
+from collections import deque
+from typing import Callable
+
+
+class Histogramme:
+    """
+    Garde les dernières mesures et calcule leurs percentiles.
+
+    Seules les `taille` dernières mesures sont gardées :
+    la mémoire reste fixe même après des millions de mesures.
+    """
+
+    def __init__(self, taille: int = 1000):
+        self._mesures: deque[float] = deque(maxlen=taille)
+        self.nombre_total = 0
+
+    def ajouter(self, valeur: float):
+        """Enregistre une mesure."""
+        self._mesures.append(valeur)
+        self.nombre_total += 1
+
+    def percentile(self, p: float) -> float | None:
+        """
+        Retourne le p-ième percentile des dernières mesures (None si aucune).
+
+        Exemple:
+            histo.percentile(95)  # 95% des mesures sont en dessous de cette valeur
+        """
+        if not self._mesures:
+            return None
+        return self._rang(sorted(self._mesures), p)
+
+    def resume(self) -> dict:
+        """Retourne {"n", "p50", "p95", "p99"} (un seul tri pour les trois percentiles)."""
+        if not self._mesures:
+            return {"n": 0, "p50": None, "p95": None, "p99": None}
+        tri = sorted(self._mesures)
+        return {
+            "n": self.nombre_total,
+            "p50": self._rang(tri, 50),
+            "p95": self._rang(tri, 95),
+            "p99": self._rang(tri, 99),
+        }
+
+    @staticmethod
+    def _rang(tri: list[float], p: float) -> float:
+        return tri[min(len(tri) - 1, int(round(p / 100 * (len(tri) - 1))))]
+
+
+# Nombre maximum de détails différents par histogramme (ex: nombre de salons suivis)
+TAILLE_MAX_DETAILS = 50
+
+
+class Metriques:
+    """
+    Registre de toutes les métriques du bot.
+
+    Exemple:
+        metriques.incrementer("notifications.envoyees")
+        metriques.mesurer("notifications.latence_ms", 42.0)
+        metriques.mesurer("pingguard.suppression_ms", 180.0, detail=str(salon.id))
+        metriques.enregistrer_jauge("file_roles.en_attente", lambda: bot.file_roles.en_attente)
+    """
+
+    def __init__(self):
+        self.compteurs: dict[str, int] = {}
+        self.histogrammes: dict[str, Histogramme] = {}
+        # {nom: {detail: histogramme}} (ex: une latence par salon)
+        self.details: dict[str, dict[str, Histogramme]] = {}
+        self._jauges: dict[str, Callable[[], float]] = {}
+
+    def incrementer(self, nom: str, valeur: int = 1):
+        """Ajoute `valeur` à un compteur."""
+        self.compteurs[nom] = self.compteurs.get(nom, 0) + valeur
+
+    def mesurer(self, nom: str, valeur: float, detail: str = None):
+        """
+        Ajoute une mesure à un histogramme (créé si besoin).
+
+        Avec `detail`, la mesure est aussi rangée dans un histogramme à part
+        pour ce détail (au plus TAILLE_MAX_DETAILS détails par nom).
+        """
+        histogramme = self.histogrammes.get(nom)
+        if histogramme is None:
+            histogramme = self.histogrammes[nom] = Histogramme()
+        histogramme.ajouter(valeur)
+
+        if detail is None:
+            return
+
+        details = self.details.get(nom)
+        if details is None:
+            details = self.details[nom] = {}
+        histogramme = details.get(detail)
+        if histogramme is None:
+            if len(details) >= TAILLE_MAX_DETAILS:
+                return
+            histogramme = details[detail] = Histogramme()
+        histogramme.ajouter(valeur)
+
+    def enregistrer_jauge(self, nom: str, lecture: Callable[[], float]):
+        """Enregistre une fonction qui donne la valeur actuelle d'une jauge."""
+        self._jauges[nom] = lecture
+
+    def jauges(self) -> dict[str, float]:
+        """Lit la valeur actuelle de toutes les jauges."""
+        return {nom: lecture() for nom, lecture in self._jauges.items()}
+
+
+# Registre unique partagé par tout le bot
+metriques = Metriques()
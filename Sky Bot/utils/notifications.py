@@ -0,0 +1,135 @@
+# ============================================
+# 📬 FILE D'ENVOI DES MESSAGES PRIVÉS
+# ============================================
+# Les messages privés (DM) envoyés par le bot passent
+# par une file d'attente : les cogs y déposent leurs
+# messages et repartent tout de suite. Plusieurs
+# "travailleurs" les envoient en parallèle, en respectant
+# un débit maximum global pour ne pas se faire limiter
+# par Discord.
+#
+# Un DM lent ou refusé ne bloque donc plus une boucle
+# (retrait des VIP, facturation...).
+# ============================================
+
+import asyncio
+import time
+
+import discord
+
+from utils.limiteur import LimiteurDebit
+from utils.metriques import metriques
+
+
+# Nombre maximum de DM envoyés par seconde (tous travailleurs confondus)
+DM_PAR_SECONDE = 2
+
+# Nombre de DM envoyés en parallèle au maximum
+NB_TRAVAILLEURS = 3
+
+# Pendant combien de temps on se souvient qu'un membre a fermé ses DM (secondes)
+DUREE_MEMOIRE_DM_FERMES = 24 * 3600
+
+# Code d'erreur Discord : "Cannot send messages to this user"
+CODE_DM_FERMES = 50007
+
+
+class FileNotifications:
+    """
+    File d'attente des messages privés du bot.
+
+    Exemple:
+        bot.notifications.envoyer(user_id, embed=embed_info("Coucou", "..."))
+    """
+
+    def __init__(self, bot: discord.Client):
+        self.bot = bot
+        self._file: asyncio.Queue = asyncio.Queue()
+        self._limiteur = LimiteurDebit(par_seconde=DM_PAR_SECONDE, rafale=DM_PAR_SECONDE)
+        self._taches: list[asyncio.Task] = []
+
+        # {user_id: timestamp} des membres dont les DM sont fermés
+        self._dm_fermes: dict[int, float] = {}
+
+        metriques.enregistrer_jauge("notifications.en_attente", lambda: self.en_attente)
+        metriques.enregistrer_jauge("notifications.dm_fermes_connus", lambda: len(self._dm_fermes))
+
+    @property
+    def en_attente(self) -> int:
+        """Nombre de messages qui attendent d'être envoyés."""
+        return self._file.qsize()
+
+    def demarrer(self):
+        """Lance les travailleurs qui vident la file (à appeler une seule fois)."""
+        if not self._taches:
+            self._taches = [
+                asyncio.create_task(self._travailleur())
+                for _ in range(NB_TRAVAILLEURS)
+            ]
+
+    def arreter(self):
+        """Arrête les travailleurs."""
+        for tache in self._taches:
+            tache.cancel()
+        self._taches = []
+
+    def dm_fermes(self, user_id: int) -> bool:
+        """True si on sait que ce membre n'accepte pas les DM du bot."""
+        horodatage = self._dm_fermes.get(user_id)
+        if horodatage is None:
+            return False
+        if time.time() - horodatage > DUREE_MEMOIRE_DM_FERMES:
+            # Souvenir trop vieux : le membre a peut-être rouvert ses DM
+            del self._dm_fermes[user_id]
+            return False
+        return True
+
+    def envoyer(self, user_id: int, **contenu):
+        """
+        Ajoute un message privé à la file. Ne bloque pas.
+
+        Arguments:
+            user_id: L'ID Discord du destinataire
+            contenu: Les arguments de .send() (content=..., embed=...)
+        """
+        if self.dm_fermes(user_id):
+            metriques.incrementer("notifications.ignorees_dm_fermes")
+            return
+        self._file.put_nowait((user_id, contenu, time.perf_counter()))
+
+    async def _travailleur(self):
+        """Envoie les messages de la file, au rythme du limiteur partagé."""
+        await self.bot.wait_until_ready()
+
+        while True:
+            user_id, contenu, ajoute_a = await self._file.get()
+            try:
+                # Les DM ont pu être déclarés fermés pendant l'attente
+                if self.dm_fermes(user_id):
+                    metriques.incrementer("notifications.ignorees_dm_fermes")
+                    continue
+
+                await self._limiteur.attendre()
+
+                destinataire = self.bot.get_user(user_id)
+                if destinataire is None:
+                    destinataire = await self.bot.fetch_user(user_id)
+
+                await destinataire.send(**contenu)
+
+                metriques.incrementer("notifications.envoyees")
+                metriques.mesurer("notifications.latence_ms", (time.perf_counter() - ajoute_a) * 1000)
+            except discord.Forbidden as erreur:
+                if erreur.code == CODE_DM_FERMES:
+                    # On ne réessaiera pas avant DUREE_MEMOIRE_DM_FERMES
+                    self._dm_fermes[user_id] = time.time()
+                    metriques.incrementer("notifications.dm_fermes")
+                else:
+                    metriques.incrementer("notifications.echecs")
+            except discord.HTTPException:
+                metriques.incrementer("notifications.echecs")  # Utilisateur introuvable...
+            except Exception as e:
+                metriques.incrementer("notifications.echecs")
+                print(f"❌ Notifications : erreur inattendue pour {user_id} : {e}")
+            finally:
+                self._file.task_done()
@@ -0,0 +1,190 @@
+# ============================================
+# 🏗️ CRÉATION DES RÔLES PERSONNALISÉS
+# ============================================
+# L'achat d'un rôle perso se fait en plusieurs étapes :
+#   1. réservation : les Skycoins sont retirés AVANT tout appel à Discord
+#   2. création du rôle
+#   3. placement du rôle sous le rôle le plus haut du bot
+#   4. attribution du rôle à l'acheteur (via la file des rôles)
+#   5. enregistrement dans custom_roles.json
+#
+# Si une étape échoue, les étapes déjà faites sont annulées
+# (rôle supprimé, Skycoins remboursés) : plus de rôle orphelin
+# ni d'achat payé sans rôle.
+#
+# Les placements demandés au même moment sont regroupés en
+# UN seul appel à Discord (edit_role_positions).
+# Chaque étape est chronométrée dans le registre de métriques.
+# ============================================
+
+import asyncio
+import time
+
+import discord
+
+from utils.database import modifier_solde, sauvegarder_role_perso
+from utils.metriques import metriques
+
+
+# Temps d'attente avant d'envoyer les placements regroupés (secondes)
+DELAI_REGROUPEMENT_POSITIONS = 0.5
+
+
+class _Chrono:
+    """Mesure la durée d'une étape dans l'histogramme provisionnement.<etape>_ms."""
+
+    def __init__(self, etape: str):
+        self.etape = etape
+
+    def __enter__(self):
+        self.debut = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        metriques.mesurer(f"provisionnement.{self.etape}_ms", (time.perf_counter() - self.debut) * 1000)
+        return False
+
+
+class ProvisionnementRoles:
+    """
+    Crée les rôles personnalisés achetés dans la boutique.
+
+    Exemple:
+        role = await bot.provisionnement.creer_role_perso(
+            membre, "⭐ Sky", 0xFF5733, prix=PRIX_ROLE_PERSO
+        )
+    """
+
+    def __init__(self, bot: discord.Client):
+        self.bot = bot
+
+        # guild_id -> {role_id: (role, position, futures)} des placements en attente
+        self._positions: dict[int, dict[int, tuple[discord.Role, int, list[asyncio.Future]]]] = {}
+
+        # Envois de placements en cours (gardés ici pour ne pas être ramassés par le GC)
+        self._taches: set[asyncio.Task] = set()
+
+    # ================================
+    # 🏗️ PIPELINE COMPLET
+    # ================================
+
+    async def creer_role_perso(self, membre: discord.Member, nom: str, couleur: int, prix: int) -> discord.Role:
+        """
+        Crée, place et attribue un rôle perso, puis l'enregistre.
+
+        L'appelant doit tenir le verrou du membre et avoir vérifié son solde.
+        En cas d'erreur (ou d'annulation), tout est annulé puis l'erreur est relevée.
+
+        Arguments:
+            membre: L'acheteur
+            nom: Le nom du rôle (emoji compris)
+            couleur: La couleur du rôle (en entier)
+            prix: Le nombre de Skycoins à prélever
+        """
+        guild = membre.guild
+        role = None
+        reserve = False
+        debut = time.perf_counter()
+
+        try:
+            with _Chrono("reservation"):
+                modifier_solde(membre.id, -prix)
+                reserve = True
+
+            with _Chrono("creation"):
+                role = await guild.create_role(
+                    name=nom,
+                    colour=discord.Colour(couleur),
+                    reason=f"Rôle personnalisé acheté par {membre.name}"
+                )
+
+            with _Chrono("placement"):
+                await self.placer_role(role, max(1, guild.me.top_role.position - 1))
+
+            with _Chrono("attribution"):
+                await self.bot.file_roles.ajouter_role(membre, role, raison="Achat d'un rôle personnalisé")
+
+            with _Chrono("enregistrement"):
+                sauvegarder_role_perso(membre.id, role.id, nom, couleur)
+
+        except BaseException:
+            # BaseException : une annulation (asyncio.CancelledError) après le
+            # prélèvement doit aussi rembourser et supprimer le rôle
+            metriques.incrementer("provisionnement.echecs")
+            await self._compenser(membre, role, prix if reserve else 0)
+            raise
+
+        metriques.incrementer("provisionnement.reussis")
+        metriques.mesurer("provisionnement.total_ms", (time.perf_counter() - debut) * 1000)
+        return role
+
+    async def _compenser(self, membre: discord.Member, role: discord.Role | None, remboursement: int):
+        """Annule les étapes déjà faites d'un achat qui a échoué."""
+        with _Chrono("compensation"):
+            if role is not None:
+                try:
+                    await self.bot.file_roles.supprimer_role(role, raison="Achat de rôle personnalisé annulé")
+                except Exception as e:
+                    metriques.incrementer("provisionnement.compensations_echouees")
+                    print(f"❌ Provisionnement : rôle orphelin {role.id} non supprimé : {e}")
+
+            if remboursement:
+                modifier_solde(membre.id, remboursement, compter_gain=False)
+
+    # ================================
+    # 📐 PLACEMENTS REGROUPÉS
+    # ================================
+
+    def placer_role(self, role: discord.Role, position: int) -> asyncio.Future:
+        """
+        Demande le placement d'un rôle. Les demandes qui arrivent pendant
+        DELAI_REGROUPEMENT_POSITIONS sont envoyées ensemble en un seul appel.
+        """
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+        en_attente = self._positions.get(role.guild.id)
+        if en_attente is None:
+            en_attente = self._positions[role.guild.id] = {}
+            tache = asyncio.create_task(self._envoyer_positions(role.guild))
+            self._taches.add(tache)
+            tache.add_done_callback(self._taches.discard)
+
+        _, _, futures = en_attente.setdefault(role.id, (role, position, []))
+        futures.append(future)
+        return future
+
+    async def _envoyer_positions(self, guild: discord.Guild):
+        """Envoie tous les placements en attente d'un serveur en une requête."""
+        en_attente = None
+        erreur_envoi = None
+        termine = False
+
+        try:
+            await asyncio.sleep(DELAI_REGROUPEMENT_POSITIONS)
+            en_attente = self._positions.pop(guild.id, {})
+            positions = {role: position for role, position, _ in en_attente.values()}
+
+            if positions:
+                metriques.incrementer("provisionnement.appels_placement")
+                metriques.incrementer("provisionnement.roles_places", len(positions))
+                await guild.edit_role_positions(positions, reason="Placement des rôles personnalisés")
+            termine = True
+        except Exception as erreur:
+            erreur_envoi = erreur
+        finally:
+            # Quoi qu'il arrive (refus de Discord, erreur, arrêt du bot), chaque achat en
+            # attente reçoit une réponse : aucun ne reste bloqué sous le verrou du membre
+            if en_attente is None:
+                en_attente = self._positions.pop(guild.id, {})
+
+            for _, _, futures in en_attente.values():
+                for future in futures:
+                    if future.done():
+                        continue
+                    if erreur_envoi is not None:
+                        future.set_exception(erreur_envoi)
+                    elif termine:
+                        future.set_result(None)
+                    else:
+                        future.cancel()
@@ -0,0 +1,296 @@
+# ============================================
+# 🧹 SUPPRESSION DE MESSAGES EN FLUX
+# ============================================
+# Parcourt l'historique d'un salon page par page (sans
+# tout charger en mémoire), garde les messages qui
+# correspondent à un filtre et les supprime :
+#
+# - messages de moins de 14 jours : par paquets de 100
+#   (UNE requête à Discord par paquet)
+# - messages plus anciens : Discord refuse la suppression
+#   en masse, ils sont supprimés un par un, à un rythme limité
+#
+# La mémoire utilisée ne dépend pas du nombre de messages
+# parcourus : au plus un paquet de 100 messages est gardé.
+#
+# purger_salons() fait la même chose sur plusieurs salons
+# en parallèle (nombre de salons simultanés limité).
+# ============================================
+
+import asyncio
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+import discord
+
+from utils.limiteur import LimiteurDebit
+from utils.metriques import metriques
+
+
+# Discord refuse la suppression en masse des messages de plus de 14 jours
+# (une petite marge évite un refus pour un message à la limite)
+AGE_MAX_SUPPRESSION_GROUPEE = timedelta(days=14) - timedelta(minutes=5)
+
+# Taille maximum d'un paquet (limite de Discord)
+TAILLE_PAQUET = 100
+
+# Débit des suppressions une par une (messages anciens) : (par seconde, rafale)
+DEBIT_SUPPRESSION_INDIVIDUELLE = (1, 5)
+
+# Temps minimum entre deux appels de la fonction de progression (secondes)
+INTERVALLE_PROGRESSION = 2
+
+# Nombre de salons nettoyés en même temps par purger_salons()
+NB_SALONS_SIMULTANES = 5
+
+# Débit des suppressions par paquets, tous salons confondus : (par seconde, rafale)
+DEBIT_PAQUETS_SERVEUR = (5, 5)
+
+
+class FiltrePurge:
+    """
+    Critères des messages à supprimer. Tous les critères donnés doivent correspondre.
+
+    Exemple:
+        filtre = FiltrePurge(auteur_id=membre.id, motif=re.compile("discord\\.gg"))
+    """
+
+    def __init__(
+        self,
+        auteur_id: int | None = None,
+        bots: bool = False,
+        motif: re.Pattern | None = None,
+        pieces_jointes: bool = False,
+        apres: datetime | None = None,
+        avant: datetime | None = None
+    ):
+        self.auteur_id = auteur_id
+        self.bots = bots
+        self.motif = motif
+        self.pieces_jointes = pieces_jointes
+        # Bornes de date, appliquées directement par l'historique de Discord
+        self.apres = apres
+        self.avant = avant
+
+    def correspond(self, message: discord.Message) -> bool:
+        if self.auteur_id is not None and message.author.id != self.auteur_id:
+            return False
+        if self.bots and not message.author.bot:
+            return False
+        if self.pieces_jointes and not message.attachments:
+            return False
+        if self.motif is not None and not self.motif.search(message.content or ""):
+            return False
+        return True
+
+
+class ResultatPurge:
+    """Compteurs d'une suppression (mis à jour pendant qu'elle avance)."""
+
+    def __init__(self):
+        self.analyses = 0
+        self.supprimes = 0
+        # Dont supprimés un par un (plus de 14 jours)
+        self.anciens = 0
+        self.echecs = 0
+        # True si la suppression s'est arrêtée à l'échéance, avant la fin
+        self.interrompu = False
+        # Erreur qui a arrêté la suppression (ex: discord.Forbidden), None si aucune
+        self.erreur: Exception | None = None
+
+
+async def purger_salon(
+    salon: discord.TextChannel | discord.Thread,
+    filtre: FiltrePurge,
+    nombre_max: int,
+    limite_analyse: int | None = None,
+    progression: Callable[[ResultatPurge], Awaitable[None]] | None = None,
+    limiteur: LimiteurDebit | None = None,
+    raison: str | None = None,
+    limiteur_paquets: LimiteurDebit | None = None,
+    echeance: float | None = None,
+    resultat: ResultatPurge | None = None
+) -> ResultatPurge:
+    """
+    Supprime jusqu'à `nombre_max` messages du salon qui correspondent au filtre,
+    du plus récent au plus ancien.
+
+    Arguments:
+        salon: Le salon à nettoyer
+        filtre: Les critères des messages à supprimer
+        nombre_max: Nombre maximum de messages supprimés
+        limite_analyse: Nombre maximum de messages parcourus (None = tout l'historique)
+        progression: Coroutine appelée régulièrement avec le résultat en cours
+        limiteur: Limiteur des suppressions une par une (un par salon par défaut)
+        raison: Raison affichée dans les logs d'audit
+        limiteur_paquets: Limiteur des suppressions par paquets (partagé entre salons)
+        echeance: Arrêt à cette date (time.monotonic()), même si tout n'est pas fait
+        resultat: ResultatPurge à remplir (pour suivre la progression de l'extérieur)
+
+    Retourne:
+        Le ResultatPurge final
+    """
+    if resultat is None:
+        resultat = ResultatPurge()
+    if limiteur is None:
+        limiteur = LimiteurDebit(*DEBIT_SUPPRESSION_INDIVIDUELLE)
+
+    limite_groupee = datetime.now(timezone.utc) - AGE_MAX_SUPPRESSION_GROUPEE
+    paquet: list[discord.Message] = []
+    derniere_progression = time.monotonic()
+
+    async def signaler():
+        nonlocal derniere_progression
+        if progression is not None and time.monotonic() - derniere_progression >= INTERVALLE_PROGRESSION:
+            derniere_progression = time.monotonic()
+            await progression(resultat)
+
+    async def supprimer_paquet(paquet: list[discord.Message]):
+        if limiteur_paquets is not None:
+            await limiteur_paquets.attendre()
+        await _supprimer_paquet(salon, paquet, resultat, raison, limiteur)
+
+    # oldest_first est précisé : avec `after`, discord.py commencerait par les plus anciens
+    historique = salon.history(
+        limit=limite_analyse, before=filtre.avant, after=filtre.apres, oldest_first=False
+    )
+    async for message in historique:
+        if echeance is not None and time.monotonic() >= echeance:
+            resultat.interrompu = True
+            break
+
+        resultat.analyses += 1
+
+        if filtre.correspond(message):
+            if message.created_at >= limite_groupee:
+                paquet.append(message)
+                if len(paquet) >= TAILLE_PAQUET:
+                    await supprimer_paquet(paquet)
+                    paquet = []
+            else:
+                # L'historique va du plus récent au plus ancien : les messages
+                # récents déjà trouvés partent avant de passer aux anciens
+                if paquet:
+                    await supprimer_paquet(paquet)
+                    paquet = []
+                await limiteur.attendre()
+                if await _supprimer_un(message, resultat):
+                    resultat.anciens += 1
+
+        if resultat.supprimes + len(paquet) >= nombre_max:
+            break
+
+        await signaler()
+
+    if paquet:
+        await supprimer_paquet(paquet)
+
+    metriques.incrementer("purge.analyses", resultat.analyses)
+    metriques.incrementer("purge.supprimes", resultat.supprimes)
+    return resultat
+
+
+async def purger_salons(
+    salons: list[discord.TextChannel | discord.Thread],
+    filtre: FiltrePurge,
+    nombre_max_par_salon: int,
+    duree_max: float,
+    progression: Callable[[dict[int, ResultatPurge], int], Awaitable[None]] | None = None,
+    raison: str | None = None
+) -> dict[int, ResultatPurge]:
+    """
+    Lance purger_salon() sur plusieurs salons en parallèle.
+
+    - au plus NB_SALONS_SIMULTANES salons à la fois
+    - les suppressions par paquets de tous les salons partagent un limiteur
+    - tout s'arrête après `duree_max` secondes (les salons pas encore
+      commencés sont ignorés, ceux en cours s'arrêtent au message suivant)
+
+    Arguments:
+        progression: Coroutine appelée régulièrement avec (résultats, nombre de salons terminés)
+
+    Retourne:
+        {salon_id: ResultatPurge} (resultat.erreur est remplie si le salon a échoué)
+        Une erreur dans un salon n'arrête jamais les autres.
+    """
+    echeance = time.monotonic() + duree_max
+    semaphore = asyncio.Semaphore(NB_SALONS_SIMULTANES)
+    limiteur_paquets = LimiteurDebit(*DEBIT_PAQUETS_SERVEUR)
+    resultats: dict[int, ResultatPurge] = {}
+    termines = 0
+
+    async def nettoyer(salon):
+        nonlocal termines
+        async with semaphore:
+            resultat = resultats[salon.id] = ResultatPurge()
+            if time.monotonic() >= echeance:
+                resultat.interrompu = True
+            else:
+                try:
+                    await purger_salon(
+                        salon, filtre, nombre_max_par_salon,
+                        limiteur_paquets=limiteur_paquets,
+                        echeance=echeance,
+                        resultat=resultat,
+                        raison=raison
+                    )
+                except discord.HTTPException as erreur:
+                    # Les suppressions déjà faites dans ce salon restent comptées
+                    resultat.erreur = erreur
+                except Exception as erreur:
+                    # Erreur inattendue : seul ce salon échoue, les autres continuent
+                    print(f"❌ Purge : erreur inattendue dans #{salon} : {erreur!r}")
+                    resultat.erreur = erreur
+            termines += 1
+
+    async def suivre():
+        while True:
+            await asyncio.sleep(INTERVALLE_PROGRESSION)
+            await progression(resultats, termines)
+
+    suivi = asyncio.create_task(suivre()) if progression is not None else None
+    try:
+        await asyncio.gather(*(nettoyer(salon) for salon in salons))
+    finally:
+        if suivi is not None:
+            suivi.cancel()
+
+    return resultats
+
+
+async def _supprimer_paquet(
+    salon,
+    paquet: list[discord.Message],
+    resultat: ResultatPurge,
+    raison: str | None,
+    limiteur: LimiteurDebit
+):
+    """Supprime jusqu'à 100 messages récents en une requête."""
+    try:
+        await salon.delete_messages(paquet, reason=raison)
+    except discord.NotFound:
+        # Un message du paquet a déjà été supprimé : tout le paquet est refusé,
+        # les messages sont supprimés un par un au rythme du limiteur
+        for message in paquet:
+            await limiteur.attendre()
+            await _supprimer_un(message, resultat)
+        return
+    resultat.supprimes += len(paquet)
+    metriques.incrementer("purge.paquets")
+
+
+async def _supprimer_un(message: discord.Message, resultat: ResultatPurge) -> bool:
+    """Supprime un seul message. Retourne True s'il a été supprimé."""
+    try:
+        await message.delete()
+    except discord.NotFound:
+        return False
+    except discord.Forbidden:
+        raise
+    except discord.HTTPException:
+        resultat.echecs += 1
+        return False
+    resultat.supprimes += 1
+    return True
@@ -0,0 +1,129 @@
+# ============================================
+# ♻️ RECRÉATION DES SALONS D'UNE CATÉGORIE
+# ============================================
+# Vide tous les salons textuels d'une catégorie en les
+# recréant à l'identique (permissions, sujet, slowmode, NSFW),
+# comme /clear-salon mais pour toute la catégorie.
+#
+# - plusieurs salons sont recréés en même temps
+#   (nombre limité + limiteur de débit par type de requête)
+# - les positions ne sont PAS envoyées salon par salon :
+#   tout l'ordre est remis en place en UNE seule requête
+#   à la fin (PATCH /guilds/{guild}/channels)
+# - si l'ancien salon n'a pas pu être supprimé, le salon
+#   compte comme une erreur (SuppressionImpossible) : il
+#   garde sa place, la copie reste à la fin de la catégorie
+# ============================================
+
+import asyncio
+from typing import Awaitable, Callable
+
+import discord
+
+from utils.limiteur import LimiteurDebit
+from utils.metriques import metriques
+
+
+# Nombre de salons recréés en même temps
+NB_RECREATIONS_SIMULTANEES = 3
+
+# Débit maximum par type de requête : (requêtes par seconde, rafale)
+DEBITS_RECREATION = {
+    "creer_salon": (1, 3),          # POST /guilds/{guild}/channels
+    "supprimer_salon": (1, 3),      # DELETE /channels/{salon}
+}
+
+
+class SuppressionImpossible(Exception):
+    """La copie d'un salon a été créée, mais l'ancien salon (et son historique) existe encore."""
+
+    def __init__(self, ancien: discord.TextChannel, nouveau: discord.TextChannel, erreur: discord.HTTPException):
+        super().__init__(f"#{ancien.name} n'a pas pu être supprimé (copie {nouveau.mention} créée) : {erreur}")
+        self.nouveau = nouveau
+        self.erreur = erreur
+
+
+async def recreer_categorie(
+    bot: discord.Client,
+    categorie: discord.CategoryChannel,
+    raison: str,
+    progression: Callable[[int, int], Awaitable[None]] | None = None
+) -> dict[int, discord.TextChannel | Exception]:
+    """
+    Recrée tous les salons textuels d'une catégorie, puis remet leur ordre.
+
+    Un salon dont la copie n'a pas pu être créée n'est pas supprimé.
+
+    Arguments:
+        bot: Le bot (pour la mise à jour groupée des positions)
+        categorie: La catégorie à vider
+        raison: Raison affichée dans les logs d'audit
+        progression: Coroutine appelée après chaque salon avec (salons terminés, total)
+
+    Retourne:
+        {ID de l'ancien salon: nouveau salon, ou l'erreur si ce salon a échoué}
+        (SuppressionImpossible si la copie existe mais pas la suppression)
+    """
+    guild = categorie.guild
+    salons = sorted(categorie.text_channels, key=lambda s: s.position)
+
+    semaphore = asyncio.Semaphore(NB_RECREATIONS_SIMULTANEES)
+    limiteurs = {route: LimiteurDebit(*debit) for route, debit in DEBITS_RECREATION.items()}
+    resultats: dict[int, discord.TextChannel | Exception] = {}
+
+    async def recreer(salon: discord.TextChannel):
+        async with semaphore:
+            await recreer_un(salon)
+        if progression is not None:
+            await progression(len(resultats), len(salons))
+
+    async def recreer_un(salon: discord.TextChannel):
+        try:
+            await limiteurs["creer_salon"].attendre()
+            nouveau = await guild.create_text_channel(
+                name=salon.name,
+                category=categorie,
+                topic=salon.topic,
+                slowmode_delay=salon.slowmode_delay,
+                nsfw=salon.is_nsfw(),
+                overwrites=salon.overwrites,
+                reason=raison
+            )
+        except discord.HTTPException as erreur:
+            resultats[salon.id] = erreur
+            return
+
+        try:
+            await limiteurs["supprimer_salon"].attendre()
+            await salon.delete(reason=raison)
+        except discord.NotFound:
+            pass
+        except discord.HTTPException as erreur:
+            # Copie créée mais ancien salon toujours là : le salon n'est PAS vidé
+            print(f"❌ Recréation : impossible de supprimer #{salon.name} : {erreur}")
+            resultats[salon.id] = SuppressionImpossible(salon, nouveau, erreur)
+            return
+
+        resultats[salon.id] = nouveau
+
+    await asyncio.gather(*(recreer(salon) for salon in salons))
+
+    # Remet l'ordre d'origine en une requête : chaque salon (nouveau, ou ancien
+    # s'il n'a pas pu être recréé ou supprimé) reprend la position de l'original
+    positions = []
+    for salon in salons:
+        resultat = resultats.get(salon.id)
+        salon_id = resultat.id if isinstance(resultat, discord.abc.GuildChannel) else salon.id
+        positions.append({"id": salon_id, "position": salon.position})
+
+    if positions:
+        try:
+            await bot.http.bulk_channel_update(guild.id, positions, reason=raison)
+        except discord.HTTPException as erreur:
+            # Les salons sont recréés, seul leur ordre est à corriger à la main
+            print(f"❌ Recréation : impossible de remettre l'ordre des salons de {categorie.name} : {erreur}")
+
+    metriques.incrementer("recreation.salons", sum(
+        1 for r in resultats.values() if isinstance(r, discord.abc.GuildChannel)
+    ))
+    return resultats
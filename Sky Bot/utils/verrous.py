@@ -0,0 +1,45 @@
+# ============================================
+# 🔒 VERROUS PAR UTILISATEUR
+# ============================================
+# Quand un membre double-clique sur un bouton de la
+# boutique ou spamme /day, plusieurs exécutions de la
+# même commande peuvent se mélanger entre deux "await"
+# (ex: deux achats validés avec un seul solde).
+#
+# Chaque membre a son propre verrou : ses opérations
+# passent une par une, mais les autres membres ne
+# l'attendent pas.
+# ============================================
+
+import asyncio
+import weakref
+
+
+# Un verrou par utilisateur. WeakValueDictionary = le verrou disparaît
+# tout seul quand plus personne ne l'utilise (pas de fuite de mémoire).
+_verrous: "weakref.WeakValueDictionary[int, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def verrou_utilisateur(user_id: int) -> asyncio.Lock:
+    """
+    Retourne le verrou d'un utilisateur (le crée si besoin).
+
+    Arguments:
+        user_id: L'ID Discord de l'utilisateur
+
+    Exemple:
+        async with verrou_utilisateur(interaction.user.id):
+            solde = obtenir_solde(interaction.user.id)
+            ...
+            modifier_solde(interaction.user.id, -PRIX_VIP)
+    """
+    verrou = _verrous.get(user_id)
+    if verrou is None:
+        verrou = asyncio.Lock()
+        _verrous[user_id] = verrou
+    return verrou
+
+
+def nombre_verrous_actifs() -> int:
+    """Nombre de verrous encore en mémoire (utile pour le débogage)."""
+    return len(_verrous)